@@ -0,0 +1,190 @@
+"""
+Shared pieces of the benchmark suite: the headless environment, the query
+corpus, the synthetic catalogs, result records and the baseline comparison.
+Nothing here imports Qt.
+"""
+import os
+import re
+import sys
+from pathlib import Path
+from statistics import mean, median
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if str(REPOROOT) not in sys.path:
+    sys.path.insert(0, str(REPOROOT))
+
+from iconbrowser.catalog import IconCatalog, CharMaps  # noqa: E402
+from iconbrowser.cachedir import get_cache_dir  # noqa: E402
+from iconbrowser.snapshot import (  # noqa: E402
+    CATALOG_SNAPSHOT_NAME, snapshot_stamp, load_snapshot, pyrandyos_path,
+)
+
+sys.path.insert(0, str(REPOROOT/'iconbrowser/_testing'))
+from _iconbrowser_testing import (  # noqa: E402
+    ENV_ICONBROWSER_UNITTEST_ACTIVE,
+)
+
+QT_PLATFORM_ENV = 'QT_QPA_PLATFORM'
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_TOLERANCE = 0.25
+WORST_TOLERANCE = 1.0
+# timed sequences are repeated and the fastest time of each step is kept
+REPEATS = 5
+# differences smaller than this never count as a regression, whatever the
+# relative change, so that sub-millisecond timings do not flap
+ABSOLUTE_TOLERANCE = {'ms': 0.5, 'MB': 5.0, 's': 0.05}
+# queries typed one character at a time, as substring and fuzzy searches
+QUERY_CORPUS = (
+    'a', 'arrow', 'arrow-left', 'home', 'file', 'chevron_right', 'ic_fluent',
+    'circle', 'check', 'zzzz', 'codicons:', 'user', 'star',
+)
+FUZZY_CORPUS = ('arw lft', 'chk crcl', 'fldr opn', 'usr add')
+NAMES_LINE = re.compile(r'^(\w+) = (\d+)$', re.MULTILINE)
+
+
+def headless_env(**extra: str):
+    "Environment for a benchmark subprocess: offscreen Qt, test mode"
+    env = dict(os.environ)
+    env.setdefault(QT_PLATFORM_ENV, 'offscreen')
+    env[ENV_ICONBROWSER_UNITTEST_ACTIVE] = '1'
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (
+        str(REPOROOT), env.get('PYTHONPATH'))))
+    env.update(extra)
+    return env
+
+
+def catalog_charmaps(catalog: IconCatalog) -> CharMaps:
+    return {spec: {catalog.iconname(r): catalog.codepoint(r)
+                   for r in catalog.collection_range(spec)}
+            for spec in catalog.collections}
+
+
+def names_table_charmaps() -> CharMaps:
+    """
+    Charmaps read from the generated name tables of pyrandyos' bundled
+    fonts, one collection per font package, as a stand-in for the real
+    charmaps when there is no catalog snapshot and Qt cannot be loaded.
+    """
+    charmaps = dict()
+    for path in sorted(pyrandyos_path('gui', 'icons',
+                                      'thirdparty').glob('*/names.py')):
+        names = NAMES_LINE.findall(path.read_text(encoding='utf-8'))
+        charmaps[path.parent.name] = {n: int(cp) for n, cp in names}
+
+    return charmaps
+
+
+def base_charmaps():
+    """
+    Charmaps at the real size: those of the catalog snapshot if there is a
+    valid one, or else the name tables.  Returns them with their source.
+    """
+    path = get_cache_dir(create=False)/CATALOG_SNAPSHOT_NAME
+    catalog = load_snapshot(path, snapshot_stamp()) if path.exists() else None
+    if catalog is not None:
+        return catalog_charmaps(catalog), 'snapshot'
+
+    return names_table_charmaps(), 'name tables'
+
+
+def scaled_charmaps(charmaps: CharMaps, factor: int) -> CharMaps:
+    """
+    Charmaps `factor` times the size of `charmaps`: every glyph is repeated
+    under suffixed aliases in its own collection, so the names stay
+    realistic for searching and the glyphs can still be rendered.
+    """
+    if factor <= 1:
+        return charmaps
+
+    return {spec: {f'{name}-x{k}' if k else name: cp
+                   for k in range(factor) for name, cp in cmap.items()}
+            for spec, cmap in charmaps.items()}
+
+
+def typed(queries):
+    "Every prefix of each query, as typed one character at a time"
+    return [q[:i] for q in queries for i in range(1, len(q) + 1)]
+
+
+def record(value: float, unit: str = 'ms', better: str | None = 'lower',
+           tolerance: float = None):
+    """
+    A result; `better` is 'lower', 'higher' or None if it is not compared,
+    and `tolerance` overrides the suite's when this is the baseline
+    """
+    rec = {'value': value, 'unit': unit, 'better': better}
+    if tolerance is not None:
+        rec['tolerance'] = tolerance
+
+    return rec
+
+
+def latency_records(prefix: str, samples_ms: list[float]):
+    """
+    Median, 90th percentile, worst and mean of a list of timings.  The
+    worst is a single sample, so it is allowed to double.
+    """
+    ordered = sorted(samples_ms)
+    return {
+        f'{prefix}.p50_ms': record(median(ordered)),
+        f'{prefix}.p90_ms': record(ordered[int(0.9*(len(ordered) - 1))]),
+        f'{prefix}.max_ms': record(ordered[-1], tolerance=WORST_TOLERANCE),
+        f'{prefix}.mean_ms': record(mean(ordered)),
+    }
+
+
+def peak_rss_mb():
+    "Peak resident set size of this process, or None where unknown"
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak/2**20 if sys.platform == 'darwin' else peak/2**10
+
+
+def compare(results: dict, baseline: dict,
+            tolerance: float = DEFAULT_TOLERANCE):
+    """
+    Compare result records against a baseline.  Returns the regressions as
+    (name, baseline value, value, relative change) tuples.  A metric may
+    carry its own `tolerance` in the baseline; metrics missing from either
+    side are ignored.
+    """
+    regressions = list()
+    for name, base in baseline.items():
+        rec = results.get(name)
+        better = base.get('better')
+        if (rec is None or better is None or rec['value'] is None
+                or base['value'] is None):
+            continue
+
+        old = base['value']
+        new = rec['value']
+        tol = base.get('tolerance', tolerance)
+        delta = new - old if better == 'lower' else old - new
+        if (delta > abs(old)*tol
+                and delta > ABSOLUTE_TOLERANCE.get(base.get('unit'), 0)):
+            regressions.append((name, old, new, (new - old)/max(abs(old),
+                                                                 1e-12)))
+
+    return regressions
+
+
+def format_results(results: dict, baseline: dict = None):
+    baseline = baseline or {}
+    lines = list()
+    width = max(map(len, results), default=0)
+    for name, rec in sorted(results.items()):
+        value = rec['value']
+        text = 'n/a' if value is None else f"{value:12,.3f} {rec['unit']}"
+        base = baseline.get(name)
+        if value is not None and base and base['value']:
+            text += f"  ({(value - base['value'])/base['value']:+7.1%})"
+
+        lines.append(f'{name:{width}}  {text}')
+
+    return '\n'.join(lines)
@@ -0,0 +1,97 @@
+"""
+Qt-free part of the benchmark suite: building the catalog, the search index
+and the fuzzy matcher, and the per-keystroke latency of substring and fuzzy
+searches over the query corpus, for catalogs scaled from the real one.
+
+    python benchmarks/core_bench.py [scale ...]
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+HERE = Path(__file__).expanduser().resolve().parent
+sys.path.insert(0, str(HERE))
+
+from benchlib import (  # noqa: E402
+    DEFAULT_SCALES, REPEATS, QUERY_CORPUS, FUZZY_CORPUS, base_charmaps,
+    scaled_charmaps, typed, record, latency_records, format_results,
+)
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.search import TrigramIndex, IncrementalSearch  # noqa: E402
+from iconbrowser.fuzzy import FuzzyMatcher  # noqa: E402
+
+
+def timed(func, *args):
+    t0 = perf_counter()
+    result = func(*args)
+    return result, (perf_counter() - t0)*1000
+
+
+def keystroke_latency(new_search, queries, within: range = None):
+    """
+    Milliseconds per search, typing each query one character at a time into
+    a search from `new_search()`, best of `REPEATS` runs
+    """
+    terms = typed(queries)
+    runs = []
+    for _ in range(REPEATS):
+        search = new_search()
+        runs.append([timed(search, term, within)[1] for term in terms])
+
+    return [min(times) for times in zip(*runs)]
+
+
+def bench_scale(charmaps, scale: int):
+    prefix = f'x{scale}'
+    charmaps = scaled_charmaps(charmaps, scale)
+    catalog, catalog_ms = timed(IconCatalog.from_charmaps, charmaps)
+    index, index_ms = timed(TrigramIndex, catalog)
+    matcher, fuzzy_ms = timed(FuzzyMatcher, index)
+    results = {
+        f'{prefix}.icons': record(len(catalog), 'icons', None),
+        f'{prefix}.catalog_build_ms': record(catalog_ms),
+        f'{prefix}.index_build_ms': record(index_ms),
+        f'{prefix}.fuzzy_build_ms': record(fuzzy_ms),
+    }
+
+    def incremental():
+        return IncrementalSearch(index).search
+
+    def fuzzy():
+        return matcher.fork().search
+
+    results.update(latency_records(
+        f'{prefix}.search', keystroke_latency(incremental, QUERY_CORPUS)
+    ))
+    # the largest collection, as picked in the collection combo box
+    largest = max(catalog.collections,
+                  key=lambda c: len(catalog.collection_range(c)))
+    results.update(latency_records(
+        f'{prefix}.search_collection', keystroke_latency(
+            incremental, QUERY_CORPUS, catalog.collection_range(largest),
+        )
+    ))
+    results.update(latency_records(
+        f'{prefix}.fuzzy', keystroke_latency(fuzzy, FUZZY_CORPUS)
+    ))
+    return results
+
+
+def run(scales=DEFAULT_SCALES):
+    "Returns the result records and where the real-size charmaps came from"
+    charmaps, source = base_charmaps()
+    results = dict()
+    for scale in scales:
+        results.update(bench_scale(charmaps, scale))
+
+    return results, source
+
+
+def main(*scales: int):
+    results, source = run(scales or DEFAULT_SCALES)
+    print(f'Catalog from the {source}')
+    print(format_results(results))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
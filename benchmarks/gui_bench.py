@@ -0,0 +1,256 @@
+"""
+GUI part of the benchmark suite, run by `suite.py` in a subprocess under the
+offscreen Qt platform.  The browser is started the way the command line
+starts it and, once its window is up, measured from the inside:
+
+- with `--startup`, the time from launch to the first paint and to the end
+  of the staged startup, then until every collection is loaded;
+- otherwise, on a catalog `--scale` times the real one, the latency of
+  `updateFilter` over the query corpus, scroll-render throughput at each
+  column count and the time to switch themes.
+
+The results, with the peak RSS, are written as JSON to `--output`.
+
+    python benchmarks/gui_bench.py --output FILE [--startup | --scale N]
+"""
+import os
+import sys
+from argparse import ArgumentParser
+from functools import partial
+from json import dumps as jdumps
+from pathlib import Path
+from time import perf_counter, sleep
+from traceback import format_exc
+
+HERE = Path(__file__).expanduser().resolve().parent
+sys.path.insert(0, str(HERE))
+
+from benchlib import (  # noqa: E402
+    QT_PLATFORM_ENV, ENV_ICONBROWSER_UNITTEST_ACTIVE, REPEATS, QUERY_CORPUS,
+    FUZZY_CORPUS, scaled_charmaps, typed, record, latency_records,
+    peak_rss_mb,
+)
+
+os.environ.setdefault(QT_PLATFORM_ENV, 'offscreen')
+os.environ[ENV_ICONBROWSER_UNITTEST_ACTIVE] = '1'
+
+# the reference point of the startup timings is taken on this import
+from iconbrowser.app import IconBrowserApp, LAUNCH_TIME  # noqa: E402
+from iconbrowser.metrics import METRICS  # noqa: E402
+
+# frames scrolled at each column count, each half a page further down
+SCROLL_FRAMES = 240
+# themes switched to and from, starting from the one applied
+THEME_SWITCHES = 4
+# seconds to wait for anything before giving up
+WAIT_TIMEOUT = 120
+LOAD_TIMEOUT = 600
+
+
+def process_events():
+    from pyrandyos.gui.qt import QApplication
+    QApplication.instance().processEvents()
+
+
+def wait_until(pred, timeout: float = WAIT_TIMEOUT):
+    "Run the event loop until `pred()` holds; False on timeout"
+    end = perf_counter() + timeout
+    while not pred():
+        if perf_counter() > end:
+            return False
+
+        process_events()
+        sleep(0.001)
+
+    return True
+
+
+class GuiBench:
+    def __init__(self, output: Path, scale: int = 1, startup: bool = False):
+        self.output = output
+        self.scale = scale
+        self.startup = startup
+        self.started = False
+
+    def install(self):
+        "Hook into the application before it starts"
+        from iconbrowser.gui import IconBrowserGui
+        startup_done = IconBrowserGui.startup_done
+        bench = self
+
+        def hooked_startup_done(gui: IconBrowserGui, window):
+            startup_done(gui, window)
+            if not bench.started:
+                bench.started = True
+                from pyrandyos.gui.qt import QTimer
+                QTimer.singleShot(0, partial(bench.run, window))
+
+        IconBrowserGui.startup_done = hooked_startup_done
+        if self.scale > 1:
+            from iconbrowser.gui.main.library import IconLibrary
+            IconLibrary.get_icon_catalog = partial(scaled_catalog, self.scale)
+
+    def run(self, window):
+        from pyrandyos.gui.qt import QApplication
+        results = dict()
+        error = None
+        try:
+            if self.startup:
+                self.measure_startup(window, results)
+            else:
+                # nothing loads in the background while measuring
+                self.wait_loaded(window)
+                self.measure_filter(window, results)
+                self.measure_scroll(window, results)
+                self.measure_themes(window, results)
+
+            results['peak_rss_mb'] = record(peak_rss_mb(), 'MB')
+        except Exception:
+            error = format_exc()
+
+        self.output.write_text(jdumps({'results': results, 'error': error},
+                                      indent=2), encoding='utf-8')
+        QApplication.instance().quit()
+
+    def wait_loaded(self, window):
+        "Wait for the first paint and the collections loaded after it"
+        if not wait_until(lambda: window.library.painted):
+            raise TimeoutError('the icons were never painted')
+
+        loadTimer = window.library.loadTimer
+        if not wait_until(lambda: not loadTimer.isActive(), LOAD_TIMEOUT):
+            raise TimeoutError('the collections did not finish loading')
+
+    def measure_startup(self, window, results: dict):
+        # the snapshot is saved once the background loading is done, and
+        # the atlas on quitting, which the warm startup then uses
+        self.wait_loaded(window)
+        results['all_collections_ms'] = record(
+            (perf_counter() - LAUNCH_TIME)*1000
+        )
+        phases = METRICS.phases
+        for name, phase in (('first_paint_ms', 'Launch to first paint'),
+                            ('startup_done_ms', 'Launch to startup done')):
+            results[name] = record((phases[phase][1] - LAUNCH_TIME)*1000)
+
+    def run_filter(self, window, term: str):
+        "Milliseconds from `updateFilter` to the result being shown"
+        edit = window.gui_view.lineEditFilter
+        edit.blockSignals(True)
+        edit.setText(term)
+        edit.blockSignals(False)
+        hist = METRICS.histogram('filter_latency')
+        n = hist.count
+        t0 = perf_counter()
+        window.updateFilter()
+        if not wait_until(lambda: hist.count > n):
+            raise TimeoutError(f'no filter result for {term!r}')
+
+        return (perf_counter() - t0)*1000
+
+    def filter_latency(self, window, queries):
+        "Latency of each keystroke typing the queries, best of `REPEATS`"
+        terms = typed(queries)
+        runs = [[self.run_filter(window, term) for term in terms]
+                for _ in range(REPEATS)]
+        return [min(times) for times in zip(*runs)]
+
+    def measure_filter(self, window, results: dict):
+        view = window.gui_view
+        results.update(latency_records(
+            'filter', self.filter_latency(window, QUERY_CORPUS)
+        ))
+        view.fuzzyAction.setChecked(True)
+        results.update(latency_records(
+            'fuzzy_filter', self.filter_latency(window, FUZZY_CORPUS)
+        ))
+        view.fuzzyAction.setChecked(False)
+        self.run_filter(window, '')
+
+    def visible_rendered(self, window):
+        "Whether every glyph on screen is in the raster cache"
+        proxy_row = window.proxyModel.source_row
+        cache_key = window.model.cache_key
+        sizing = window.iconSizing
+        lru = window.iconCache.lru
+        visible, _, _ = window.gui_view.listView.prefetch_ranges()
+        return all(cache_key(proxy_row(r), sizing) in lru for r in visible)
+
+    def measure_scroll(self, window, results: dict):
+        from iconbrowser.gui.constants import VIEW_COLUMNS_OPTIONS
+        view = window.gui_view
+        lv = view.listView.qtobj
+        combo = view.comboColumns
+        bar = lv.verticalScrollBar()
+        rendered = partial(self.visible_rendered, window)
+        for cols in VIEW_COLUMNS_OPTIONS:
+            combo.setCurrentIndex(combo.findData(cols))
+            bar.setValue(0)
+            wait_until(rendered)
+            step = max(lv.viewport().height()//2, 1)
+            paints = []
+            t0 = perf_counter()
+            for value in range(0, bar.maximum() + 1, step)[:SCROLL_FRAMES]:
+                bar.setValue(value)
+                t = perf_counter()
+                lv.viewport().repaint()
+                paints.append((perf_counter() - t)*1000)
+                # take in the glyphs rendered meanwhile
+                process_events()
+
+            elapsed = perf_counter() - t0
+            t1 = perf_counter()
+            wait_until(rendered)
+            prefix = f'scroll.cols{cols}'
+            results[f'{prefix}.fps'] = record(len(paints)/elapsed, 'fps',
+                                              'higher')
+            results[f'{prefix}.settle_ms'] = record(
+                (perf_counter() - t1)*1000
+            )
+            results.update(latency_records(f'{prefix}.paint', paints))
+
+    def measure_themes(self, window, results: dict):
+        view = window.gui_view
+        combo = view.comboStyle
+        lv = view.listView.qtobj
+        original = combo.currentText()
+        themes = [t for t in sorted(window.theme_names()) if t != original]
+        rendered = partial(self.visible_rendered, window)
+        samples = []
+        for theme in themes[:THEME_SWITCHES] + [original]:
+            t0 = perf_counter()
+            combo.setCurrentText(theme)
+            lv.viewport().repaint()
+            wait_until(rendered)
+            samples.append((perf_counter() - t0)*1000)
+
+        results.update(latency_records('theme_switch', samples))
+
+
+def scaled_catalog(scale: int):
+    "Every collection, loaded and scaled, for `IconLibrary.get_icon_catalog`"
+    from pyrandyos.gui.icons.iconfont.sources import THIRDPARTY_FONTSPEC
+    from iconbrowser.catalog import IconCatalog
+    from iconbrowser.gui.fonts import load_collection
+    for specname in THIRDPARTY_FONTSPEC:
+        load_collection(specname)
+
+    charmaps = {k: spec.charmap for k, spec in THIRDPARTY_FONTSPEC.items()}
+    return IconCatalog.from_charmaps(scaled_charmaps(charmaps, scale))
+
+
+def main(args: list[str] = None):
+    parser = ArgumentParser(prog='gui_bench')
+    parser.add_argument('--output', type=Path, required=True)
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--startup', action='store_true')
+    opts = parser.parse_args(args)
+    GuiBench(opts.output, opts.scale, opts.startup).install()
+    try:
+        IconBrowserApp.run_cmdline([])
+    except SystemExit:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Per-call overhead of trace-only call logging on a trivial method:
+undecorated (tracing off, as bound by iconbrowser.logging), wrapped with
+tracing off (how every trace-only function used to be bound), and wrapped
+with tracing on.
+
+    python benchmarks/logging_bench.py [calls]
+"""
+import sys
+from pathlib import Path
+from timeit import Timer
+
+HERE = Path(__file__).expanduser().resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from iconbrowser.logging import (  # noqa: E402
+    log_func_call, set_trace_logging, set_func_call_logging, DEBUGLOW2,
+    get_logger, TRACED_FUNCS,
+)
+
+
+class Subject:
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def traced(self, value: int):
+        return value
+
+
+def per_call_ns(func, calls: int):
+    best = min(Timer(lambda: func(1)).repeat(5, calls))
+    return best/calls*1e9
+
+
+def main(calls: int = 100000):
+    # keep the trace records from reaching the console
+    get_logger().disabled = True
+    obj = Subject()
+    traced = TRACED_FUNCS[-1]
+    results = {'undecorated (tracing off)': per_call_ns(obj.traced, calls)}
+
+    wrapped = traced.wrapped.__get__(obj)
+    results['wrapped, tracing off'] = per_call_ns(wrapped, calls)
+
+    set_func_call_logging(True)
+    set_trace_logging(True)
+    try:
+        results['wrapped, tracing on'] = per_call_ns(obj.traced,
+                                                     max(calls//10, 1))
+    finally:
+        set_trace_logging(False)
+        set_func_call_logging(False)
+
+    base = results['undecorated (tracing off)']
+    for name, ns in results.items():
+        print(f'{name:28} {ns:10.1f} ns/call  {ns/base:8.1f}x')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
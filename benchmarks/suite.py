@@ -0,0 +1,152 @@
+"""
+Performance benchmark suite.  Runs headless, with the offscreen Qt platform
+and `ICONBROWSER_UNITTEST_ACTIVE` set, in a fresh cache directory:
+
+- the Qt-free catalog, index and search benchmarks (`core_bench.py`);
+- a cold and then a warm startup to first paint (`gui_bench.py --startup`);
+- filter latency, scroll-render throughput at each column count, theme
+  switching and peak RSS, for each catalog scale (`gui_bench.py`).
+
+The scales multiply the real catalog with synthetic aliases, 1x, 10x and
+100x by default.  The results are written as JSON and compared against a
+baseline saved earlier with `--save-baseline`; the exit status is 1 if any
+metric regressed by more than the tolerance.
+
+    python benchmarks/suite.py [--scales N ...] [--output FILE]
+        [--baseline FILE] [--save-baseline] [--tolerance FRACTION]
+        [--no-gui]
+"""
+import platform
+import subprocess
+import sys
+from argparse import ArgumentParser
+from datetime import datetime
+from json import dumps as jdumps, loads as jloads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+HERE = Path(__file__).expanduser().resolve().parent
+sys.path.insert(0, str(HERE))
+
+from benchlib import (  # noqa: E402
+    DEFAULT_SCALES, DEFAULT_TOLERANCE, headless_env, record, compare,
+    format_results,
+)
+import core_bench  # noqa: E402
+from iconbrowser.version import __version__  # noqa: E402
+from iconbrowser.cachedir import CACHE_DIR_ENV  # noqa: E402
+
+DEFAULT_BASELINE = HERE/'baseline.json'
+DEFAULT_OUTPUT = Path('benchmark-results.json')
+# seconds a GUI run may take, including loading every collection
+GUI_TIMEOUT = 3600
+
+
+def run_gui(env: dict, *args: str):
+    "Run `gui_bench.py` and return its results and wall time in seconds"
+    with TemporaryDirectory() as tmp:
+        output = Path(tmp)/'results.json'
+        t0 = perf_counter()
+        proc = subprocess.run([sys.executable, str(HERE/'gui_bench.py'),
+                               '--output', str(output), *args],
+                              env=env, capture_output=True, text=True,
+                              timeout=GUI_TIMEOUT)
+        wall = perf_counter() - t0
+        if not output.exists():
+            raise RuntimeError(f'gui_bench.py {" ".join(args)} exited with '
+                               f'{proc.returncode}:\n{proc.stderr[-2000:]}')
+
+        data = jloads(output.read_text(encoding='utf-8'))
+
+    if data['error']:
+        raise RuntimeError(f'gui_bench.py {" ".join(args)} failed:\n'
+                           f'{data["error"]}')
+
+    return data['results'], wall
+
+
+def prefixed(prefix: str, results: dict):
+    return {f'{prefix}.{k}': v for k, v in results.items()}
+
+
+def run_suite(scales=DEFAULT_SCALES, gui: bool = True):
+    results, source = core_bench.run(scales)
+    if gui:
+        with TemporaryDirectory() as cache:
+            env = headless_env(**{CACHE_DIR_ENV: cache})
+            for kind in ('cold', 'warm'):
+                startup, wall = run_gui(env, '--startup')
+                startup['process_s'] = record(wall, 's')
+                results.update(prefixed(f'startup.{kind}', startup))
+
+            for scale in scales:
+                gui_results, _ = run_gui(env, '--scale', str(scale))
+                results.update(prefixed(f'x{scale}', gui_results))
+
+    meta = {
+        'version': __version__,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'scales': list(scales),
+        'catalog_source': source,
+        'gui': gui,
+    }
+    return {'meta': meta, 'results': results}
+
+
+def main(args: list[str] = None):
+    parser = ArgumentParser(prog='suite')
+    parser.add_argument('--scales', type=int, nargs='+',
+                        default=list(DEFAULT_SCALES), metavar='N',
+                        help="catalog sizes as multiples of the real one")
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT,
+                        help="where to write the results as JSON")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help="results to compare against")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="save the results as the baseline instead of "
+                        "comparing against it")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="relative change allowed before a metric "
+                        "counts as a regression, unless the baseline sets "
+                        "its own")
+    parser.add_argument('--no-gui', action='store_true',
+                        help="only run the benchmarks that do not need Qt")
+    opts = parser.parse_args(args)
+
+    report = run_suite(opts.scales, not opts.no_gui)
+    results = report['results']
+    opts.output.write_text(jdumps(report, indent=2), encoding='utf-8')
+    if opts.save_baseline:
+        opts.baseline.write_text(jdumps(report, indent=2), encoding='utf-8')
+        print(format_results(results))
+        print(f'\nSaved the baseline to {opts.baseline}')
+        return 0
+
+    baseline = None
+    if opts.baseline.exists():
+        baseline = jloads(opts.baseline.read_text(encoding='utf-8'))
+
+    print(format_results(results, baseline and baseline['results']))
+    print(f'\nWrote the results to {opts.output}')
+    if baseline is None:
+        print(f'No baseline at {opts.baseline}; save one with '
+              '--save-baseline')
+        return 0
+
+    regressions = compare(results, baseline['results'], opts.tolerance)
+    for name, old, new, change in regressions:
+        print(f'REGRESSION {name}: {old:,.3f} -> {new:,.3f} ({change:+.1%})')
+
+    if not regressions:
+        print(f'No regressions against {opts.baseline} '
+              f'({baseline["meta"]["date"]})')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
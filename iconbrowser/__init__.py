@@ -1,2 +1,11 @@
 from .version import __version__  # noqa: F401
-from .app import IconBrowserApp  # noqa: F401
+
+
+def __getattr__(name: str):
+    # imported on first use, so the command-line tools (see `cli`) can run
+    # without loading pyrandyos
+    if name == 'IconBrowserApp':
+        from .app import IconBrowserApp
+        return IconBrowserApp
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,10 @@
-from .app import IconBrowserApp
+import sys
+
+from .cli import COMMANDS, run_cli
+
+if sys.argv[1:2] and sys.argv[1] in COMMANDS:
+    sys.exit(run_cli(sys.argv[1:]))
+
+from .app import IconBrowserApp  # noqa: E402
 
 IconBrowserApp.run_cmdline()
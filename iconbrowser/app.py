@@ -1,10 +1,14 @@
+from argparse import ArgumentParser, Namespace
 from pathlib import Path
+from time import perf_counter
 
 from pyrandyos import PyRandyOSApp
 
-from .logging import log_func_call
+from .logging import log_func_call, rebind_traced_funcs
 
 HERE = Path(__file__).parent
+# reference point for startup timings
+LAUNCH_TIME = perf_counter()
 
 
 class IconBrowserApp(PyRandyOSApp):
@@ -12,11 +16,33 @@ class IconBrowserApp(PyRandyOSApp):
     APP_LOG_PREFIX = 'IconBrowser'
     APP_ASSETS_DIR = HERE/"assets"
 
+    cli_options: Namespace = None
+
     @classmethod
     @log_func_call
     def main(cls, input_data: dict | str | Path = None, *args,
              **kwargs):
         cls.init_main(input_data, True, **kwargs)
+        # the configuration sets the tracing flags behind our back
+        rebind_traced_funcs()
+
+        opts = cls.cli_options
+        if opts and opts.profile_imports:
+            from .importprofile import run_import_profile
+            return run_import_profile(opts.profile_imports)
+
+        if opts and opts.serve:
+            from .gui.server import run_server_command
+            return run_server_command(opts.socket)
+
+        if opts and opts.build_catalog:
+            from .gui.fonts import run_catalog_command
+            return run_catalog_command()
+
+        if opts and (opts.clear_atlas or opts.prebuild_atlas):
+            from .gui.atlasstore import run_atlas_command
+            return run_atlas_command(opts.clear_atlas, opts.prebuild_atlas,
+                                     opts.atlas_size)
 
         from .gui import IconBrowserGui
         gui = IconBrowserGui(args)
@@ -26,4 +52,41 @@ class IconBrowserApp(PyRandyOSApp):
     @classmethod
     @log_func_call
     def preprocess_args(cls, args: list[str]):
+        # options we do not know about are left for Qt
+        opts, args = cls.create_arg_parser().parse_known_args(args)
+        cls.cli_options = opts
         return args
+
+    @classmethod
+    @log_func_call
+    def create_arg_parser(cls):
+        parser = ArgumentParser(prog='iconbrowser')
+        parser.add_argument('--profile-imports', nargs='?', default=None,
+                            const='iconbrowser.gui', metavar='MODULE',
+                            help="import MODULE (default: iconbrowser.gui) "
+                            "in a fresh interpreter under -X importtime, "
+                            "print the time taken per package and by the "
+                            "slowest modules and exit")
+        parser.add_argument('--serve', action='store_true',
+                            help="run the icon daemon: answer search, code "
+                            "and render requests over a Unix domain socket "
+                            "instead of opening the browser")
+        parser.add_argument('--socket', type=Path, default=None,
+                            metavar='PATH',
+                            help="socket for --serve (default: "
+                            "$ICONBROWSER_SOCKET or the cache directory)")
+        parser.add_argument('--build-catalog', action='store_true',
+                            help="load every icon collection, save the "
+                            "catalog snapshot used by the search, code and "
+                            "list commands and exit")
+        parser.add_argument('--prebuild-atlas', action='store_true',
+                            help="render every glyph into the on-disk atlas "
+                            "cache for each theme and exit")
+        parser.add_argument('--clear-atlas', action='store_true',
+                            help="delete the on-disk glyph atlas cache "
+                            "and exit")
+        parser.add_argument('--atlas-size', type=int, action='append',
+                            default=[], metavar='PIXELS',
+                            help="icon size to prebuild (repeatable; "
+                            "defaults to the sizes already cached)")
+        return parser
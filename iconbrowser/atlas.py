@@ -0,0 +1,208 @@
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from hashlib import md5
+from json import dumps as jdumps, loads as jloads
+from pathlib import Path
+from struct import Struct
+
+ATLAS_MAGIC = b'IBATLAS1'
+ATLAS_SUFFIX = '.atlas'
+# glyphs are stored as 32-bit premultiplied ARGB, one row after another
+BYTES_PER_PIXEL = 4
+HEADER_LEN = Struct('<I')
+
+# (collection, icon size, ARGB color)
+AtlasKey = tuple[str, int, int]
+
+
+def atlas_filename(specname: str, size: int, color: int):
+    return f'{specname}-{size}-{color:08x}{ATLAS_SUFFIX}'
+
+
+def parse_atlas_filename(name: str) -> AtlasKey | None:
+    if not name.endswith(ATLAS_SUFFIX):
+        return None
+
+    try:
+        specname, size, color = name[:-len(ATLAS_SUFFIX)].rsplit('-', 2)
+        return specname, int(size), int(color, 16)
+    except ValueError:
+        return None
+
+
+def file_md5(path: Path):
+    h = md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def glyph_nbytes(size: int):
+    return size*size*BYTES_PER_PIXEL
+
+
+class GlyphAtlas:
+    """
+    Read-only, memory-mapped file of pre-rendered glyphs for one
+    (collection, size, color) combination.
+
+    The file is the magic string, a JSON header, the sorted codepoints as
+    32-bit integers and then the pixels of each glyph in codepoint order.
+    The header records the package version and the hash of the font file
+    the glyphs came from, and `open` refuses a file whose header does not
+    match, so upgrading either one invalidates the atlas.
+    """
+    def __init__(self, path: Path, mm: mmap.mmap, meta: dict,
+                 codepoints: memoryview, pixel_offset: int):
+        self.path = path
+        self.mm = mm
+        self.meta = meta
+        self.size: int = meta['size']
+        self.codepoints = codepoints
+        self.pixel_offset = pixel_offset
+
+    @classmethod
+    def open(cls, path: Path, font_hash: str, version: str):
+        """
+        Map the atlas at `path`.  Returns None if the file is missing,
+        unreadable or was built from a different font file or version.
+        """
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            atlas = cls.from_mmap(path, mm)
+        except (ValueError, KeyError, TypeError):
+            atlas = None
+
+        if atlas is None:
+            mm.close()
+            return None
+
+        meta = atlas.meta
+        if (meta.get('font_hash') != font_hash
+                or meta.get('version') != version):
+            atlas.close()
+            return None
+
+        return atlas
+
+    @classmethod
+    def from_mmap(cls, path: Path, mm: mmap.mmap):
+        n = len(ATLAS_MAGIC)
+        if mm[:n] != ATLAS_MAGIC:
+            return None
+
+        (hlen,) = HEADER_LEN.unpack_from(mm, n)
+        n += HEADER_LEN.size
+        meta = jloads(mm[n:n + hlen])
+        n += hlen
+        n += -n % 4
+        count = meta['count']
+        cpbytes = 4*count
+        expected = n + cpbytes + count*glyph_nbytes(meta['size'])
+        if len(mm) != expected:
+            return None
+
+        codepoints = memoryview(mm)[n:n + cpbytes].cast('I')
+        return cls(path, mm, meta, codepoints, n + cpbytes)
+
+    @staticmethod
+    def write(path: Path, font_hash: str, version: str, size: int,
+              color: int, glyphs: Mapping[int, bytes]):
+        """
+        Write an atlas holding `glyphs` (codepoint -> pixel bytes).  The file
+        is replaced atomically, so readers never see a partial atlas.
+        """
+        nbytes = glyph_nbytes(size)
+        codepoints = array('I', sorted(glyphs))
+        meta = {
+            'version': version,
+            'font_hash': font_hash,
+            'size': size,
+            'color': color,
+            'count': len(codepoints),
+        }
+        header = jdumps(meta).encode()
+        pad = -(len(ATLAS_MAGIC) + HEADER_LEN.size + len(header)) % 4
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(ATLAS_MAGIC)
+            f.write(HEADER_LEN.pack(len(header)))
+            f.write(header)
+            f.write(b'\0'*pad)
+            f.write(codepoints.tobytes())
+            for cp in codepoints:
+                data = glyphs[cp]
+                if len(data) != nbytes:
+                    raise ValueError(f'Glyph {cp} has {len(data)} bytes, '
+                                     f'expected {nbytes}')
+
+                f.write(data)
+
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.codepoints)
+
+    def index(self, codepoint: int):
+        cps = self.codepoints
+        i = bisect_left(cps, codepoint)
+        return i if i < len(cps) and cps[i] == codepoint else -1
+
+    def __contains__(self, codepoint: int):
+        return self.index(codepoint) >= 0
+
+    def glyph(self, codepoint: int) -> memoryview | None:
+        "Return the pixels of a glyph without copying, or None"
+        i = self.index(codepoint)
+        if i < 0:
+            return None
+
+        nbytes = glyph_nbytes(self.size)
+        start = self.pixel_offset + i*nbytes
+        return memoryview(self.mm)[start:start + nbytes]
+
+    def glyphs(self) -> dict[int, bytes]:
+        "Copy out every glyph, e.g. to merge new ones in and rewrite"
+        return {cp: bytes(self.glyph(cp)) for cp in self.codepoints}
+
+    def close(self):
+        codepoints = self.codepoints
+        if codepoints is not None:
+            codepoints.release()
+            self.codepoints = None
+            try:
+                self.mm.close()
+            except BufferError:
+                # a glyph view is still alive; the map closes with it
+                pass
+
+
+def list_atlases(directory: Path) -> dict[AtlasKey, Path]:
+    out = dict()
+    if directory.is_dir():
+        for p in directory.iterdir():
+            key = parse_atlas_filename(p.name)
+            if key is not None:
+                out[key] = p
+
+    return out
+
+
+def clear_atlases(directory: Path):
+    "Delete every atlas file in `directory`, returning how many were removed"
+    n = 0
+    for p in list_atlases(directory).values():
+        p.unlink(missing_ok=True)
+        n += 1
+
+    return n
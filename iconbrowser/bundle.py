@@ -0,0 +1,218 @@
+"""
+Resource bundles of pre-rendered icons for applications built on PyRandyOS.
+
+A bundle is a binary blob of glyph masks plus a generated Python module of
+accessors that stand in for the `IconSpec`s `pyrandyos_code` would define:
+each has an `icon()` method returning a `QIcon`, named as in the snippet, so
+an application switches by changing one import and never loads an icon
+font.  Glyphs are stored once per distinct mask, zlib-compressed, as 8-bit
+coverage at each bundled size; at paint time they are tinted with the
+palette's window text color (or the bundle's fixed color), the way the
+default `IconSpec` colors its glyphs.
+"""
+from collections.abc import Iterable, Iterator, Sequence
+from hashlib import md5
+from pathlib import Path
+from zlib import compress
+
+from .version import __version__
+from .snippets import font_shortname, legalize_iconname
+
+DEFAULT_BUNDLE_NAME = 'icon_bundle'
+DEFAULT_BUNDLE_SIZES = (16, 24, 32, 48, 64)
+BLOB_SUFFIX = '.bin'
+
+# everything in the generated module that does not depend on the icons
+BUNDLE_RUNTIME = '''
+from pathlib import Path
+from zlib import decompress
+
+from pyrandyos.gui.qt import (
+    QIcon, QIconEngine, QImage, QPainter, QPixmap, QPalette, QColor,
+    QApplication, Qt,
+)
+
+_BLOB_PATH = Path(__file__).with_name(BLOB_NAME)
+_blob: bytes = None
+
+
+def _glyph_image(glyph: int, size: int):
+    global _blob
+    if _blob is None:
+        _blob = _BLOB_PATH.read_bytes()
+
+    offset, length = GLYPHS[glyph]
+    data = decompress(_blob[offset:offset + length])
+    return QImage(data, size, size, size, QImage.Format_Alpha8).copy()
+
+
+class BundledIconEngine(QIconEngine):
+    def __init__(self, spec: 'BundledIconSpec'):
+        super().__init__()
+        self.spec = spec
+
+    def paint(self, painter: QPainter, rect, mode: QIcon.Mode,
+              state: QIcon.State):
+        painter.drawPixmap(rect, self.pixmap(rect.size(), mode, state))
+
+    def pixmap(self, size, mode: QIcon.Mode, state: QIcon.State):
+        spec = self.spec
+        mask = spec.image(min(size.width(), size.height()))
+        color = spec.color
+        if color is None:
+            group = (QPalette.Disabled if mode == QIcon.Disabled
+                     else QPalette.Active)
+            color = QApplication.palette().color(group, QPalette.WindowText)
+
+        image = QImage(mask.size(), QImage.Format_ARGB32_Premultiplied)
+        image.fill(color)
+        painter = QPainter(image)
+        painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
+        painter.drawImage(0, 0, mask)
+        painter.end()
+        pm = QPixmap.fromImage(image)
+        if pm.size() != size:
+            pm = pm.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        return pm
+
+    def clone(self):
+        return BundledIconEngine(self.spec)
+
+
+class BundledIconSpec:
+    """
+    Pre-rendered stand-in for a PyRandyOS `IconSpec`: `icon()` returns a
+    `QIcon` drawn from the bundled glyphs, scaled from the nearest bundled
+    size at or above the one requested.
+    """
+    def __init__(self, name: str, glyphs: tuple[int, ...],
+                 color: int = None):
+        self.name = name
+        self.glyphs = dict(zip(SIZES, glyphs))
+        self.color = None if color is None else QColor.fromRgba(color)
+        self.images: dict[int, QImage] = dict()
+        self._icon: QIcon = None
+
+    def as_tuple(self):
+        return (self.name,)
+
+    def image(self, size: int):
+        size = next((s for s in SIZES if s >= size), SIZES[-1])
+        image = self.images.get(size)
+        if image is None:
+            image = _glyph_image(self.glyphs[size], size)
+            self.images[size] = image
+
+        return image
+
+    def icon(self):
+        icon = self._icon
+        if icon is None:
+            icon = QIcon(BundledIconEngine(self))
+            self._icon = icon
+
+        return icon
+'''
+
+
+def read_manifest(path: Path) -> Iterator[str]:
+    "Icons listed in a manifest file, one per line; '#' starts a comment"
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            yield line
+
+
+def accessor_name(specname: str, iconname: str):
+    "Name of the `IconSpec` that `pyrandyos_code` defines for an icon"
+    return f'{font_shortname(specname)}_{legalize_iconname(iconname)}_ispec'
+
+
+class BundleWriter:
+    """
+    Collects glyph masks, keeping one copy of each distinct mask, and writes
+    the blob and the accessor module.
+    """
+    def __init__(self, sizes: Iterable[int] = DEFAULT_BUNDLE_SIZES,
+                 color: int = None):
+        self.sizes = tuple(sorted(set(sizes)))
+        self.color = color
+        self.glyph_ids: dict[bytes, int] = dict()
+        # (offset, length) of each compressed glyph in the blob
+        self.glyphs: list[tuple[int, int]] = list()
+        self.blob = bytearray()
+        # accessor name -> (icon, glyph ids in size order)
+        self.specs: dict[str, tuple[str, tuple[int, ...]]] = dict()
+        self.icons: set[str] = set()
+
+    def add_glyph(self, mask: bytes):
+        key = md5(mask).digest()
+        glyph = self.glyph_ids.get(key)
+        if glyph is None:
+            data = compress(mask, 9)
+            glyph = len(self.glyphs)
+            self.glyphs.append((len(self.blob), len(data)))
+            self.blob += data
+            self.glyph_ids[key] = glyph
+
+        return glyph
+
+    def add_icon(self, specname: str, iconname: str, masks: Sequence[bytes]):
+        """
+        Add an icon given its masks at each of `sizes`.  Returns the name of
+        its accessor, or None if the icon is already in the bundle.
+        """
+        iconstring = f'{specname}:{iconname}'
+        if iconstring in self.icons:
+            return None
+
+        self.icons.add(iconstring)
+        base = accessor_name(specname, iconname)
+        name = base
+        n = 1
+        while name in self.specs:
+            # e.g. 'a-b' and 'a_b' legalize to the same name
+            n += 1
+            name = f'{base[:-len("_ispec")]}_{n}_ispec'
+
+        self.specs[name] = (iconstring, tuple(map(self.add_glyph, masks)))
+        return name
+
+    def __len__(self):
+        return len(self.specs)
+
+    def module_source(self, blobname: str):
+        color = 'None' if self.color is None else f'0x{self.color:08x}'
+        lines = [
+            f'"""\nIcons pre-rendered by IconBrowser {__version__}: '
+            f'{len(self.specs):,} icons, {len(self.glyphs):,} distinct '
+            'glyphs.\nGenerated by "python -m iconbrowser bundle"; do not '
+            'edit.\n"""',
+            f'BLOB_NAME = {blobname!r}',
+            f'SIZES = {self.sizes!r}',
+            f'COLOR = {color}',
+            '# (offset, length) of each zlib-compressed glyph mask',
+            'GLYPHS = (',
+            *(f'    ({o}, {n}),' for o, n in self.glyphs),
+            ')',
+            BUNDLE_RUNTIME,
+            '# accessors named as in the PyRandyOS code the browser copies',
+        ]
+        lines += [f'{name} = BundledIconSpec({icon!r}, {glyphs!r}, COLOR)'
+                  for name, (icon, glyphs) in self.specs.items()]
+        lines += ['', '', 'ICONS = {',
+                  *(f'    {icon!r}: {name},'
+                    for name, (icon, _) in self.specs.items()),
+                  '}', '']
+        return '\n'.join(lines)
+
+    def write(self, outdir: Path, name: str = DEFAULT_BUNDLE_NAME):
+        "Write `name`.py and its blob to `outdir`, returning both paths"
+        outdir.mkdir(parents=True, exist_ok=True)
+        blobpath = outdir/f'{name}{BLOB_SUFFIX}'
+        pypath = outdir/f'{name}.py'
+        blobpath.write_bytes(self.blob)
+        pypath.write_text(self.module_source(blobpath.name),
+                          encoding='utf-8')
+        return pypath, blobpath
@@ -0,0 +1,33 @@
+import os
+import sys
+from pathlib import Path
+
+CACHE_DIR_ENV = 'ICONBROWSER_CACHE_DIR'
+CACHE_DIR_NAME = 'iconbrowser'
+
+
+def default_cache_dir():
+    "Per-user cache directory following the platform's conventions"
+    home = Path.home()
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or home/'AppData'/'Local'
+        return Path(base)/CACHE_DIR_NAME/'Cache'
+
+    if sys.platform == 'darwin':
+        return home/'Library'/'Caches'/CACHE_DIR_NAME
+
+    base = os.environ.get('XDG_CACHE_HOME') or home/'.cache'
+    return Path(base)/CACHE_DIR_NAME
+
+
+def get_cache_dir(*parts: str, create: bool = True):
+    """
+    Return a directory under the persistent cache, which can be moved with
+    the `ICONBROWSER_CACHE_DIR` environment variable.
+    """
+    base = os.environ.get(CACHE_DIR_ENV)
+    path = (Path(base) if base else default_cache_dir()).joinpath(*parts)
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+
+    return path
@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from sys import intern
+
+CharMaps = dict[str, dict[str, int]]
+
+SORT_BY_COLLECTION = 'collection'
+SORT_BY_NAME = 'name'
+SORT_BY_CODEPOINT = 'codepoint'
+SORT_ORDERS = (SORT_BY_COLLECTION, SORT_BY_NAME, SORT_BY_CODEPOINT)
+
+
+def range_covers(outer: range | None, inner: range | None):
+    "Whether the row range `outer` contains `inner`; None means every row"
+    return outer is None or (inner is not None
+                             and outer.start <= inner.start
+                             and inner.stop <= outer.stop)
+
+
+class IconCatalog:
+    """
+    Compact, pre-sorted table of every glyph across the icon font
+    collections.
+
+    Rows are ordered exactly as a sorted list of 'specname:iconname' strings
+    would be, which places each collection in a contiguous block of rows.
+    Glyph names are stored once in a sorted table and referenced per row by
+    integer id, so the id doubles as the name sort key.  The display string
+    for a row is only built when asked for.
+    """
+    def __init__(self, collections: list[str], offsets: array,
+                 names: list[str], name_ids: array, codepoints: array):
+        self.collections = [intern(c) for c in collections]
+        self.offsets = offsets
+        self.names = names
+        self.name_ids = name_ids
+        self.codepoints = codepoints
+        self.coll_ids = self.build_coll_ids()
+        self._orders: dict[str, array] = dict()
+
+    @classmethod
+    def from_charmaps(cls, charmaps: CharMaps):
+        # sorting on 'spec:' keeps blocks in the same order as sorting the
+        # full 'spec:name' strings would
+        collections = sorted(charmaps, key=lambda k: k + ':')
+        names = sorted({n for cmap in charmaps.values() for n in cmap})
+        name_lookup = {n: i for i, n in enumerate(names)}
+
+        offsets = array('I', [0])
+        name_ids = array('I')
+        codepoints = array('I')
+        for spec in collections:
+            cmap = charmaps[spec]
+            ids = sorted(name_lookup[n] for n in cmap)
+            name_ids.extend(ids)
+            codepoints.extend(cmap[names[i]] for i in ids)
+            offsets.append(len(name_ids))
+
+        return cls(collections, offsets, names, name_ids, codepoints)
+
+    def build_coll_ids(self):
+        offsets = self.offsets
+        coll_ids = array('H')
+        for i in range(len(self.collections)):
+            coll_ids.extend([i]*(offsets[i + 1] - offsets[i]))
+
+        return coll_ids
+
+    def __len__(self):
+        return len(self.name_ids)
+
+    def specname(self, row: int):
+        return self.collections[self.coll_ids[row]]
+
+    def iconname(self, row: int):
+        return self.names[self.name_ids[row]]
+
+    def codepoint(self, row: int):
+        return self.codepoints[row]
+
+    def iconstring(self, row: int):
+        return f'{self.specname(row)}:{self.iconname(row)}'
+
+    def split(self, row: int) -> tuple[str, str]:
+        return self.specname(row), self.iconname(row)
+
+    def collection_range(self, specname: str):
+        i = self.collections.index(specname)
+        offsets = self.offsets
+        return range(offsets[i], offsets[i + 1])
+
+    def subset(self, collections: Iterable[str]):
+        """
+        Catalog of the given collections of this one.  It shares this
+        catalog's name table, so it may hold names that no row uses.
+        """
+        keep = set(collections)
+        specs = [k for k in self.collections if k in keep]
+        offsets = array('I', [0])
+        name_ids = array('I')
+        codepoints = array('I')
+        for spec in specs:
+            rows = self.collection_range(spec)
+            name_ids.extend(self.name_ids[rows.start:rows.stop])
+            codepoints.extend(self.codepoints[rows.start:rows.stop])
+            offsets.append(len(name_ids))
+
+        return IconCatalog(specs, offsets, self.names, name_ids, codepoints)
+
+    def find(self, specname: str, iconname: str):
+        """
+        Return the row of the given glyph, or -1 if it is not in the catalog.
+        """
+        try:
+            rows = self.collection_range(specname)
+        except ValueError:
+            return -1
+
+        names = self.names
+        i = bisect_left(names, iconname)
+        if i == len(names) or names[i] != iconname:
+            return -1
+
+        name_ids = self.name_ids
+        row = bisect_left(name_ids, i, rows.start, rows.stop)
+        return row if row < rows.stop and name_ids[row] == i else -1
+
+    def find_iconstring(self, iconstring: str):
+        specname, _, iconname = iconstring.partition(':')
+        return self.find(specname, iconname)
+
+    def order(self, sortkey: str = SORT_BY_COLLECTION) -> array:
+        """
+        Return the permutation of rows for the given sort order.  The
+        permutations are computed once and reused.
+        """
+        orders = self._orders
+        perm = orders.get(sortkey)
+        if perm is None:
+            rows = range(len(self))
+            if sortkey == SORT_BY_COLLECTION:
+                perm = array('I', rows)
+            elif sortkey == SORT_BY_NAME:
+                # stable on row, so ties stay in collection order
+                name_ids = self.name_ids
+                perm = array('I', sorted(rows, key=name_ids.__getitem__))
+            elif sortkey == SORT_BY_CODEPOINT:
+                cps = self.codepoints
+                perm = array('I', sorted(rows, key=cps.__getitem__))
+            else:
+                raise ValueError(f"Unknown sort order: {sortkey}")
+
+            orders[sortkey] = perm
+
+        return perm
+
+    def rank(self, sortkey: str = SORT_BY_COLLECTION) -> array:
+        "Inverse of `order`: the position of each row in that sort order"
+        perm = self.order(sortkey)
+        rank = array('I', [0])*len(perm)
+        for i, row in enumerate(perm):
+            rank[row] = i
+
+        return rank
+
+    def iconstrings(self):
+        "Iterate over the display strings of every row in catalog order"
+        collections = self.collections
+        names = self.names
+        offsets = self.offsets
+        name_ids = self.name_ids
+        for i, spec in enumerate(collections):
+            for row in range(offsets[i], offsets[i + 1]):
+                yield f'{spec}:{names[name_ids[row]]}'
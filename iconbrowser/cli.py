@@ -0,0 +1,410 @@
+"""
+Command-line lookups that never import Qt:
+
+    python -m iconbrowser search [--fuzzy] [-c COLLECTION] [QUERY ...]
+    python -m iconbrowser code [ICON ...]
+    python -m iconbrowser list [--collections] [COLLECTION ...]
+    python -m iconbrowser render [-s SIZE] [--color C] [-o DIR] [ICON ...]
+    python -m iconbrowser export [-q QUERY] [-s SIZE ...] [--color C ...]
+                                 [--sheets] [-o DIR] [ICON ...]
+    python -m iconbrowser bundle [-m MANIFEST] [-s SIZE ...] [-n NAME]
+                                 [-o DIR] [ICON ...]
+
+Queries and icons are read from stdin, one per line, when none are given
+on the command line, and `--json` writes one JSON object per result line.
+
+Requests go to the icon daemon (`python -m iconbrowser --serve`) if it is
+running.  Otherwise they are answered in-process with only pure-Python
+modules: the catalog comes from the snapshot in the cache directory, and
+if there is none yet it is built once by a child process that has to load
+the GUI.  Rendering without the daemon, exporting and bundling are the
+only cases that load Qt.
+"""
+import os
+import sys
+from argparse import ArgumentParser, Namespace
+from base64 import b64decode
+from collections.abc import Callable, Iterator
+from json import dumps as jdumps
+from pathlib import Path
+from subprocess import run
+
+from .version import __version__
+from .catalog import IconCatalog
+from .cachedir import get_cache_dir
+from .snapshot import CATALOG_SNAPSHOT_NAME, snapshot_stamp, load_snapshot
+from .service import (
+    IconService, Request, Response, ServiceError, DEFAULT_RENDER_SIZE,
+    parse_color,
+)
+from .export import (
+    ExportIcon, EXPORT_INDEX_NAME, DEFAULT_EXPORT_SIZES,
+    DEFAULT_SHEET_COLUMNS,
+)
+from .bundle import DEFAULT_BUNDLE_NAME, DEFAULT_BUNDLE_SIZES, read_manifest
+from .client import DaemonClient
+
+COMMANDS = ('search', 'code', 'list', 'render', 'export', 'bundle')
+Client = Callable[[Request], Response]
+
+
+class CliError(Exception):
+    pass
+
+
+def load_catalog() -> IconCatalog:
+    path = get_cache_dir()/CATALOG_SNAPSHOT_NAME
+    stamp = snapshot_stamp()
+    catalog = load_snapshot(path, stamp)
+    if catalog is None:
+        # reading the font specs means importing pyrandyos.gui, and with it
+        # Qt, so leave that to a child process
+        print('Building the icon catalog snapshot...', file=sys.stderr)
+        child = run([sys.executable, '-m', 'iconbrowser', '--build-catalog'])
+        if child.returncode:
+            raise CliError('Building the icon catalog snapshot failed '
+                           f'(exit status {child.returncode})')
+
+        catalog = load_snapshot(path, stamp)
+
+    if catalog is None:
+        raise CliError(f'No icon catalog snapshot in {path.parent}; run '
+                       '"python -m iconbrowser --build-catalog"')
+
+    return catalog
+
+
+def inputs(args: list[str]) -> Iterator[str]:
+    "The command-line arguments, or else the non-blank lines of stdin"
+    if args:
+        yield from args
+        return
+
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def open_client(path: Path = None) -> Client:
+    """
+    Send requests to the daemon if one is running, or else answer them
+    in-process, loading the catalog on the first request.
+    """
+    client = DaemonClient.connect(path)
+    if client is not None:
+        return client
+
+    service: IconService = None
+
+    def local(request: Request) -> Response:
+        nonlocal service
+        if service is None:
+            service = IconService(load_catalog(), postings=False)
+            if request.get('op') == 'render':
+                # only rendering needs Qt; see `gui.server`
+                from .gui.server import PngRenderer
+                service.renderer = PngRenderer()
+
+        return service.handle(request)
+
+    return local
+
+
+def call(client: Client, request: Request) -> Response:
+    response = client(request)
+    if not response.get('ok'):
+        raise CliError(response.get('error', 'request failed'))
+
+    return response
+
+
+def write(line: str):
+    sys.stdout.write(line + '\n')
+
+
+def cmd_search(client: Client, opts: Namespace):
+    request = {'op': 'search', 'collection': opts.collection,
+               'fuzzy': opts.fuzzy, 'limit': opts.limit}
+    for query in inputs(opts.queries):
+        response = call(client, dict(request, query=query))
+        for rank, rec in enumerate(response['results']):
+            if opts.json:
+                write(jdumps(dict(query=query, rank=rank, **rec)))
+            else:
+                write(rec['icon'])
+
+        # results of one query at a time for callers reading as they go
+        sys.stdout.flush()
+
+    return 0
+
+
+def cmd_code(client: Client, opts: Namespace):
+    status = 0
+    for icon in inputs(opts.icons):
+        (rec,) = call(client, {'op': 'code', 'icons': [icon]})['results']
+        if 'error' in rec:
+            status = 1
+
+        if opts.json:
+            write(jdumps(rec))
+        elif 'error' in rec:
+            print(f'Unknown icon: {icon}', file=sys.stderr)
+        else:
+            sys.stdout.write(rec['code'])
+
+        sys.stdout.flush()
+
+    return status
+
+
+def cmd_list(client: Client, opts: Namespace):
+    response = call(client, {'op': 'list', 'collections': opts.collection,
+                             'counts': opts.collections})
+    key = 'collection' if opts.collections else 'icon'
+    for rec in response['results']:
+        write(jdumps(rec) if opts.json else rec[key])
+
+    return 0
+
+
+def cmd_render(client: Client, opts: Namespace):
+    outdir: Path = opts.output
+    outdir.mkdir(parents=True, exist_ok=True)
+    for icon in inputs(opts.icons):
+        rec = call(client, {'op': 'render', 'icon': icon, 'size': opts.size,
+                            'color': opts.color})
+        path = outdir/f"{rec['collection']}-{rec['name']}-{opts.size}.png"
+        path.write_bytes(b64decode(rec['png']))
+        write(str(path))
+
+    return 0
+
+
+def export_selection(client: Client, opts: Namespace):
+    """
+    The icons to export or bundle: a query's results, the given ones (plus
+    any in the manifest) or a collection
+    """
+    if opts.query is not None:
+        request = {'op': 'search', 'query': opts.query,
+                   'collection': opts.collection, 'fuzzy': opts.fuzzy}
+    elif opts.manifest is not None:
+        try:
+            icons = opts.icons + list(read_manifest(opts.manifest))
+        except OSError as e:
+            raise CliError(f'Cannot read the manifest: {e}') from None
+
+        request = {'op': 'lookup', 'icons': icons}
+    elif opts.icons or not opts.collection:
+        request = {'op': 'lookup', 'icons': list(inputs(opts.icons))}
+    else:
+        request = {'op': 'list', 'collections': [opts.collection]}
+
+    icons: list[ExportIcon] = list()
+    for rec in call(client, request)['results']:
+        if 'error' in rec:
+            print(f"Unknown icon: {rec['icon']}", file=sys.stderr)
+        else:
+            icons.append((rec['collection'], rec['name'], rec['codepoint']))
+
+    return icons
+
+
+def show_progress(done: int, total: int):
+    print(f'\r{done:,}/{total:,}', end='', file=sys.stderr, flush=True)
+
+
+def check_sizes(sizes: list[int]):
+    if not all(0 < s <= 1024 for s in sizes):
+        raise CliError(f'Bad size in {sizes}')
+
+    return sizes
+
+
+def cmd_export(client: Client, opts: Namespace):
+    sizes = check_sizes(opts.size or DEFAULT_EXPORT_SIZES)
+
+    if opts.columns < 1:
+        raise CliError(f'Bad number of columns: {opts.columns}')
+
+    try:
+        colors = [parse_color(c) for c in opts.color or (None,)]
+    except ServiceError as e:
+        raise CliError(str(e)) from None
+
+    icons = export_selection(client, opts)
+    if not icons:
+        raise CliError('No icons to export')
+
+    # the only command that always needs Qt, in the rendering processes
+    from .gui.export import export_icons
+    progress = show_progress if sys.stderr.isatty() else None
+    total, elapsed = export_icons(icons, opts.output, sizes, colors,
+                                  opts.sheets, opts.columns, opts.jobs,
+                                  progress)
+    if progress:
+        print(file=sys.stderr)
+
+    print(f'Exported {total:,} images of {len(icons):,} icons in '
+          f'{elapsed:.1f} s ({total/max(elapsed, 1e-9):,.0f} icons/s)',
+          file=sys.stderr)
+    write(str(opts.output/EXPORT_INDEX_NAME))
+    return 0
+
+
+def cmd_bundle(client: Client, opts: Namespace):
+    sizes = check_sizes(opts.size or DEFAULT_BUNDLE_SIZES)
+    if not opts.name.isidentifier():
+        raise CliError(f'Not a module name: {opts.name}')
+
+    try:
+        color = None if opts.color is None else parse_color(opts.color)
+    except ServiceError as e:
+        raise CliError(str(e)) from None
+
+    icons = export_selection(client, opts)
+    if not icons:
+        raise CliError('No icons to bundle')
+
+    from .gui.render import offscreen_app
+    from .gui.bundle import build_bundle, prepare_fonts
+    offscreen_app()
+    prepare_fonts(icons)
+    progress = show_progress if sys.stderr.isatty() else None
+    total, elapsed = build_bundle(icons, opts.output, opts.name, sizes,
+                                  color, progress)
+    if progress:
+        print(file=sys.stderr)
+
+    print(f'Bundled {total:,} icons in {elapsed:.1f} s', file=sys.stderr)
+    write(str(opts.output/f'{opts.name}.py'))
+    return 0
+
+
+def add_selection_args(p: ArgumentParser):
+    "Arguments read by `export_selection`"
+    p.add_argument('icons', nargs='*', metavar='ICON',
+                   help="icon as 'Collection:name' (default: one per line "
+                   "on stdin, unless another option selects the icons)")
+    p.add_argument('-m', '--manifest', type=Path,
+                   help="file listing icons one per line ('#' comments)")
+    p.add_argument('-q', '--query',
+                   help="take the icons matching this query instead")
+    p.add_argument('-c', '--collection',
+                   help="only search this collection, or take all of it "
+                   "when there is no query")
+    p.add_argument('-f', '--fuzzy', action='store_true',
+                   help="ranked fuzzy matching for --query")
+
+
+def create_cli_parser():
+    parser = ArgumentParser(prog='python -m iconbrowser',
+                            description="Look up icon font glyphs without "
+                            "starting the browser")
+    parser.add_argument('--version', action='version',
+                        version=f'%(prog)s {__version__}')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('search', help="print the icons matching each query")
+    p.add_argument('queries', nargs='*', metavar='QUERY',
+                   help="substring to look for (default: one per line on "
+                   "stdin)")
+    p.add_argument('-c', '--collection',
+                   help="only search this collection")
+    p.add_argument('-f', '--fuzzy', action='store_true',
+                   help="ranked fuzzy matching instead of substrings")
+    p.add_argument('-n', '--limit', type=int, default=None, metavar='N',
+                   help="at most N results per query")
+    p.add_argument('--json', action='store_true',
+                   help="write one JSON object per line")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser('code', help="print the PyRandyOS code for icons")
+    p.add_argument('icons', nargs='*', metavar='ICON',
+                   help="icon as 'Collection:name' (default: one per line "
+                   "on stdin)")
+    p.add_argument('--json', action='store_true',
+                   help="write one JSON object per line")
+    p.set_defaults(func=cmd_code)
+
+    p = sub.add_parser('list', help="print every icon")
+    p.add_argument('collection', nargs='*', metavar='COLLECTION',
+                   help="only list these collections")
+    p.add_argument('--collections', action='store_true',
+                   help="list the collections instead of the icons")
+    p.add_argument('--json', action='store_true',
+                   help="write one JSON object per line")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser('render', help="render icons to PNG files (needs Qt "
+                       "unless the daemon is running)")
+    p.add_argument('icons', nargs='*', metavar='ICON',
+                   help="icon as 'Collection:name' (default: one per line "
+                   "on stdin)")
+    p.add_argument('-s', '--size', type=int, default=DEFAULT_RENDER_SIZE,
+                   help="icon size in pixels")
+    p.add_argument('--color', default=None,
+                   help="'#rrggbb' or '#aarrggbb' (default: black)")
+    p.add_argument('-o', '--output', type=Path, default=Path('.'),
+                   help="directory to write the files to")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser('export', help="render many icons at several sizes "
+                       "and colors to PNG files or sprite sheets, with a "
+                       "JSON index (needs Qt)")
+    add_selection_args(p)
+    p.add_argument('-s', '--size', type=int, action='append',
+                   help="icon size in pixels; repeat for several sizes "
+                   "(default: "
+                   f"{', '.join(map(str, DEFAULT_EXPORT_SIZES))})")
+    p.add_argument('--color', action='append',
+                   help="'#rrggbb' or '#aarrggbb'; repeat for several colors "
+                   "(default: black)")
+    p.add_argument('--sheets', action='store_true',
+                   help="pack the icons into sprite sheets instead of one "
+                   "file per image")
+    p.add_argument('--columns', type=int, default=DEFAULT_SHEET_COLUMNS,
+                   help="icons per line of a sprite sheet")
+    p.add_argument('-j', '--jobs', type=int, default=None,
+                   help="rendering processes (default: one per CPU)")
+    p.add_argument('-o', '--output', type=Path, default=Path('.'),
+                   help="directory to write the files to")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('bundle', help="pre-render icons into a resource "
+                       "bundle: a glyph blob and a Python module of "
+                       "IconSpec-like accessors (needs Qt)")
+    add_selection_args(p)
+    p.add_argument('-s', '--size', type=int, action='append',
+                   help="size in pixels to pre-render; repeat for several "
+                   "sizes (default: "
+                   f"{', '.join(map(str, DEFAULT_BUNDLE_SIZES))})")
+    p.add_argument('--color', default=None,
+                   help="fixed '#rrggbb' or '#aarrggbb' color (default: the "
+                   "palette's window text color, like an IconSpec)")
+    p.add_argument('-n', '--name', default=DEFAULT_BUNDLE_NAME,
+                   help="name of the generated module")
+    p.add_argument('-o', '--output', type=Path, default=Path('.'),
+                   help="directory to write the module and blob to")
+    p.set_defaults(func=cmd_bundle)
+    return parser
+
+
+def run_cli(args: list[str]):
+    parser = create_cli_parser()
+    opts = parser.parse_args(args)
+    client = open_client()
+    try:
+        return opts.func(client, opts)
+    except CliError as e:
+        parser.exit(2, f'{parser.prog}: error: {e}\n')
+    except BrokenPipeError:
+        # e.g. piped into head: stop quietly, including the final flush
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    finally:
+        if isinstance(client, DaemonClient):
+            client.close()
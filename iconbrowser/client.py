@@ -0,0 +1,92 @@
+"""
+Client side of the icon daemon protocol (see `daemon`), kept apart so that
+connecting does not import asyncio.
+"""
+import os
+import socket
+from json import dumps as jdumps, loads as jloads
+from pathlib import Path
+
+from .cachedir import get_cache_dir
+from .service import Request, Response
+
+SOCKET_ENV = 'ICONBROWSER_SOCKET'
+SOCKET_NAME = 'daemon.sock'
+# longest request or response line; listing every icon is a few MB
+LINE_LIMIT = 1 << 26
+CONNECT_TIMEOUT = 0.5
+
+
+def default_socket_path():
+    path = os.environ.get(SOCKET_ENV)
+    return Path(path) if path else get_cache_dir()/SOCKET_NAME
+
+
+def encode(message: Request | Response):
+    return jdumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+def decode(line: bytes) -> Request:
+    request = jloads(line)
+    if not isinstance(request, dict):
+        raise ValueError('A request must be a JSON object')
+
+    return request
+
+
+class DaemonClient:
+    "Blocking connection to a running daemon, one request at a time"
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.file = sock.makefile('rwb')
+        self.next_id = 0
+
+    @classmethod
+    def connect(cls, path: Path = None):
+        "Connect to the daemon, or return None if none is running"
+        if not hasattr(socket, 'AF_UNIX'):
+            return None
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path or default_socket_path()))
+        except OSError:
+            sock.close()
+            return None
+
+        sock.settimeout(None)
+        return cls(sock)
+
+    def __call__(self, request: Request) -> Response:
+        if 'id' not in request:
+            self.next_id += 1
+            request = dict(request, id=self.next_id)
+
+        f = self.file
+        f.write(encode(request))
+        f.flush()
+        line = f.readline()
+        if not line:
+            raise ConnectionError('The icon daemon closed the connection')
+
+        return jloads(line)
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_running(path: Path = None):
+    client = DaemonClient.connect(path)
+    if client is None:
+        return False
+
+    client.close()
+    return True
@@ -0,0 +1,84 @@
+"""
+Icon lookup daemon: keeps an `IconService` (catalog, search index and
+rendered PNGs) warm and answers requests over a Unix domain socket.
+
+The protocol is one JSON object per line in each direction: each request
+line gets exactly one response line, in order.  Any number of clients can
+be connected at once.  Requests are answered on the event loop, so one
+client's request never interleaves with another's.
+"""
+import asyncio
+from pathlib import Path
+
+from .service import IconService
+from .client import (
+    LINE_LIMIT, default_socket_path, encode, decode, is_running,
+)
+
+
+class IconDaemon:
+    def __init__(self, service: IconService, path: Path = None):
+        self.service = service
+        self.path = path or default_socket_path()
+        self.server: asyncio.AbstractServer = None
+        self.clients = 0
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter):
+        self.clients += 1
+        service = self.service
+        try:
+            while line := await reader.readline():
+                try:
+                    request = decode(line)
+                except ValueError as e:
+                    response = {'id': None, 'ok': False,
+                                'error': f'Bad request: {e}'}
+                else:
+                    if request.get('op') == 'shutdown':
+                        writer.write(encode({'id': request.get('id'),
+                                             'ok': True}))
+                        await writer.drain()
+                        self.server.close()
+                        break
+
+                    try:
+                        response = service.handle(request)
+                    except Exception as e:
+                        # a bug in a handler fails the request, but the
+                        # client still gets its response line
+                        response = {'id': request.get('id'), 'ok': False,
+                                    'error': f'Internal error: {e!r}'}
+
+                writer.write(encode(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            # the client went away or sent an absurdly long line
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def serve(self):
+        path = self.path
+        if is_running(path):
+            raise RuntimeError(f'An icon daemon is already listening on '
+                               f'{path}')
+
+        # left behind by a daemon that did not shut down cleanly
+        path.unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self.handle_client,
+                                                 path=str(path),
+                                                 limit=LINE_LIMIT)
+        self.server = server
+        try:
+            async with server:
+                await server.wait_closed()
+        finally:
+            path.unlink(missing_ok=True)
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,147 @@
+"""
+Planning for bulk exports of rendered icons.
+
+An export renders a list of icons at every combination of the requested
+sizes and colors, either to one PNG file per image or packed into sprite
+sheets, and writes a JSON index describing where each image went.  The
+layout is decided here, without Qt, and split into `ExportTask`s that the
+rendering processes (see `gui.export`) carry out independently.
+"""
+from collections.abc import Iterable, Sequence
+from json import dumps as jdumps
+from pathlib import Path
+
+from .version import __version__
+
+# (collection, icon name, codepoint)
+ExportIcon = tuple[str, str, int]
+
+EXPORT_INDEX_NAME = 'index.json'
+DEFAULT_EXPORT_SIZES = (16, 24, 32, 48)
+DEFAULT_SHEET_COLUMNS = 32
+# images in one sprite sheet, and icons per task when writing files
+MAX_SHEET_ICONS = 1024
+FILES_PER_TASK = 256
+
+
+def color_name(color: int):
+    "'#rrggbb' for an opaque ARGB color, '#aarrggbb' otherwise"
+    if color >> 24 == 0xff:
+        return f'#{color & 0xffffff:06x}'
+
+    return f'#{color:08x}'
+
+
+def icon_filename(collection: str, name: str, size: int, color: int):
+    return f'{collection}-{name}-{size}-{color:08x}.png'
+
+
+def sheet_filename(size: int, color: int, sheet: int):
+    return f'sheet-{size}-{color:08x}-{sheet:03d}.png'
+
+
+class ExportTask:
+    """
+    Icons to render at one size and color, either to individual files or,
+    when `sheet` is set, as one sprite sheet of `columns` icons per line.
+    """
+    def __init__(self, icons: Sequence[ExportIcon], size: int, color: int,
+                 sheet: int = None, columns: int = DEFAULT_SHEET_COLUMNS):
+        self.icons = icons
+        self.size = size
+        self.color = color
+        self.sheet = sheet
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.icons)
+
+    @property
+    def filename(self):
+        "Sprite sheet file name, or None when writing individual files"
+        if self.sheet is None:
+            return None
+
+        return sheet_filename(self.size, self.color, self.sheet)
+
+    def sheet_size(self):
+        "Width and height of the sprite sheet in pixels"
+        columns = min(self.columns, len(self.icons))
+        lines = -(-len(self.icons)//self.columns)
+        return columns*self.size, lines*self.size
+
+    def position(self, i: int):
+        "Top left corner of the `i`th icon in the sprite sheet"
+        size = self.size
+        line, column = divmod(i, self.columns)
+        return column*size, line*size
+
+    def entries(self):
+        "Index entries of the images this task writes, one per icon"
+        size = self.size
+        color = color_name(self.color)
+        sheet = self.filename
+        for i, (collection, name, _) in enumerate(self.icons):
+            entry = {'size': size, 'color': color}
+            if sheet is None:
+                entry['file'] = icon_filename(collection, name, size,
+                                              self.color)
+            else:
+                x, y = self.position(i)
+                entry.update(file=sheet, x=x, y=y)
+
+            yield f'{collection}:{name}', entry
+
+
+def plan_export(icons: Sequence[ExportIcon], sizes: Iterable[int],
+                colors: Iterable[int], sheets: bool = False,
+                columns: int = DEFAULT_SHEET_COLUMNS,
+                sheet_icons: int = MAX_SHEET_ICONS):
+    """
+    Split an export into tasks.  Sprite sheets hold up to `sheet_icons`
+    icons, rounded down to whole lines; individual files are written
+    `FILES_PER_TASK` icons per task so the work spreads across processes.
+    """
+    colors = list(colors)
+    chunk = (max(columns, sheet_icons//columns*columns) if sheets
+             else FILES_PER_TASK)
+    tasks: list[ExportTask] = list()
+    for size in sizes:
+        for color in colors:
+            for i, start in enumerate(range(0, len(icons), chunk)):
+                tasks.append(ExportTask(icons[start:start + chunk], size,
+                                        color, i if sheets else None,
+                                        columns))
+
+    return tasks
+
+
+def export_index(icons: Sequence[ExportIcon], tasks: Iterable[ExportTask]):
+    """
+    The JSON index of an export: for each icon its codepoint and the file
+    (and, in a sprite sheet, the position) of every image of it.
+    """
+    tasks = list(tasks)
+    index = {
+        iconstring: {'codepoint': cp, 'images': list()}
+        for iconstring, cp in ((f'{c}:{n}', cp) for c, n, cp in icons)
+    }
+    for task in tasks:
+        for iconstring, entry in task.entries():
+            index[iconstring]['images'].append(entry)
+
+    return {
+        'version': __version__,
+        'sizes': sorted({t.size for t in tasks}),
+        'colors': list(dict.fromkeys(color_name(t.color) for t in tasks)),
+        'sheets': [t.filename for t in tasks if t.sheet is not None],
+        'icons': index,
+    }
+
+
+def write_index(outdir: Path, icons: Sequence[ExportIcon],
+                tasks: Iterable[ExportTask]):
+    path = outdir/EXPORT_INDEX_NAME
+    path.write_text(jdumps(export_index(icons, tasks), indent=1),
+                    encoding='utf-8')
+    return path
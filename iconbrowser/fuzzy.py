@@ -0,0 +1,253 @@
+from copy import copy
+
+import numpy as np
+
+from .catalog import range_covers
+from .search import TrigramIndex
+
+SEPARATORS = b'-_. :'
+MATCH_SCORE = 1.0
+CONSECUTIVE_BONUS = 2.0
+BOUNDARY_BONUS = 3.0
+EXACT_BONUS = 10.0
+LEADING_GAP_PENALTY = 0.05
+LENGTH_PENALTY = 0.02
+# names are scored in groups padded to these widths
+BUCKET_WIDTHS = (8, 16, 24, 32, 40)
+
+
+def char_bits(s: bytes):
+    "Map each byte to one of 64 bits, for cheap 'has all these chars' tests"
+    bits = 0
+    for c in s:
+        bits |= 1 << (c % 64)
+
+    return bits
+
+
+def encode_names(names: list[str], width: int):
+    """
+    Pack the names into a zero-padded (len(names), width) uint8 matrix.
+    Non-ASCII characters become '?'; they are rare in icon names.
+    """
+    raw = [n.encode('ascii', 'replace') for n in names]
+    buf = b''.join(r.ljust(width, b'\0') for r in raw)
+    return np.frombuffer(buf, np.uint8).reshape(len(raw), width)
+
+
+def score_token_py(token: bytes, s: bytes):
+    """
+    Scalar version of the scoring done by `FuzzyMatcher.score_token`, for
+    the handful of collection names.  Returns -inf if `token` is not a
+    subsequence of `s`.
+    """
+    if not token:
+        return -np.inf
+
+    score = 0.0
+    pos = -1
+    for i, c in enumerate(token):
+        newpos = s.find(bytes((c,)), pos + 1)
+        if newpos < 0:
+            return -np.inf
+
+        score += MATCH_SCORE
+        if i and newpos == pos + 1:
+            score += CONSECUTIVE_BONUS
+
+        if not newpos or s[newpos - 1] in SEPARATORS:
+            score += BOUNDARY_BONUS
+
+        if not i:
+            score -= LEADING_GAP_PENALTY*newpos
+
+        pos = newpos
+
+    if token == s:
+        score += EXACT_BONUS
+
+    return score - LENGTH_PENALTY*len(s)
+
+
+class FuzzyMatcher:
+    """
+    Ranked subsequence matching over the catalog of a `TrigramIndex`.
+
+    Each whitespace-separated token of a query must appear in order, though
+    not necessarily contiguously, in either the glyph name or the collection
+    name.  The score rewards consecutive runs, matches at word boundaries,
+    early matches, exact names and short names.
+
+    Glyph names are scored once each, in batched NumPy passes over
+    zero-padded byte matrices grouped by name length, and the scores are
+    then gathered to rows.  Token scores are kept for the next query, so
+    typing only rescores the token being edited, and a token that extends a
+    previous one is only checked against the names that matched before.
+    A search within a row range only scores the names used in that range.
+    """
+    def __init__(self, index: TrigramIndex):
+        self.index = index
+        catalog = index.catalog
+        names = index.names
+        lengths = np.fromiter(map(len, names), np.int64, len(names))
+        self.lengths = lengths
+        seps = np.frombuffer(SEPARATORS, np.uint8)
+        buckets = []
+        lo = 0
+        for width in BUCKET_WIDTHS + (max(lengths.max(initial=0), 1),):
+            ids = np.flatnonzero((lengths > lo) & (lengths <= width))
+            lo = width
+            if not len(ids):
+                continue
+
+            chars = encode_names([names[i] for i in ids], width)
+            boundary = np.empty(chars.shape, bool)
+            boundary[:, 0] = True
+            boundary[:, 1:] = np.isin(chars[:, :-1], seps)
+            bits = np.bitwise_or.reduce(
+                np.where(chars, np.uint64(1) << (chars % 64).astype(np.uint64),
+                         np.uint64(0)),
+                axis=1,
+            )
+            buckets.append((ids, chars, boundary, bits))
+
+        self.buckets = buckets
+        self.name_ids = np.frombuffer(catalog.name_ids, np.uint32)
+        self.coll_ids = np.frombuffer(catalog.coll_ids, np.uint16)
+        self.collections = [c.encode('ascii', 'replace')
+                            for c in index.collections]
+        self.token_scores: dict[bytes, np.ndarray] = dict()
+        # row range each cached token score covers (None for every row)
+        self.token_scopes: dict[bytes, range | None] = dict()
+        self.scope: tuple[range, np.ndarray] = None
+
+    def fork(self):
+        """
+        A matcher sharing the name matrices of this one but with its own
+        query state, so that each can be used from a different thread.
+        """
+        matcher = copy(self)
+        matcher.token_scores = dict()
+        matcher.token_scopes = dict()
+        matcher.scope = None
+        return matcher
+
+    def scope_names(self, within: range = None) -> np.ndarray | None:
+        "Mask of the glyph names used by the rows in `within`, or None"
+        if within is None or len(within) >= len(self.name_ids):
+            return None
+
+        scope = self.scope
+        if scope is None or scope[0] != within:
+            mask = np.zeros(len(self.lengths), bool)
+            mask[self.name_ids[within.start:within.stop]] = True
+            scope = (within, mask)
+            self.scope = scope
+
+        return scope[1]
+
+    def score_token(self, token: bytes, within: range = None) -> np.ndarray:
+        """
+        Score every glyph name used in `within` (by default, every name)
+        against one lowercase token; -inf where it does not match.
+        """
+        token_scores = self.token_scores
+        scopes = self.token_scopes
+        cached = token_scores.get(token)
+        if cached is not None and range_covers(scopes[token], within):
+            return cached
+
+        # a name that matches `token` also matches any prefix of it
+        prev = max((t for t in token_scores if token.startswith(t)
+                    and range_covers(scopes[t], within)),
+                   key=len, default=None)
+        allowed = self.scope_names(within)
+        scope = None if allowed is None else within
+        if prev is not None:
+            matched = token_scores[prev] > -np.inf
+            allowed = matched if allowed is None else allowed & matched
+
+        out = np.full(len(self.lengths), -np.inf, np.float32)
+        tbits = np.uint64(char_bits(token))
+        for ids, chars, boundary, bits in self.buckets:
+            keep = (bits & tbits) == tbits
+            if allowed is not None:
+                keep &= allowed[ids]
+
+            keep = np.flatnonzero(keep)
+            if len(keep):
+                names, score = self.score_bucket(token, chars[keep],
+                                                 boundary[keep])
+                out[ids[keep[names]]] = score
+
+        token_scores[token] = out
+        scopes[token] = scope
+        return out
+
+    def score_bucket(self, token: bytes, chars: np.ndarray,
+                     boundary: np.ndarray):
+        """
+        Greedily match `token` as a subsequence of each row of `chars`.
+        Returns the indices of the rows that matched and their scores.
+        """
+        n, width = chars.shape
+        keep = np.arange(n)
+        score = np.zeros(n, np.float32)
+        pos = np.full(n, -1)
+        cols = np.arange(width)
+        for i, c in enumerate(token):
+            # only look right of the leftmost previous match
+            lo = int(pos.min()) + 1
+            hit = chars[:, lo:] == c
+            if i:
+                hit &= cols[lo:] > pos[:, None]
+
+            rows = np.arange(len(keep))
+            newpos = hit.argmax(axis=1)
+            found = hit[rows, newpos]
+            newpos += lo
+            if not found.all():
+                keep, chars = keep[found], chars[found]
+                boundary = boundary[found]
+                score, pos, newpos = score[found], pos[found], newpos[found]
+                rows = rows[:len(keep)]
+                if not len(keep):
+                    break
+
+            score += MATCH_SCORE + BOUNDARY_BONUS*boundary[rows, newpos]
+            if i:
+                score += CONSECUTIVE_BONUS*(newpos == pos + 1)
+            else:
+                score -= LEADING_GAP_PENALTY*newpos
+
+            pos = newpos
+
+        lengths = (chars != 0).sum(axis=1)
+        score += (EXACT_BONUS*(lengths == len(token))
+                  - LENGTH_PENALTY*lengths)
+        return keep, score
+
+    def search(self, query: str, within: range = None) -> np.ndarray:
+        """
+        Return the catalog rows matching every token of `query`, best match
+        first.  Ties keep catalog order.  If `within` is given, only rows in
+        that range are returned.
+        """
+        tokens = [t.encode('ascii', 'replace') for t in query.lower().split()]
+        start, stop = ((within.start, within.stop) if within is not None
+                       else (0, len(self.name_ids)))
+        name_ids = self.name_ids[start:stop]
+        coll_ids = self.coll_ids[start:stop]
+        total = np.zeros(stop - start, np.float32)
+        for token in tokens:
+            scores = self.score_token(token, within)
+            spec_scores = np.array([score_token_py(token, c)
+                                    for c in self.collections], np.float32)
+            total += np.maximum(scores[name_ids], spec_scores[coll_ids])
+
+        # only keep the scores of this query's tokens for the next one
+        self.token_scores = {t: self.token_scores[t] for t in tokens}
+        self.token_scopes = {t: self.token_scopes[t] for t in tokens}
+        rows = np.flatnonzero(total > -np.inf)
+        order = np.argsort(-total[rows], kind='stable')
+        return rows[order] + start
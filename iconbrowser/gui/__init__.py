@@ -1,12 +1,35 @@
-from PySide2.QtGui import QIcon
+from functools import partial
+from typing import TYPE_CHECKING
+
+from pyrandyos.config.keys import LOCAL_CFG_KEY
+from pyrandyos.gui import GuiQtWrapper
 from pyrandyos.gui.gui_app import GuiApp
+from pyrandyos.gui.qt import qVersion, QTimer
+from pyrandyos.gui.qrc import compile_qrc, import_qrc
+from pyrandyos.gui.loadstatus import register_load_step
+from pyrandyos.gui.callback import qt_callback
 
+from ..app import IconBrowserApp, LAUNCH_TIME
+from ..metrics import METRICS
 from ..logging import (
     log_func_call as _log_func_call,
+    log_debug as _log_debug,
 )
+from .fonts import init_app_fonts
 from .splash import SplashScreen
 from .gui_icons import ProgramIcon
-from .main import MainWindow
+from .constants import (
+    STAGED_LOAD_STEPS, LOAD_STEP_GUI, LOAD_STEP_INIT_THEMES,
+)
+from .loadsteps import timed_load_step
+if TYPE_CHECKING:
+    from pyrandyos.gui.qt import QIcon
+    from .main import MainWindow
+
+# the main window's modules are only imported once the splash is up, so its
+# steps are registered here for the splash to count them
+for _step in STAGED_LOAD_STEPS:
+    register_load_step(_step)
 
 
 class IconBrowserGui(GuiApp):
@@ -15,23 +38,88 @@ class IconBrowserGui(GuiApp):
     @_log_func_call
     def __init__(self, app_args: list[str], *firstwin_args,
                  **firstwin_kwargs):
+        METRICS.origin = LAUNCH_TIME
         super().__init__(app_args, *firstwin_args, **firstwin_kwargs)
         self.splash: SplashScreen
-        self.icon: QIcon = None
+        self.icon: 'QIcon' = None
 
     @_log_func_call
     def create_first_window(self, *args, **kwargs):
+        self.open_window()
+
+    @_log_func_call
+    def open_window(self):
+        """
+        Open another main window.  Windows share the catalog, search index
+        and rendered glyphs, so any after the first open almost instantly.
+        """
+        # the main window pulls in most of the application
+        from .main import MainWindow
         mw = MainWindow()
         self.windows.append(mw)
         mwview = mw.gui_view
         mwview.show()
         mwview.bring_to_front()
+        return mw
 
     @_log_func_call
+    def window_closed(self, window: 'MainWindow'):
+        # dropped once its close event is over, which deletes it
+        remove = partial(self.windows.remove, window)
+        QTimer.singleShot(0, qt_callback(remove))
+
+    @timed_load_step(LOAD_STEP_GUI, show_step_done=True,
+                     show_step_start=False)
+    @_log_func_call
     def init_gui(self, app_args: list[str], *firstwin_args, **firstwin_kwargs):
-        super().init_gui(app_args, *firstwin_args, **firstwin_kwargs)
-        self.load_icon()
-        super().close_splash(self.windows[0].gui_view.qtobj)
+        """
+        Same steps as `GuiApp.init_gui`, except that no icon fonts are loaded
+        here (see `fonts.load_collection`) and only the shell of the main
+        window is created.  The window builds the rest, applies the theme
+        and loads the catalog in later passes of the event loop, then calls
+        `startup_done`, which closes the splash.
+        """
+        _log_debug('starting app main')
+        compile_qrc()
+        import_qrc()
+
+        app = self.create_qt_inst(app_args)
+        GuiQtWrapper.__init__(self, app)
+        IconBrowserApp.set('Qt_version', qVersion())
+
+        splash = self.create_splash()
+        if splash:
+            splash.show()
+            app.processEvents()
+            self.splash = splash
+
+        init_app_fonts()
+        # a step of `GuiApp`, so timed here
+        METRICS.phase_started(LOAD_STEP_INIT_THEMES)
+        self.init_themes()
+        METRICS.phase_done(LOAD_STEP_INIT_THEMES)
+        self.create_first_window(*firstwin_args, **firstwin_kwargs)
+        self.gui_initialized = True
+        self.qtobj.aboutToQuit.connect(qt_callback(self.save_caches))
+
+    @_log_func_call
+    def startup_done(self, window: 'MainWindow'):
+        "Called by a window once its staged startup has finished"
+        if self.icon is None:
+            self.load_icon()
+
+        super().close_splash(window.gui_view.qtobj)
+
+    @_log_func_call
+    def get_theme(self):
+        "The theme applied, or until one is, the configured theme"
+        return (super().get_theme()
+                or IconBrowserApp[f'{LOCAL_CFG_KEY}.theme'])
+
+    @_log_func_call
+    def save_caches(self):
+        from .main.library import get_icon_library
+        get_icon_library().save_atlas()
 
     @_log_func_call
     def create_splash(self):
@@ -0,0 +1,197 @@
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from pyrandyos.gui.qt import QImage, QColor, QPalette, QApplication
+from pyrandyos.gui.styles import ThemeMap
+from pyrandyos.gui.icons.iconfont.sources import THIRDPARTY_FONTSPEC
+
+from ..version import __version__
+from ..logging import log_func_call, log_info, log_debug, log_warning
+from ..cachedir import get_cache_dir
+from ..atlas import (
+    GlyphAtlas, AtlasKey, atlas_filename, file_md5, list_atlases,
+    clear_atlases,
+)
+from .fonts import load_collection
+from .render import prepare_font, render_glyph, offscreen_app
+
+ATLAS_DIR_NAME = 'atlas'
+
+
+def image_bytes(image: QImage) -> bytes:
+    "Raw premultiplied ARGB pixels of `image`, as stored in an atlas"
+    image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    return bytes(image.constBits())[:image.sizeInBytes()]
+
+
+class AtlasStore:
+    """
+    Directory of `GlyphAtlas` files, one per (collection, size, color).
+
+    Atlases are opened lazily and kept mapped.  Files built from another
+    font file or package version are deleted the first time they are
+    looked at.
+    """
+    def __init__(self, directory: Path = None, version: str = __version__):
+        self.directory = directory or get_cache_dir(ATLAS_DIR_NAME)
+        self.version = version
+        self.font_hashes: dict[str, str] = dict()
+        self.atlases: dict[AtlasKey, GlyphAtlas | None] = dict()
+
+    def font_hash(self, specname: str):
+        h = self.font_hashes.get(specname)
+        if h is None:
+            load_collection(specname)
+            spec = THIRDPARTY_FONTSPEC[specname]
+            h = file_md5(spec.ttf_filespec.get_local_path())
+            self.font_hashes[specname] = h
+
+        return h
+
+    def path(self, key: AtlasKey):
+        return self.directory/atlas_filename(*key)
+
+    def atlas(self, specname: str, size: int, color: int):
+        key = (specname, size, color)
+        atlases = self.atlases
+        if key in atlases:
+            return atlases[key]
+
+        path = self.path(key)
+        atlas = None
+        if path.exists():
+            atlas = GlyphAtlas.open(path, self.font_hash(specname),
+                                    self.version)
+            if atlas is None:
+                log_debug(f'Removing stale glyph atlas {path}')
+                path.unlink(missing_ok=True)
+
+        atlases[key] = atlas
+        return atlas
+
+    def image(self, specname: str, codepoint: int, size: int,
+              color: int) -> QImage | None:
+        atlas = self.atlas(specname, size, color)
+        data = atlas.glyph(codepoint) if atlas else None
+        if data is None:
+            return None
+
+        # copy, since the image must not outlive the mapped buffer
+        image = QImage(bytes(data), size, size, size*4,
+                       QImage.Format_ARGB32_Premultiplied)
+        return image.copy()
+
+    def forget(self, key: AtlasKey):
+        atlas = self.atlases.pop(key, None)
+        if atlas is not None:
+            atlas.close()
+
+    @log_func_call
+    def update(self, specname: str, size: int, color: int,
+               glyphs: Mapping[int, bytes]):
+        """
+        Add `glyphs` (codepoint -> pixel bytes) to the atlas, rewriting the
+        file only if any of them are new.  Returns the number added.
+        """
+        key = (specname, size, color)
+        atlas = self.atlas(*key)
+        new = {cp: data for cp, data in glyphs.items()
+               if atlas is None or cp not in atlas}
+        if not new:
+            return 0
+
+        merged = atlas.glyphs() if atlas is not None else dict()
+        merged.update(new)
+        self.forget(key)
+        GlyphAtlas.write(self.path(key), self.font_hash(specname),
+                         self.version, size, color, merged)
+        return len(new)
+
+    @log_func_call
+    def build(self, specname: str, size: int, color: int):
+        "Render every glyph of a collection into a complete atlas"
+        prepare_font(specname)
+        qcolor = QColor.fromRgba(color)
+        glyphs = {cp: image_bytes(render_glyph(specname, cp, size, qcolor))
+                  for cp in set(THIRDPARTY_FONTSPEC[specname].charmap
+                                .values())}
+        return self.update(specname, size, color, glyphs)
+
+    def known_sizes(self):
+        return sorted({size for _, size, _ in list_atlases(self.directory)})
+
+    @log_func_call
+    def clear(self):
+        for key in list(self.atlases):
+            self.forget(key)
+
+        return clear_atlases(self.directory)
+
+
+class PaletteProbe:
+    """
+    Stands in for the application while a theme is applied, keeping the
+    palette the theme sets instead of applying it (and ignoring its style
+    sheet), so a theme's colors can be read without repainting anything.
+    """
+    def __init__(self, app: QApplication):
+        self.app = app
+        self.applied: QPalette = None
+
+    def setPalette(self, palette: QPalette):
+        self.applied = QPalette(palette)
+
+    def setStyleSheet(self, qss: str):
+        pass
+
+    def style(self):
+        return self.app.style()
+
+
+def theme_colors(app: QApplication,
+                 names: Iterable[str] = None) -> dict[str, int]:
+    "Icon color (palette WindowText) of each theme, by default every one"
+    probe = PaletteProbe(app)
+    themes = ThemeMap(probe)
+    colors = dict()
+    for name in names or themes.list_themes():
+        themes.apply_theme(name)
+        colors[name] = probe.applied.color(QPalette.WindowText).rgba()
+
+    return colors
+
+
+@log_func_call
+def run_atlas_command(clear: bool, prebuild: bool,
+                      sizes: Iterable[int] = ()):
+    """
+    Command-line maintenance of the glyph atlas cache: optionally delete
+    every atlas, then optionally render complete atlases for every
+    collection in every theme color at the given icon sizes (by default, the
+    sizes that already have atlases).
+    """
+    store = AtlasStore()
+    sizes = sorted(set(sizes)) or store.known_sizes()
+    if clear:
+        n = store.clear()
+        log_info(f'Removed {n} glyph atlases from {store.directory}')
+
+    if not prebuild:
+        return 0
+
+    if not sizes:
+        log_warning('No glyph atlas sizes known yet; open the browser once '
+                    'or pass --atlas-size')
+        return 1
+
+    # rendering needs a Qt application but no display
+    app = offscreen_app()
+    colors = set(theme_colors(app).values())
+    for specname in THIRDPARTY_FONTSPEC:
+        for size in sizes:
+            for color in colors:
+                n = store.build(specname, size, color)
+                log_info(f'{specname} {size}px #{color:08x}: '
+                         f'{n} glyphs added')
+
+    return 0
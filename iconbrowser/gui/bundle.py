@@ -0,0 +1,58 @@
+from collections.abc import Iterable
+from pathlib import Path
+from time import perf_counter
+
+from pyrandyos.gui.qt import QImage, QColor, Qt
+
+from ..logging import log_func_call
+from ..export import ExportIcon
+from ..bundle import BundleWriter, DEFAULT_BUNDLE_NAME, DEFAULT_BUNDLE_SIZES
+from .render import prepare_font, render_glyph
+from .export import ProgressFunc
+
+# icons rendered between progress reports
+BUNDLE_PROGRESS_STEP = 64
+
+
+def glyph_mask(specname: str, codepoint: int, size: int) -> bytes:
+    "8-bit coverage of a glyph, `size` bytes per line with no padding"
+    image = render_glyph(specname, codepoint, size, QColor(Qt.black))
+    alpha = image.convertToFormat(QImage.Format_Alpha8)
+    stride = alpha.bytesPerLine()
+    data = bytes(alpha.constBits())[:alpha.sizeInBytes()]
+    if stride == size:
+        return data
+
+    return b''.join(data[y*stride:y*stride + size] for y in range(size))
+
+
+def prepare_fonts(icons: Iterable[ExportIcon]):
+    "Prepare the fonts of the icons' collections; see `prepare_font`"
+    for specname in dict.fromkeys(c for c, _, _ in icons):
+        prepare_font(specname)
+
+
+@log_func_call
+def build_bundle(icons: Iterable[ExportIcon], outdir: Path,
+                 name: str = DEFAULT_BUNDLE_NAME,
+                 sizes: Iterable[int] = DEFAULT_BUNDLE_SIZES,
+                 color: int = None, progress: ProgressFunc = None):
+    """
+    Render the masks of `icons` and write them to a resource bundle in
+    `outdir`.  `prepare_fonts` must have been called for the icons first,
+    on the GUI thread, as this may run on another one.  Returns the number
+    of icons and the seconds it took.
+    """
+    t0 = perf_counter()
+    icons = list(dict.fromkeys(icons))
+    writer = BundleWriter(sizes, color)
+    sizes = writer.sizes
+    total = len(icons)
+    for i, (specname, iconname, codepoint) in enumerate(icons, 1):
+        writer.add_icon(specname, iconname,
+                        [glyph_mask(specname, codepoint, s) for s in sizes])
+        if progress and (i % BUNDLE_PROGRESS_STEP == 0 or i == total):
+            progress(i, total)
+
+    writer.write(outdir, name)
+    return total, perf_counter() - t0
@@ -1,4 +1,44 @@
 DEFAULT_VIEW_COLUMNS = 10
 VIEW_COLUMNS_OPTIONS = [5, 8, 10, 15, 20, 25, 30]
-AUTO_SEARCH_TIMEOUT = 500
+AUTO_SEARCH_TIMEOUT = 250
+# filter on every keystroke while a filter pass costs less than this
+LIVE_SEARCH_MAX_MS = 30
 ALL_COLLECTIONS = "All"
+ICON_CACHE_MB_KEY = "icon_cache_max_mb"
+DEFAULT_ICON_CACHE_MB = 64
+# glyph rendering priorities: on screen, in the scroll direction, behind
+VISIBLE_PRIORITY = 2
+LOOKAHEAD_PRIORITY = 1
+LOOKBEHIND_PRIORITY = 0
+# glyphs on screen rendered in the other themes' colors while idle, so that
+# switching themes does not wait on rendering
+PREWARM_THEMES_KEY = "prewarm_themes"
+PREWARM_PRIORITY = -1
+PREWARM_DELAY = 1000
+# render ahead of the viewport far enough to cover this much scrolling at
+# the current speed, within these bounds (in lines of icons)
+PREFETCH_SECONDS = 0.5
+PREFETCH_MIN_LINES = 2
+PREFETCH_MAX_LINES = 30
+PREFETCH_BEHIND_LINES = 1
+# resize passes are coalesced to one per frame (ms), and glyphs are rendered
+# at the exact icon size once resizing has stopped for this long (ms)
+RESIZE_FRAME_INTERVAL = 16
+RESIZE_SETTLE_DELAY = 200
+# pause between collections loaded in the background after the first paint
+IDLE_LOAD_INTERVAL = 10
+# steps of the main window's staged startup, in order
+LOAD_STEP_TOOLBARS = "Creating toolbars"
+LOAD_STEP_THEME = "Applying theme"
+LOAD_STEP_CATALOG = "Loading icon catalog"
+STAGED_LOAD_STEPS = (LOAD_STEP_TOOLBARS, LOAD_STEP_THEME, LOAD_STEP_CATALOG)
+# steps of the application's own startup
+LOAD_STEP_GUI = "GUI initialized"
+LOAD_STEP_INIT_THEMES = "Initializing themes"
+# icons shown by Find Similar besides the one picked
+SIMILAR_ICONS_SHOWN = 100
+# refresh period of the performance panel (ms), and its default export file
+METRICS_REFRESH_INTERVAL = 1000
+DEFAULT_METRICS_FILE_NAME = "iconbrowser-metrics.json"
+# default export folder, in the home directory
+DEFAULT_EXPORT_DIR_NAME = "iconbrowser-export"
@@ -0,0 +1,86 @@
+import os
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+
+from pyrandyos.gui.qt import QImage, QPainter, QColor, Qt
+
+from ..logging import log_func_call
+from ..export import (
+    ExportIcon, ExportTask, DEFAULT_SHEET_COLUMNS, plan_export, write_index,
+)
+from .render import offscreen_app, prepare_font, render_glyph
+
+# (images done, images in total)
+ProgressFunc = Callable[[int, int], None]
+
+
+def init_export_process():
+    offscreen_app()
+
+
+def run_export_task(task: ExportTask, outdir: Path):
+    """
+    Render one task in an export process.  Returns the number of images
+    rendered.
+    """
+    for specname in dict.fromkeys(c for c, _, _ in task.icons):
+        prepare_font(specname)
+
+    size = task.size
+    color = QColor.fromRgba(task.color)
+    if task.sheet is None:
+        for (specname, _, codepoint), (_, entry) in zip(task.icons,
+                                                        task.entries()):
+            image = render_glyph(specname, codepoint, size, color)
+            image.save(str(outdir/entry['file']), 'PNG')
+
+        return len(task)
+
+    sheet = QImage(*task.sheet_size(), QImage.Format_ARGB32_Premultiplied)
+    sheet.fill(Qt.transparent)
+    painter = QPainter(sheet)
+    for i, (specname, _, codepoint) in enumerate(task.icons):
+        image = render_glyph(specname, codepoint, size, color)
+        painter.drawImage(*task.position(i), image)
+
+    painter.end()
+    sheet.save(str(outdir/task.filename), 'PNG')
+    return len(task)
+
+
+@log_func_call
+def export_icons(icons: Iterable[ExportIcon], outdir: Path,
+                 sizes: Sequence[int], colors: Sequence[int],
+                 sheets: bool = False, columns: int = DEFAULT_SHEET_COLUMNS,
+                 jobs: int = None, progress: ProgressFunc = None):
+    """
+    Render `icons` at every size and color into `outdir`, as individual
+    PNG files or sprite sheets, and write the JSON index of the images.
+
+    The rendering happens in a pool of `jobs` processes (one per CPU by
+    default) on the offscreen platform, so it neither blocks nor shares the
+    calling process's Qt application.  Returns the number of images and the
+    seconds it took.
+    """
+    t0 = perf_counter()
+    icons = list(dict.fromkeys(icons))
+    outdir.mkdir(parents=True, exist_ok=True)
+    tasks = plan_export(icons, sizes, colors, sheets, columns)
+    total = sum(map(len, tasks))
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    done = 0
+    # spawned rather than forked: a forked copy of a process that has
+    # already started Qt cannot use it
+    with ProcessPoolExecutor(jobs, get_context('spawn'),
+                             initializer=init_export_process) as pool:
+        futures = [pool.submit(run_export_task, t, outdir) for t in tasks]
+        for future in as_completed(futures):
+            done += future.result()
+            if progress:
+                progress(done, total)
+
+    write_index(outdir, icons, tasks)
+    return total, perf_counter() - t0
@@ -0,0 +1 @@
+from .pres import ExportDialog  # noqa: F401
@@ -0,0 +1,75 @@
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pyrandyos.gui.qt import QFileDialog, QMessageBox
+from pyrandyos.gui.dialogs import GuiDialog
+
+from ...logging import log_func_call
+from ...export import ExportIcon, color_name
+from ...service import ServiceError, parse_color
+from ..constants import DEFAULT_EXPORT_DIR_NAME
+from .view import ExportDialogView
+if TYPE_CHECKING:
+    from ..main import MainWindow
+
+
+def parse_list(text: str):
+    return [x for x in (x.strip() for x in text.split(',')) if x]
+
+
+class ExportDialog(GuiDialog[ExportDialogView]):
+    """
+    Asks for the sizes, colors, layout and folder of an export of `icons`,
+    then hands it to the main window to run in the background.
+    """
+    @log_func_call
+    def __init__(self, gui_parent: 'MainWindow', icons: list[ExportIcon],
+                 color: int):
+        self.icons = icons
+        self.default_color = color_name(color)
+        self.default_output = Path.home()/DEFAULT_EXPORT_DIR_NAME
+        super().__init__("Export Icons", gui_parent,
+                         gui_parent.gui_view.qtobj)
+
+    @log_func_call
+    def create_gui_view(self, basetitle: str, *args,
+                        **kwargs) -> ExportDialogView:
+        return ExportDialogView(basetitle, self, *args, **kwargs)
+
+    @log_func_call
+    def show(self):
+        dialog = self.gui_view.qtobj
+        dialog.show()
+        dialog.raise_()
+        dialog.activateWindow()
+
+    @log_func_call
+    def click_browse(self):
+        field = self.gui_view.outputField
+        path = QFileDialog.getExistingDirectory(self.gui_view.qtobj,
+                                                "Export To", field.text())
+        if path:
+            field.setText(path)
+
+    @log_func_call
+    def click_export(self):
+        view = self.gui_view
+        dialog = view.qtobj
+        try:
+            sizes = [int(x) for x in parse_list(view.sizesField.text())]
+            if not sizes or not all(0 < s <= 1024 for s in sizes):
+                raise ValueError('Sizes must be between 1 and 1024 pixels')
+
+            colors = [parse_color(x)
+                      for x in parse_list(view.colorsField.text())]
+            if not colors:
+                raise ValueError('No colors given')
+        except (ServiceError, ValueError) as e:
+            QMessageBox.warning(dialog, "Export Icons", str(e))
+            return
+
+        outdir = Path(view.outputField.text()).expanduser()
+        sheets = view.sheetsCheck.isChecked()
+        self.gui_parent.startExport(self.icons, outdir, sizes, colors,
+                                    sheets, view.columnsSpin.value())
+        dialog.accept()
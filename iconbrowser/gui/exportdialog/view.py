@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING
+
+from pyrandyos.gui.qt import (
+    QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QSpinBox, QLabel,
+    QPushButton, QDialogButtonBox,
+)
+from pyrandyos.gui.callback import qt_callback
+from pyrandyos.gui.dialogs import GuiDialogView
+
+from ...logging import log_func_call
+from ...export import DEFAULT_EXPORT_SIZES, DEFAULT_SHEET_COLUMNS
+from ..qt import QFormLayout
+if TYPE_CHECKING:
+    from .pres import ExportDialog
+
+
+class ExportDialogView(GuiDialogView['ExportDialog']):
+    @log_func_call
+    def __init__(self, basetitle: str, presenter: 'ExportDialog' = None,
+                 *qtobj_args, **qtobj_kwargs):
+        GuiDialogView.__init__(self, basetitle, presenter, *qtobj_args,
+                               **qtobj_kwargs)
+        qtobj = self.qtobj
+        qtobj.setMinimumWidth(500)
+        self.layout = QVBoxLayout(qtobj)
+        self.create_form()
+
+    @log_func_call
+    def create_form(self):
+        qtobj = self.qtobj
+        layout = self.layout
+        pres: 'ExportDialog' = self.gui_pres
+
+        count = len(pres.icons)
+        layout.addWidget(QLabel(f"Export the {count:,} icons shown in the "
+                                "list", qtobj))
+
+        form = QFormLayout()
+        layout.addLayout(form)
+
+        sizesField = QLineEdit(', '.join(map(str, DEFAULT_EXPORT_SIZES)))
+        sizesField.setToolTip("Icon sizes in pixels, separated by commas")
+        form.addRow("Sizes:", sizesField)
+        self.sizesField = sizesField
+
+        colorsField = QLineEdit(pres.default_color)
+        colorsField.setToolTip("Colors as #rrggbb or #aarrggbb, separated by "
+                               "commas")
+        form.addRow("Colors:", colorsField)
+        self.colorsField = colorsField
+
+        sheetsCheck = QCheckBox("Pack into sprite sheets")
+        sheetsCheck.setToolTip("Write sprite sheets instead of one PNG file "
+                               "per image; the JSON index gives each icon's "
+                               "position")
+        form.addRow(sheetsCheck)
+        self.sheetsCheck = sheetsCheck
+
+        columnsSpin = QSpinBox()
+        columnsSpin.setRange(1, 256)
+        columnsSpin.setValue(DEFAULT_SHEET_COLUMNS)
+        columnsSpin.setEnabled(False)
+        sheetsCheck.toggled.connect(columnsSpin.setEnabled)
+        form.addRow("Icons per line:", columnsSpin)
+        self.columnsSpin = columnsSpin
+
+        hbox = QHBoxLayout()
+        outputField = QLineEdit(str(pres.default_output))
+        hbox.addWidget(outputField)
+        self.outputField = outputField
+        browseButton = QPushButton("Browse...")
+        browseButton.clicked.connect(qt_callback(pres.click_browse))
+        hbox.addWidget(browseButton)
+        form.addRow("Folder:", hbox)
+
+        dlgbuttons = QDialogButtonBox(QDialogButtonBox.Ok
+                                      | QDialogButtonBox.Cancel, qtobj)
+        dlgbuttons.button(QDialogButtonBox.Ok).setText("Export")
+        dlgbuttons.accepted.connect(qt_callback(pres.click_export))
+        dlgbuttons.rejected.connect(qtobj.reject)
+        layout.addWidget(dlgbuttons)
+        self.dlgbuttons = dlgbuttons
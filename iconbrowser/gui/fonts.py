@@ -0,0 +1,100 @@
+import sys
+from collections.abc import Iterable
+from threading import Lock
+
+from pyrandyos.gui.icons import thirdparty
+from pyrandyos.gui.icons.iconfont.sources import THIRDPARTY_FONTSPEC
+
+from ..app import IconBrowserApp
+from ..logging import log_func_call, log_info, DEBUGLOW2
+from ..catalog import IconCatalog
+from ..cachedir import get_cache_dir
+from ..snapshot import (
+    CATALOG_SNAPSHOT_NAME, snapshot_stamp, save_snapshot, load_snapshot,
+)
+
+_load_lock = Lock()
+
+
+def font_module_name(specname: str):
+    "Module that defines the font class of a collection"
+    return f'{thirdparty.__name__}.{specname.lower()}'
+
+
+def is_loaded(specname: str):
+    return THIRDPARTY_FONTSPEC[specname].charmap is not None
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def load_collection(specname: str):
+    """
+    Fetch the font and charmap files of a collection and read its charmap.
+    Returns True if anything had to be done, False if it was already loaded.
+    Safe to call from a worker thread.
+    """
+    if is_loaded(specname):
+        return False
+
+    with _load_lock:
+        if is_loaded(specname):
+            return False
+
+        spec = THIRDPARTY_FONTSPEC[specname]
+        spec.initialize(specname, IconBrowserApp.mkdir_temp())
+        spec.import_font()
+        return True
+
+
+@log_func_call
+def init_app_fonts():
+    """
+    Load only the collections whose font modules are already imported, e.g.
+    by PyRandyOS itself.  The application's own icons load theirs the first
+    time they are drawn (see `gui_icons.AppIconSpec`), and everything else
+    is left for `load_collection`.
+    """
+    modules = sys.modules
+    for specname in THIRDPARTY_FONTSPEC:
+        if font_module_name(specname) in modules:
+            load_collection(specname)
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def build_catalog(specnames: Iterable[str]):
+    "Catalog of the given collections, which must be loaded"
+    return IconCatalog.from_charmaps({k: THIRDPARTY_FONTSPEC[k].charmap
+                                      for k in specnames})
+
+
+@log_func_call
+def save_catalog(catalog: IconCatalog):
+    path = get_cache_dir()/CATALOG_SNAPSHOT_NAME
+    save_snapshot(path, catalog, snapshot_stamp())
+    return path
+
+
+def load_saved_catalog():
+    "The catalog snapshot in the cache directory, or None if missing or stale"
+    return load_snapshot(get_cache_dir()/CATALOG_SNAPSHOT_NAME,
+                         snapshot_stamp())
+
+
+@log_func_call
+def build_full_catalog():
+    "Load every collection and build their catalog in one go"
+    for specname in THIRDPARTY_FONTSPEC:
+        load_collection(specname)
+
+    return build_catalog(THIRDPARTY_FONTSPEC)
+
+
+@log_func_call
+def run_catalog_command():
+    """
+    Load every collection and save the catalog snapshot, for the
+    command-line tools that cannot load the fonts themselves.
+    """
+    catalog = build_full_catalog()
+    path = save_catalog(catalog)
+    log_info(f'Saved the catalog of {len(catalog):,} icons to {path}')
+    return 0
@@ -1,12 +1,50 @@
+from importlib import import_module
+
 from pyrandyos.gui.icons.iconfont import IconSpec
-from pyrandyos.gui.icons.thirdparty.codicons import Codicons
-from pyrandyos.gui.icons.thirdparty.codicons import names as codicon_names
-from pyrandyos.gui.icons.thirdparty.fa5.solid import names as fa5_s_names
-from pyrandyos.gui.icons.thirdparty.fa5.solid import Fa5_Solid
-from pyrandyos.gui.icons.thirdparty.fluentui.resize import FluentUI_Resize
-from pyrandyos.gui.icons.thirdparty.fluentui.resize import names as fluentui_r_names  # noqa: E501
-
-ConfigIcon = IconSpec.generate_iconspec(Codicons, glyph=codicon_names.json)
-ProgramIcon = IconSpec.generate_iconspec(Fa5_Solid, glyph=fa5_s_names.icons)
-CopyCodeIcon = IconSpec.generate_iconspec(FluentUI_Resize, glyph=fluentui_r_names.ic_fluent_clipboard_code_20_regular)  # noqa: E501
-CopyNameIcon = IconSpec.generate_iconspec(FluentUI_Resize, glyph=fluentui_r_names.ic_fluent_clipboard_letter_20_regular)  # noqa: E501
+
+from .fonts import font_module_name, load_collection
+
+
+class AppIconSpec:
+    """
+    One of the application's own icons.  The font module, its name table
+    and the font itself are only loaded the first time the icon is used, so
+    importing this module costs nothing at startup.
+    """
+    def __init__(self, specname: str, glyph_name: str):
+        self.specname = specname
+        self.glyph_name = glyph_name
+        self._spec: IconSpec = None
+
+    def spec(self):
+        spec = self._spec
+        if spec is None:
+            specname = self.specname
+            modname = font_module_name(specname)
+            font = getattr(import_module(modname),
+                           specname.replace('.', '_'))
+            names = import_module(f'{modname}.names')
+            load_collection(specname)
+            spec = IconSpec.generate_iconspec(
+                font, glyph=getattr(names, self.glyph_name)
+            )
+            self._spec = spec
+
+        return spec
+
+    def icon(self):
+        return self.spec().icon()
+
+
+ConfigIcon = AppIconSpec('Codicons', 'json')
+ProgramIcon = AppIconSpec('Fa5.Solid', 'icons')
+CopyCodeIcon = AppIconSpec('FluentUI.Resize',
+                           'ic_fluent_clipboard_code_20_regular')
+CopyNameIcon = AppIconSpec('FluentUI.Resize',
+                           'ic_fluent_clipboard_letter_20_regular')
+ExportIcon = AppIconSpec('Codicons', 'export')
+BundleIcon = AppIconSpec('Codicons', 'package')
+MetricsIcon = AppIconSpec('Codicons', 'dashboard')
+FuzzyIcon = AppIconSpec('Codicons', 'search_fuzzy')
+WindowIcon = AppIconSpec('Codicons', 'multiple_windows')
+SimilarIcon = AppIconSpec('Codicons', 'compare_changes')
@@ -0,0 +1,30 @@
+from functools import wraps
+from typing import Any, TypeVar
+from collections.abc import Callable
+
+from pyrandyos.gui.loadstatus import load_status_step
+
+from ..metrics import METRICS
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def timed_load_step(step_name: str, show_step_start: bool = True,
+                    show_step_done: bool = False):
+    """
+    `load_status_step` that also records the step as a startup phase in the
+    metrics, for the steps of the browser's own startup
+    """
+    def timed_load_step_decorator(func: F) -> F:
+        @wraps(func)
+        def timed_load_step_wrapper(*args, **kwargs):
+            METRICS.phase_started(step_name)
+            result = func(*args, **kwargs)
+            # like the step itself, not done if it fails
+            METRICS.phase_done(step_name)
+            return result
+
+        step = load_status_step(step_name, show_step_start=show_step_start,
+                                show_step_done=show_step_done)
+        return step(timed_load_step_wrapper)
+    return timed_load_step_decorator
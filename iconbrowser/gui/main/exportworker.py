@@ -0,0 +1,52 @@
+from collections.abc import Callable
+
+from pyrandyos.gui.qt import QObject
+
+from ..qt import QThreadPool, QRunnable, Signal
+
+# called with progress=..., returns (icons done, seconds taken)
+ExportFunc = Callable[..., tuple[int, float]]
+
+
+class ExportTask(QRunnable):
+    "Runs one export or bundle job, whose rendering it waits on"
+    def __init__(self, worker: 'ExportWorker', description: str,
+                 func: ExportFunc, args: tuple):
+        super().__init__()
+        self.worker = worker
+        self.description = description
+        self.func = func
+        self.args = args
+
+    def run(self):
+        worker = self.worker
+        try:
+            total, elapsed = self.func(*self.args,
+                                       progress=worker.progress.emit)
+        except Exception as e:
+            worker.failed.emit(self.description, str(e))
+        else:
+            worker.finished.emit(self.description, total, elapsed)
+
+
+class ExportWorker(QObject):
+    """
+    Runs exports, bundle builds or glyph hashing off the GUI thread, one
+    job at a time, reporting progress and the result through its signals
+    along with the description the job was submitted with.
+    """
+    progress = Signal(int, int)
+    finished = Signal(str, int, float)
+    failed = Signal(str, str)
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        pool = QThreadPool(self)
+        pool.setMaxThreadCount(1)
+        self.pool = pool
+
+    def submit(self, description: str, func: ExportFunc, *args):
+        self.pool.start(ExportTask(self, description, func, args))
+
+    def wait(self, msecs: int = -1):
+        return self.pool.waitForDone(msecs)
@@ -0,0 +1,92 @@
+from collections.abc import Callable, Sequence
+from time import perf_counter
+
+from pyrandyos.gui.qt import QObject
+
+from ...logging import log_func_call, DEBUGLOW2
+from ..qt import QThreadPool, QRunnable, Signal, Slot
+
+FilterFunc = Callable[[str, str, bool], Sequence[int] | None]
+ResultFunc = Callable[[Sequence[int] | None, float, float], None]
+
+
+class FilterTask(QRunnable):
+    "One generation-numbered filter request, run on the worker's pool"
+    def __init__(self, worker: 'FilterWorker', generation: int, group: str,
+                 term: str, fuzzy: bool):
+        super().__init__()
+        self.worker = worker
+        self.generation = generation
+        self.args = (group, term, fuzzy)
+
+    def run(self):
+        worker = self.worker
+        gen = self.generation
+        if worker.is_stale(gen):
+            return
+
+        t0 = perf_counter()
+        rows = worker.filter_func(*self.args)
+        # a newer request may have arrived while this one was running
+        if not worker.is_stale(gen):
+            worker.finished.emit(gen, rows, perf_counter() - t0)
+
+
+class FilterWorker(QObject):
+    """
+    Evaluates filter queries off the GUI thread.
+
+    Every request gets a new generation number.  The pool runs one query at
+    a time, so the search state is never shared between threads; requests
+    still waiting in the queue are dropped when a newer one arrives, and a
+    query that finishes after it was superseded is discarded rather than
+    shown.  Results are delivered to `result_func` on the GUI thread along
+    with the time spent filtering and the time since the request was made.
+    """
+    finished = Signal(int, object, float)
+
+    def __init__(self, filter_func: FilterFunc, result_func: ResultFunc,
+                 parent: QObject = None):
+        super().__init__(parent)
+        self.filter_func = filter_func
+        self.result_func = result_func
+        self.generation = 0
+        self.submitted: dict[int, float] = dict()
+        pool = QThreadPool(self)
+        pool.setMaxThreadCount(1)
+        self.pool = pool
+        # the worker lives on the GUI thread, so this is a queued connection
+        self.finished.connect(self.deliver)
+
+    def is_stale(self, generation: int):
+        return generation != self.generation
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def submit(self, group: str, term: str, fuzzy: bool = False):
+        "Queue a query, cancelling any that have not started yet"
+        self.pool.clear()
+        self.submitted.clear()
+        self.generation += 1
+        gen = self.generation
+        self.submitted[gen] = perf_counter()
+        self.pool.start(FilterTask(self, gen, group, term, fuzzy))
+        return gen
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def cancel(self):
+        "Drop every pending query; one already running finishes unseen"
+        self.pool.clear()
+        self.submitted.clear()
+        self.generation += 1
+
+    def wait(self, msecs: int = -1):
+        return self.pool.waitForDone(msecs)
+
+    @Slot(int, object, float)
+    def deliver(self, generation: int, rows: Sequence[int] | None,
+                elapsed: float):
+        t0 = self.submitted.pop(generation, None)
+        if t0 is None or self.is_stale(generation):
+            return
+
+        self.result_func(rows, elapsed, perf_counter() - t0)
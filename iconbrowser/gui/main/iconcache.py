@@ -0,0 +1,193 @@
+from pyrandyos.gui.qt import QPixmap, QSize, QPainter, QColor, Qt
+from pyrandyos.gui.icons.iconfont import IconSpec
+
+from ...logging import log_func_call, log_debug, DEBUGLOW2
+from ...lrucache import ByteBudgetLRUCache
+from ...iconsize import ICON_SIZE_BUCKETS
+
+# (collection, codepoint, icon size, ARGB color)
+IconCacheKey = tuple[str, int, int, int]
+
+
+def pixmap_nbytes(pm: QPixmap):
+    return pm.width()*pm.height()*pm.depth()//8
+
+
+class IconSizing:
+    """
+    The sizes one view of an `IconRasterCache` shows glyphs at.  Glyphs may
+    be shown at a `display_size` other than the size they are rendered at,
+    scaled on the way out: while the view is being resized, and from the
+    previous size while the new one is being rendered.
+    """
+    def __init__(self, cache: 'IconRasterCache', icon_size: int = 0):
+        self.cache = cache
+        self.icon_size = icon_size
+        self.display_size = icon_size
+        # size rendered before the current one, shown scaled meanwhile
+        self.fallback_size = 0
+        self._placeholder: QPixmap = None
+
+    def key(self, specname: str, codepoint: int,
+            color: int = None) -> IconCacheKey:
+        "Cache key at this view's size, in the current color by default"
+        return (specname, codepoint, self.icon_size,
+                self.cache.color if color is None else color)
+
+    def scaled(self, pm: QPixmap) -> QPixmap:
+        "`pm` at the display size; fast while resizing, smooth otherwise"
+        size = self.display_size
+        if pm.width() == size:
+            return pm
+
+        mode = (Qt.FastTransformation if self.icon_size != size
+                else Qt.SmoothTransformation)
+        return pm.scaled(size, size, Qt.KeepAspectRatio, mode)
+
+    def fallback(self, key: IconCacheKey) -> QPixmap | None:
+        "The glyph under `key` at the previous size, scaled, if cached"
+        size = self.fallback_size
+        if not size:
+            return None
+
+        pm = self.cache.lru.get(key[:2] + (size,) + key[3:])
+        return None if pm is None else self.scaled(pm)
+
+    def placeholder(self) -> QPixmap:
+        "Cheap stand-in shown until a glyph has been rendered"
+        size = self.display_size
+        pm = self._placeholder
+        if pm is None or pm.width() != size:
+            pm = QPixmap(size, size)
+            pm.fill(Qt.transparent)
+            d = max(size//8, 2)
+            painter = QPainter(pm)
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(128, 128, 128, 64))
+            painter.drawEllipse((size - d)//2, (size - d)//2, d, d)
+            painter.end()
+            self._placeholder = pm
+
+        return pm
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def set_icon_size(self, size: int, display_size: int = None):
+        """
+        Set the pixel size used for new renders and the size glyphs are
+        shown at, by default the same.  Returns True if the render size
+        changed, in which case the cache drops the sizes no view needs.
+        """
+        self.display_size = display_size or size
+        old = self.icon_size
+        if size == old:
+            return False
+
+        self.icon_size = size
+        self.fallback_size = old
+        self.cache.trim_sizes()
+        return True
+
+
+class IconRasterCache:
+    """
+    Memory-bounded cache of rendered icon pixmaps keyed by
+    (collection, codepoint, icon size, color).  Keying on the codepoint
+    rather than the glyph name lets aliases of the same glyph share a pixmap,
+    and keying on the color rather than the theme means a theme switch only
+    misses the glyphs whose color actually changes.  Glyphs in other colors
+    stay cached until evicted, for switching back or pre-rendered ahead of a
+    switch.
+
+    The color is the same for every view, but each view has its own
+    `IconSizing`, from `add_view`; glyphs are kept at the sizes any of the
+    views show, plus the size buckets.
+    """
+    @log_func_call
+    def __init__(self, max_bytes: int, color: int = 0):
+        self.lru = ByteBudgetLRUCache(max_bytes, pixmap_nbytes)
+        self.color = color
+        self.sizings: list[IconSizing] = list()
+
+    @property
+    def stats(self):
+        return self.lru.stats
+
+    def describe(self):
+        "Size and counters of the cache, for the performance metrics"
+        lru = self.lru
+        return {
+            'entries': len(lru),
+            'bytes': lru.nbytes,
+            'max_bytes': lru.max_bytes,
+            'icon_sizes': sorted(self.icon_sizes()),
+            'views': len(self.sizings),
+            **lru.stats.as_dict(),
+        }
+
+    def add_view(self, icon_size: int = 0):
+        sizing = IconSizing(self, icon_size)
+        self.sizings.append(sizing)
+        return sizing
+
+    def remove_view(self, sizing: IconSizing):
+        if sizing in self.sizings:
+            self.sizings.remove(sizing)
+            self.trim_sizes()
+
+    def icon_sizes(self):
+        "The sizes glyphs are rendered at for the views"
+        return {s.icon_size for s in self.sizings}
+
+    def is_current(self, key: IconCacheKey):
+        "Whether any view would show the glyph under `key` right now"
+        return key[3] == self.color and key[2] in self.icon_sizes()
+
+    def cached_sizes(self):
+        return {k[2] for k, _ in self.lru.items()}
+
+    def trim_sizes(self):
+        "Drop the glyphs at sizes other than the buckets and the views'"
+        keep = set(ICON_SIZE_BUCKETS)
+        for s in self.sizings:
+            keep.update((s.icon_size, s.fallback_size))
+
+        self.lru.discard_where(lambda k: k[2] not in keep)
+
+    def insert(self, key: IconCacheKey, pm: QPixmap):
+        # results for a size that has since changed are useless
+        if key[2] in self.icon_sizes():
+            self.lru.put(key, pm)
+
+    def pixmap(self, sizing: IconSizing, specname: str,
+               codepoint: int) -> QPixmap:
+        lru = self.lru
+        key = sizing.key(specname, codepoint)
+        pm = lru.get(key)
+        if pm is None:
+            size = sizing.icon_size
+            spec = IconSpec.generate_iconspec(specname, glyph=codepoint)
+            pm = spec.icon().pixmap(QSize(size, size))
+            lru.put(key, pm)
+
+        return sizing.scaled(pm)
+
+    @log_func_call
+    def set_color(self, color: int):
+        """
+        Set the ARGB color of the glyphs shown.  Returns True if it changed.
+        Nothing is dropped: glyphs already cached in the new color are used
+        as they are.
+        """
+        if color == self.color:
+            return False
+
+        self.color = color
+        return True
+
+    @log_func_call
+    def invalidate(self):
+        lru = self.lru
+        log_debug(f'Clearing icon cache ({len(lru)} entries, {lru.nbytes} '
+                  f'bytes): {lru.stats.as_dict()}')
+        lru.clear()
@@ -0,0 +1,95 @@
+from pyrandyos.gui.qt import (
+    Qt, QStyle, QStyledItemDelegate, QStyleOptionViewItem, QPainter,
+    QModelIndex, QFont, QColor, QRect, QApplication, QObject,
+)
+
+from ..render import prepare_font, glyph_draw_size
+from .iconmodel import IconModel
+from .iconproxy import IconFilterProxyModel
+from .iconcache import IconSizing
+
+# what the style lays out for a tile; the icon itself is drawn separately
+TILE_FEATURES = (QStyleOptionViewItem.HasDisplay
+                 | QStyleOptionViewItem.HasDecoration)
+
+
+class IconDelegate(QStyledItemDelegate):
+    """
+    Paints the tiles of an `IconListView` without asking the model for a
+    decoration, which would wrap every glyph in a `QIcon` on every paint.
+
+    The style draws the tile as usual, with its selection, hover and focus
+    styling and the label, but with an empty icon in the space it reserves
+    for one.  The glyph is then drawn there directly: blitted from the
+    raster cache if it has been rendered, or else drawn as text in the
+    collection's icon font while it is queued for rendering.  One `QFont`
+    per collection is kept for the size shown and shared by every tile.
+    """
+    def __init__(self, model: IconModel, proxy: IconFilterProxyModel,
+                 sizing: IconSizing, parent: QObject = None):
+        super().__init__(parent)
+        self.model = model
+        self.proxy = proxy
+        self.sizing = sizing
+        # font of each collection at `fontSize` pixels
+        self.fonts: dict[str, QFont] = dict()
+        self.fontSize = 0
+        self.rgba: int = None
+        self.color = QColor()
+
+    def glyph_font(self, specname: str, size: int):
+        "The icon font of a collection for glyphs of `size` pixels"
+        fonts = self.fonts
+        if size != self.fontSize:
+            fonts.clear()
+            self.fontSize = size
+
+        font = fonts.get(specname)
+        if font is None:
+            font = prepare_font(specname).get_font(glyph_draw_size(size))
+            fonts[specname] = font
+
+        return font
+
+    def glyph_color(self):
+        "The color of the glyphs shown, that of the raster cache"
+        rgba = self.model.cache.color
+        if rgba != self.rgba:
+            self.rgba = rgba
+            self.color = QColor.fromRgba(rgba)
+
+        return self.color
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem,
+              index: QModelIndex):
+        row = self.proxy.source_row(index.row())
+        opt = QStyleOptionViewItem(option)
+        opt.index = index
+        opt.features |= TILE_FEATURES
+        opt.text = self.model.catalog.iconstring(row)
+        widget = opt.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, widget)
+        rect = style.subElementRect(QStyle.SE_ItemViewItemDecoration, opt,
+                                    widget)
+        self.paint_glyph(painter, rect, row)
+
+    def paint_glyph(self, painter: QPainter, rect: QRect, row: int):
+        model = self.model
+        sizing = self.sizing
+        pm = model.glyph(row, sizing)
+        painter.save()
+        if pm is not None:
+            # scaled by the painter while the glyph is rendered at a size
+            # other than the one shown, smoothly once resizing has settled
+            painter.setRenderHint(QPainter.SmoothPixmapTransform,
+                                  sizing.icon_size == sizing.display_size)
+            painter.drawPixmap(rect, pm)
+        else:
+            catalog = model.catalog
+            painter.setFont(self.glyph_font(catalog.specname(row),
+                                            rect.height()))
+            painter.setPen(self.glyph_color())
+            painter.drawText(rect, Qt.AlignCenter, chr(catalog.codepoint(row)))
+
+        painter.restore()
@@ -1,12 +1,31 @@
-from pyrandyos.gui.qt import Qt, QSize, QListView, QResizeEvent
+from operator import attrgetter
+from time import perf_counter
+
+from pyrandyos.gui.qt import (
+    Qt, QSize, QPoint, QListView, QResizeEvent, QPaintEvent, QTimer,
+)
+from pyrandyos.gui.callback import qt_callback
 from pyrandyos.gui.widgets import QtWidgetWrapper, GuiWidgetParentType
 
 from ...logging import log_func_call, DEBUGLOW2
+from ...iconsize import grid_size
+from ..constants import (
+    PREFETCH_SECONDS, PREFETCH_MIN_LINES, PREFETCH_MAX_LINES,
+    PREFETCH_BEHIND_LINES, RESIZE_FRAME_INTERVAL, RESIZE_SETTLE_DELAY,
+)
+
+# scroll events further apart than this belong to different gestures
+SCROLL_GESTURE_GAP = 0.25
 
 
 class IconListView(QtWidgetWrapper[QListView]):
     @log_func_call
     def __init__(self, columns: int, parent: GuiWidgetParentType = None):
+        # scroll position (pixels), time and smoothed speed (pixels/s)
+        self.scrollValue = 0
+        self.scrollTime = 0.0
+        self.scrollVelocity = 0.0
+        self.painted = False
         super().__init__(parent)
         self.columns = columns
 
@@ -14,8 +33,28 @@ class IconListView(QtWidgetWrapper[QListView]):
         qtwin = self.gui_parent.gui_view.qtobj
         lv = QListView(qtwin)
         lv.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        lv.setVerticalScrollMode(QListView.ScrollPerPixel)
+        lv.setSelectionMode(QListView.ExtendedSelection)
         lv.resize = self.resize
         lv.resizeEvent = self.resizeEvent
+        lv.paintEvent = self.paintEvent
+        lv.verticalScrollBar().valueChanged.connect(
+            qt_callback(self.scrolled)
+        )
+
+        # not restarted by further events, so it fires once per frame
+        frameTimer = QTimer(lv)
+        frameTimer.setSingleShot(True)
+        frameTimer.setInterval(RESIZE_FRAME_INTERVAL)
+        frameTimer.timeout.connect(qt_callback(self.resize_frame))
+        self.frameTimer = frameTimer
+
+        # restarted by every event, so it fires once the resizing stops
+        settleTimer = QTimer(lv)
+        settleTimer.setSingleShot(True)
+        settleTimer.setInterval(RESIZE_SETTLE_DELAY)
+        settleTimer.timeout.connect(qt_callback(self.resize))
+        self.settleTimer = settleTimer
         return lv
 
     @log_func_call
@@ -27,24 +66,110 @@ class IconListView(QtWidgetWrapper[QListView]):
         self.resize()
 
     @log_func_call(DEBUGLOW2, trace_only=True)
-    def resize(self):
+    def resize(self, settled: bool = True):
         """
         Set grid and icon size taking into account the number of columns.
+        Until `settled`, glyphs are scaled from a nearby cached size rather
+        than rendered at the new one.
         """
         lv = self.qtobj
-        width = lv.viewport().width() - 30
-        # The minus 30 above ensures we don't end up with an item width that
-        # can't be drawn the expected number of times across the view without
-        # being wrapped. Without this, the view can flicker during resize
-        tileWidth = width/self.columns
-        iconWidth = int(tileWidth*0.8)
-        # tileWidth needs to be an integer for setGridSize
-        tileWidth = int(tileWidth)
+        self.settleTimer.stop()
+        tileWidth, iconWidth = grid_size(lv.viewport().width(), self.columns)
 
+        # the icon cache must know the new size before the view repaints
+        self.gui_parent.gui_pres.updateIconSize(iconWidth, settled)
         lv.setGridSize(QSize(tileWidth, tileWidth))
-        lv.setIconSize(QSize(iconWidth, iconWidth))
+        if lv.iconSize().width() == iconWidth:
+            # same size, but now rendered at it rather than scaled
+            lv.viewport().update()
+        else:
+            lv.setIconSize(QSize(iconWidth, iconWidth))
+
+    def resize_frame(self):
+        self.resize(False)
+        self.settleTimer.start()
 
     @log_func_call(DEBUGLOW2, trace_only=True)
     def resizeEvent(self, event: QResizeEvent):
-        self.resize()
+        if not self.painted:
+            # lay out the first paint at its final size
+            self.resize()
+        elif not self.frameTimer.isActive():
+            self.frameTimer.start()
+
         return QListView.resizeEvent(self.qtobj, event)
+
+    def paintEvent(self, event: QPaintEvent):
+        t0 = perf_counter()
+        QListView.paintEvent(self.qtobj, event)
+        self.gui_parent.gui_pres.frame_painted(perf_counter() - t0)
+        if not self.painted and self.qtobj.model().rowCount():
+            self.painted = True
+            self.gui_parent.gui_pres.first_paint_done()
+
+    def selected_ranges(self):
+        """
+        Return the selected rows as ranges in display order.  Unlike
+        `selectedIndexes`, this costs the same for a select-all as for a
+        single icon.
+        """
+        selmodel = self.qtobj.selectionModel()
+        if selmodel is None:
+            return []
+
+        return sorted((range(r.top(), r.bottom() + 1)
+                       for r in selmodel.selection()),
+                      key=attrgetter('start'))
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def scrolled(self, value: int):
+        now = perf_counter()
+        dt = now - self.scrollTime
+        if dt > 0:
+            v = (value - self.scrollValue)/dt
+            self.scrollVelocity = (v if dt > SCROLL_GESTURE_GAP
+                                   else 0.5*(self.scrollVelocity + v))
+
+        self.scrollValue = value
+        self.scrollTime = now
+        self.gui_parent.gui_pres.prefetchIcons()
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def prefetch_ranges(self):
+        """
+        Return the ranges of rows on screen, ahead of the viewport in the
+        scroll direction and behind it.  The look-ahead grows with the
+        scroll speed.
+        """
+        lv = self.qtobj
+        model = lv.model()
+        count = model.rowCount() if model else 0
+        grid = lv.gridSize()
+        gw = max(grid.width(), 1)
+        gh = max(grid.height(), 1)
+        vp = lv.viewport()
+        perLine = max(vp.width()//gw, 1)
+
+        first = max(lv.indexAt(QPoint(gw//2, gh//2)).row(), 0)
+        first -= first % perLine
+        lines = -(-vp.height()//gh) + 1
+        visible = range(first, min(first + lines*perLine, count))
+
+        velocity = self.scrollVelocity
+        if perf_counter() - self.scrollTime > SCROLL_GESTURE_GAP:
+            velocity = 0.0
+
+        aheadLines = abs(velocity)*PREFETCH_SECONDS/gh
+        aheadLines = int(min(max(aheadLines, PREFETCH_MIN_LINES),
+                             PREFETCH_MAX_LINES))
+        nahead = aheadLines*perLine
+        nbehind = PREFETCH_BEHIND_LINES*perLine
+        if velocity < 0:
+            nahead, nbehind = nbehind, nahead
+
+        after = range(visible.stop, min(visible.stop + nahead, count))
+        before = range(max(first - nbehind, 0), first)
+        if velocity < 0:
+            return visible, before, after
+
+        return visible, after, before
@@ -1,20 +1,167 @@
-from pyrandyos.gui.qt import Qt, QStringListModel
-from ..utils import iconstring_to_iconspec
+from collections.abc import Iterable
 
+from pyrandyos.gui.qt import Qt, QModelIndex, QPixmap
 
-class IconModel(QStringListModel):
-    def flags(self, index: int):
+from ...catalog import IconCatalog
+from ..constants import VISIBLE_PRIORITY
+from ..qt import QAbstractListModel
+from .iconcache import IconRasterCache, IconSizing
+from .rasterizer import GlyphRasterizer
+
+CatalogRowRole = Qt.UserRole + 1
+
+
+class IconModel(QAbstractListModel):
+    """
+    List model over an `IconCatalog`.  Display strings are only built for
+    the rows the view actually asks about.  The catalog may grow one
+    collection at a time through `add_collection`.
+
+    The model is shared by every window, so glyphs, which depend on the
+    size a view shows them at, are not served as a role: the views' icon
+    delegates ask for them with `glyph`, and each window's proxy serves
+    `Qt.DecorationRole` through `decoration` for anything else.  They come
+    from the raster cache.  With a rasterizer, a glyph that is not cached
+    yet is loaded from the glyph atlas if possible, or else queued for
+    rendering; until it is ready, the delegate draws it as text, and a
+    decoration is scaled from the previous icon size or a placeholder.
+    Without a rasterizer, decorations are rendered on the spot.
+    """
+    def __init__(self, catalog: IconCatalog, cache: IconRasterCache,
+                 parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.cache = cache
+        self.rasterizer: GlyphRasterizer = None
+        # lookups since the views last painted, see `take_data_calls`
+        self.dataCalls = 0
+
+    def set_rasterizer(self, rasterizer: GlyphRasterizer):
+        self.rasterizer = rasterizer
+
+    def populate(self, catalog: IconCatalog):
+        "Switch from an empty catalog to `catalog`, announcing its rows"
+        if not catalog:
+            self.catalog = catalog
+            return
+
+        self.beginInsertRows(QModelIndex(), 0, len(catalog) - 1)
+        self.catalog = catalog
+        self.endInsertRows()
+
+    def add_collection(self, catalog: IconCatalog, specname: str):
+        """
+        Switch to `catalog`, which must be the current catalog plus the rows
+        of `specname`, and announce those rows as inserted.
+        """
+        rows = catalog.collection_range(specname)
+        if not rows:
+            self.catalog = catalog
+            return
+
+        self.beginInsertRows(QModelIndex(), rows.start, rows.stop - 1)
+        self.catalog = catalog
+        self.endInsertRows()
+
+    def add_collections(self, catalog: IconCatalog, specnames: list[str]):
+        """
+        Switch to `catalog`, which must be the current catalog plus the
+        collections `specnames`.  Collections sort in among the current ones,
+        so each is announced as inserted where it goes, one at a time.
+        """
+        current = self.catalog.collections
+        last = len(specnames)
+        for i, specname in enumerate(specnames, 1):
+            step = (catalog if i == last
+                    else catalog.subset(current + specnames[:i]))
+            self.add_collection(step, specname)
+
+    def cache_key(self, row: int, sizing: IconSizing, color: int = None):
+        catalog = self.catalog
+        return sizing.key(catalog.specname(row), catalog.codepoint(row),
+                          color)
+
+    def request_glyphs(self, rows: Iterable[int], sizing: IconSizing,
+                       priority: int = 0, color: int = None):
+        """
+        Queue the glyphs of the given source rows for rendering at the size
+        of a view, in the current color unless another one is given
+        """
+        cache_key = self.cache_key
+        self.rasterizer.request(((row, cache_key(row, sizing, color))
+                                 for row in rows), priority)
+
+    def glyphs_ready(self, rows: list[int]):
+        "Tell the views about new glyphs, one signal per run of rows"
+        rows.sort()
+        roles = [Qt.DecorationRole]
+        start = prev = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row <= prev + 1:
+                prev = row
+                continue
+
+            self.dataChanged.emit(self.index(start), self.index(prev), roles)
+            start = prev = row
+
+    def glyph(self, row: int, sizing: IconSizing) -> QPixmap | None:
+        """
+        The glyph of a source row as rendered at a view's render size, or
+        None if it is not rendered yet, in which case it is queued
+        """
+        self.dataCalls += 1
+        rasterizer = self.rasterizer
+        if rasterizer is None:
+            return None
+
+        key = self.cache_key(row, sizing)
+        pm = self.cache.lru.get(key)
+        if pm is None:
+            pm = rasterizer.from_atlas(key)
+
+        if pm is None:
+            rasterizer.request(((row, key),), VISIBLE_PRIORITY)
+
+        return pm
+
+    def decoration(self, row: int, sizing: IconSizing):
+        "The icon of a source row for a view with the given sizes"
+        if self.rasterizer is None:
+            self.dataCalls += 1
+            catalog = self.catalog
+            return self.cache.pixmap(sizing, catalog.specname(row),
+                                     catalog.codepoint(row))
+
+        pm = self.glyph(row, sizing)
+        if pm is None:
+            pm = sizing.fallback(self.cache_key(row, sizing))
+            return sizing.placeholder() if pm is None else pm
+
+        return sizing.scaled(pm)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()):
+        return 0 if parent.isValid() else len(self.catalog)
+
+    def flags(self, index: QModelIndex):
         return Qt.ItemIsEnabled | Qt.ItemIsSelectable
 
-    def data(self, index: int, role: int):
-        if role == Qt.DecorationRole:
-            iconString = self.data(index, role=Qt.DisplayRole)
-            if iconString:
-                spec = iconstring_to_iconspec(iconString)
-                return spec.icon()
+    def take_data_calls(self):
+        "Calls to `data`, `glyph` and `decoration` since this was last called"
+        n = self.dataCalls
+        self.dataCalls = 0
+        return n
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        self.dataCalls += 1
+        if not index.isValid():
             return None
 
-        if role == Qt.ToolTipRole:
-            return self.data(index, role=Qt.DisplayRole)
+        row = index.row()
+        catalog = self.catalog
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return catalog.iconstring(row)
+
+        if role == CatalogRowRole:
+            return row
 
-        return super().data(index, role)
+        return None
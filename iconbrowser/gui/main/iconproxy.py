@@ -0,0 +1,160 @@
+from collections.abc import Sequence
+
+from pyrandyos.gui.qt import QModelIndex, Qt
+
+from ...logging import log_func_call, DEBUGLOW2
+from ..qt import QAbstractProxyModel, QAbstractItemModel
+from .iconcache import IconSizing
+
+
+class IconFilterProxyModel(QAbstractProxyModel):
+    """
+    Proxy that shows a precomputed list of source rows, in the given order.
+    All of the filtering work happens before `set_rows` is called, so the
+    proxy never evaluates anything per row itself.
+
+    The source model is shared between windows; decorations are asked of it
+    at the sizes of this proxy's view, `sizing`.
+    """
+    def __init__(self, sizing: IconSizing = None, parent=None):
+        super().__init__(parent)
+        self.sizing = sizing
+        self.rows: Sequence[int] | None = None
+        self._inverse: dict[int, int] | None = None
+
+    def setSourceModel(self, sourceModel: QAbstractItemModel):
+        old = self.sourceModel()
+        if old is not None:
+            old.dataChanged.disconnect(self.source_data_changed)
+            old.rowsAboutToBeInserted.disconnect(
+                self.source_rows_about_to_be_inserted
+            )
+            old.rowsInserted.disconnect(self.source_rows_inserted)
+
+        super().setSourceModel(sourceModel)
+        if sourceModel is not None:
+            sourceModel.dataChanged.connect(self.source_data_changed)
+            sourceModel.rowsAboutToBeInserted.connect(
+                self.source_rows_about_to_be_inserted
+            )
+            sourceModel.rowsInserted.connect(self.source_rows_inserted)
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def set_rows(self, rows: Sequence[int] | None):
+        """
+        Set the source rows to show.  `None` shows every source row.
+        """
+        self.beginResetModel()
+        self.rows = rows
+        self._inverse = None
+        self.endResetModel()
+
+    def proxy_rows(self, first: int, last: int):
+        "Return the proxy rows showing any of the given source rows"
+        rows = self.rows
+        if rows is None:
+            return range(first, last + 1)
+
+        inverse = self.inverse()
+        return [i for i in map(inverse.get, range(first, last + 1))
+                if i is not None]
+
+    def inverse(self):
+        inverse = self._inverse
+        if inverse is None:
+            inverse = {r: i for i, r in enumerate(self.rows)}
+            self._inverse = inverse
+
+        return inverse
+
+    def source_data_changed(self, topLeft: QModelIndex,
+                            bottomRight: QModelIndex,
+                            roles: list[int] = None):
+        rows = self.proxy_rows(topLeft.row(), bottomRight.row())
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)),
+                                  self.index(max(rows)), roles or [])
+
+    def source_rows_about_to_be_inserted(self, parent: QModelIndex,
+                                         first: int, last: int):
+        if self.rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def source_rows_inserted(self, parent: QModelIndex, first: int,
+                             last: int):
+        rows = self.rows
+        if rows is None:
+            self.endInsertRows()
+            return
+
+        # the rows shown stay the same, but their source rows have moved
+        n = last - first + 1
+        self.rows = [r + n if r >= first else r for r in rows]
+        self._inverse = None
+
+    def source_row(self, row: int):
+        rows = self.rows
+        return row if rows is None else rows[row]
+
+    def source_rows(self, start: int, stop: int) -> Sequence[int]:
+        "The source rows shown in proxy rows `start` to `stop - 1`"
+        rows = self.rows
+        return range(start, stop) if rows is None else rows[start:stop]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid():
+            return 0
+
+        rows = self.rows
+        if rows is None:
+            src = self.sourceModel()
+            return src.rowCount() if src else 0
+
+        return len(rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row: int, column: int = 0,
+              parent: QModelIndex = QModelIndex()):
+        if (parent.isValid() or column != 0
+                or not 0 <= row < self.rowCount()):
+            return QModelIndex()
+
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex = QModelIndex()):
+        return QModelIndex()
+
+    def flags(self, index: QModelIndex):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        sizing = self.sizing
+        if role != Qt.DecorationRole or sizing is None:
+            return super().data(index, role)
+
+        src = self.sourceModel()
+        if not index.isValid() or not src:
+            return None
+
+        return src.decoration(self.source_row(index.row()), sizing)
+
+    def mapToSource(self, proxyIndex: QModelIndex):
+        src = self.sourceModel()
+        if not proxyIndex.isValid() or not src:
+            return QModelIndex()
+
+        return src.index(self.source_row(proxyIndex.row()), 0)
+
+    def mapFromSource(self, sourceIndex: QModelIndex):
+        if not sourceIndex.isValid():
+            return QModelIndex()
+
+        srcrow = sourceIndex.row()
+        rows = self.rows
+        if rows is None:
+            return self.index(srcrow)
+
+        row = self.inverse().get(srcrow)
+        return QModelIndex() if row is None else self.index(row)
@@ -0,0 +1,427 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from pyrandyos.gui.qt import QTimer
+from pyrandyos.gui.callback import qt_callback
+from pyrandyos.gui.icons.iconfont.sources import THIRDPARTY_FONTSPEC
+
+from ...logging import (
+    log_func_call, DEBUGLOW2, log_debug, log_info, log_warning,
+)
+from ...app import IconBrowserApp
+from ...catalog import IconCatalog
+from ...cachedir import get_cache_dir
+from ...snapshot import CATALOG_SNAPSHOT_NAME, snapshot_stamp, load_snapshot
+from ...search import TrigramIndex
+from ...fuzzy import FuzzyMatcher
+from ...similarity import GlyphHashes, SimilarityIndex, unhashed_glyphs
+from ...metrics import METRICS
+from ..constants import (
+    ICON_CACHE_MB_KEY, DEFAULT_ICON_CACHE_MB, IDLE_LOAD_INTERVAL,
+)
+from ..fonts import (
+    is_loaded, load_collection, build_catalog, save_catalog,
+)
+from ..atlasstore import AtlasStore, image_bytes
+from .iconmodel import IconModel
+from .iconcache import IconRasterCache
+from .rasterizer import GlyphRasterizer
+from .exportworker import ExportWorker
+if TYPE_CHECKING:
+    from .pres import MainWindow
+
+_library: 'IconLibrary' = None
+
+
+class IconLibrary:
+    """
+    The icon catalog, its search index and the rendered glyphs, shared by
+    reference between every main window of the process.  A window only adds
+    its own view, filter proxy and icon sizes, so opening another one costs
+    next to nothing.
+
+    The catalog and index are replaced rather than changed, so the windows'
+    filter threads read them without locking.  The index of a new catalog
+    is built once, under `indexLock`, by whichever thread needs it first;
+    each window then searches it with its own query state.
+    """
+    @log_func_call
+    def __init__(self):
+        cache_mb = IconBrowserApp.get(ICON_CACHE_MB_KEY,
+                                      DEFAULT_ICON_CACHE_MB)
+        iconCache = IconRasterCache(int(cache_mb*2**20))
+        self.iconCache = iconCache
+        METRICS.gauge('raster_cache', iconCache.describe)
+        # icon color of each theme, filled in by `MainWindow.theme_color`
+        self.themeColors: dict[str, int] = dict()
+
+        # populated by `load_catalog` once the first window is up
+        catalog = IconCatalog.from_charmaps({})
+        self.catalog = catalog
+        self.loaded = False
+        model = IconModel(catalog, iconCache)
+        self.model = model
+        atlasStore = AtlasStore()
+        self.atlasStore = atlasStore
+        rasterizer = GlyphRasterizer(iconCache, model.glyphs_ready,
+                                     atlasStore)
+        model.set_rasterizer(rasterizer)
+        self.rasterizer = rasterizer
+
+        self.indexLock = Lock()
+        self.searchIndex: TrigramIndex = None
+        self.fuzzyMatcher: FuzzyMatcher = None
+        # perceptual hashes of the glyphs, loaded from the cache when first
+        # needed, and the similarity index built from them
+        self.glyphHashes: GlyphHashes = None
+        self.similarityIndex: SimilarityIndex = None
+        # one hashing job at a time for every window, see `request_similar`
+        hashWorker = ExportWorker()
+        hashWorker.progress.connect(qt_callback(self.hashing_progress))
+        hashWorker.finished.connect(qt_callback(self.hashing_finished))
+        hashWorker.failed.connect(qt_callback(self.hashing_failed))
+        self.hashWorker = hashWorker
+        self.hashing = False
+        # the icon each window asked to find similar ones of while hashing
+        self.similarWaiting: dict['MainWindow', tuple[str, str]] = dict()
+        # full catalog built by the hashing job, for `hashing_finished`
+        self.fullCatalog: IconCatalog = None
+
+        # windows that have finished starting up, see `attach`
+        self.windows: list['MainWindow'] = list()
+        self.painted = False
+        loadTimer = QTimer()
+        loadTimer.setInterval(IDLE_LOAD_INTERVAL)
+        loadTimer.timeout.connect(qt_callback(self.load_next_collection))
+        self.loadTimer = loadTimer
+
+    @log_func_call
+    def attach(self, window: 'MainWindow'):
+        "Keep `window` informed of catalog, theme and rendering changes"
+        if window not in self.windows:
+            self.windows.append(window)
+
+    @log_func_call
+    def detach(self, window: 'MainWindow'):
+        "Forget a closed window, saving the glyphs rendered at its size"
+        if window in self.windows:
+            self.windows.remove(window)
+
+        self.similarWaiting.pop(window, None)
+        sizing = window.iconSizing
+        self.save_atlas({sizing.icon_size})
+        self.iconCache.remove_view(sizing)
+
+    @log_func_call
+    def load_catalog(self):
+        "Load the catalog for the first window; later ones find it loaded"
+        if self.loaded:
+            return
+
+        catalog = self.get_icon_catalog()
+        self.catalog = catalog
+        self.model.populate(catalog)
+        self.loaded = True
+        if not self.pending_collections():
+            # otherwise built by the first search, as collections arrive
+            self.search_index(catalog)
+
+    @log_func_call(DEBUGLOW2)
+    def get_icon_catalog(self):
+        """
+        Load the catalog from the snapshot in the cache directory.  If it is
+        missing or the fonts have changed, start from the collections that
+        are already loaded; the rest are added as they are loaded, and the
+        snapshot is saved once the catalog is complete.
+        """
+        t0 = perf_counter()
+        path = get_cache_dir()/CATALOG_SNAPSHOT_NAME
+        stamp = snapshot_stamp()
+        catalog = load_snapshot(path, stamp)
+        if catalog is not None:
+            METRICS.phase('Loading catalog snapshot', t0, perf_counter())
+            log_debug(f'Loaded catalog snapshot in {perf_counter() - t0:.3f} '
+                      's')
+            return catalog
+
+        catalog = build_catalog([k for k in THIRDPARTY_FONTSPEC
+                                 if is_loaded(k)])
+        METRICS.phase('Building partial catalog', t0, perf_counter())
+        log_debug(f'Built partial catalog in {perf_counter() - t0:.3f} s')
+        return catalog
+
+    @log_func_call
+    def save_catalog(self):
+        try:
+            save_catalog(self.catalog)
+        except OSError as e:
+            log_warning(f'Could not save the catalog snapshot: {e}')
+
+    def pending_collections(self):
+        "Collections that are not loaded or not in the catalog yet"
+        collections = self.catalog.collections
+        return [k for k in THIRDPARTY_FONTSPEC
+                if not is_loaded(k) or k not in collections]
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def ensure_collection(self, specname: str):
+        """
+        Load a collection now, adding its rows to the catalog if they are
+        not there yet, and tell the windows.  Returns True if the catalog
+        grew.
+        """
+        load_collection(specname)
+        catalog = self.catalog
+        if specname in catalog.collections:
+            return False
+
+        t0 = perf_counter()
+        catalog = build_catalog(catalog.collections + [specname])
+        self.catalog = catalog
+        # queued glyph requests refer to rows that are about to move
+        self.rasterizer.drop_pending()
+        self.model.add_collection(catalog, specname)
+        elapsed = perf_counter() - t0
+        METRICS.observe('collection_load', elapsed*1000)
+        log_debug(f'Added {specname} to the catalog in {elapsed:.3f} s')
+        for window in self.windows:
+            window.catalog_grew()
+
+        if not self.pending_collections():
+            self.save_catalog()
+
+        return True
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def load_next_collection(self):
+        "Idle task: load one more collection in the background"
+        if self.hashing:
+            # the hashing job is loading the rest
+            self.loadTimer.stop()
+            return
+
+        pending = self.pending_collections()
+        if not pending:
+            self.loadTimer.stop()
+            log_debug('All icon collections loaded')
+            return
+
+        self.ensure_collection(pending[0])
+
+    @log_func_call
+    def first_paint_done(self):
+        """
+        Called by each window once it has painted its icons.  Returns True
+        for the first one, which starts loading the other collections.
+        """
+        first = not self.painted
+        self.painted = True
+        if first:
+            self.loadTimer.start()
+
+        return first
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def search_index(self, catalog: IconCatalog):
+        """
+        The index and fuzzy matcher of `catalog`, built if it is not the
+        indexed one.  Called from the windows' filter threads.
+        """
+        with self.indexLock:
+            index = self.searchIndex
+            if index is None or index.catalog is not catalog:
+                t0 = perf_counter()
+                index = TrigramIndex(catalog)
+                elapsed = perf_counter() - t0
+                METRICS.observe('index_build', elapsed*1000)
+                log_debug(f'Built search index in {elapsed:.3f} s')
+                self.searchIndex = index
+                self.fuzzyMatcher = FuzzyMatcher(index)
+
+            return index, self.fuzzyMatcher
+
+    def glyph_hashes(self):
+        hashes = self.glyphHashes
+        if hashes is None:
+            from ..similarity import load_cached_hashes
+            hashes = load_cached_hashes()
+            self.glyphHashes = hashes
+
+        return hashes
+
+    @log_func_call
+    def request_similar(self, window: 'MainWindow', icon: tuple[str, str]):
+        """
+        Returns True if every collection is in the catalog and hashed, so
+        `window` can show the icons like `icon` right away.  Otherwise the
+        rest is loaded and hashed in the background, by one job for every
+        window, and each window that asked meanwhile is shown the icons
+        like the last one it asked about once that is done.
+        """
+        waiting = self.similarWaiting
+        if (not self.hashing and not self.pending_collections()
+                and not unhashed_glyphs(self.catalog, self.glyph_hashes())):
+            return True
+
+        waiting[window] = icon
+        if not self.hashing:
+            self.hashing = True
+            self.loadTimer.stop()
+            self.hashWorker.submit('Hashed glyphs', self.prepare_similarity,
+                                   self.catalog)
+
+        return False
+
+    @log_func_call
+    def prepare_similarity(self, catalog: IconCatalog, progress=None):
+        """
+        The hashing job: load the collections missing from `catalog` and
+        build the full catalog in one go, then hash the glyphs that are not
+        hashed yet and save the hashes to the cache.  Returns the glyphs
+        hashed and the seconds taken; the catalog is left in `fullCatalog`
+        for `hashing_finished` to switch to.
+        """
+        t0 = perf_counter()
+        pending = [k for k in THIRDPARTY_FONTSPEC
+                   if k not in catalog.collections]
+        if pending:
+            for specname in pending:
+                load_collection(specname)
+
+            catalog = build_catalog(catalog.collections + pending)
+
+        self.fullCatalog = catalog
+        glyphs = unhashed_glyphs(catalog, self.glyph_hashes())
+        if not glyphs:
+            return 0, perf_counter() - t0
+
+        n = sum(map(len, glyphs.values()))
+        log_info(f'Hashing {n:,} glyphs to find similar icons')
+        from ..similarity import hash_glyphs, save_cached_hashes
+        new, _ = hash_glyphs(glyphs, progress=progress)
+        # replaced rather than changed, like the catalog
+        hashes = self.glyph_hashes().merged(new)
+        self.glyphHashes = hashes
+        try:
+            save_cached_hashes(hashes)
+        except OSError as e:
+            log_warning(f'Could not save the glyph hashes: {e}')
+
+        return len(new), perf_counter() - t0
+
+    @log_func_call
+    def complete_catalog(self, catalog: IconCatalog):
+        """
+        Switch to `catalog`, which has every collection, and tell the windows
+        once
+        """
+        current = self.catalog.collections
+        missing = [k for k in catalog.collections if k not in current]
+        if not missing:
+            return
+
+        t0 = perf_counter()
+        self.catalog = catalog
+        # queued glyph requests refer to rows that are about to move
+        self.rasterizer.drop_pending()
+        self.model.add_collections(catalog, missing)
+        elapsed = perf_counter() - t0
+        log_debug(f'Added {len(missing)} collections to the catalog in '
+                  f'{elapsed:.3f} s')
+        for window in self.windows:
+            window.catalog_grew()
+
+        self.save_catalog()
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def hashing_progress(self, done: int, total: int):
+        for window in self.similarWaiting:
+            window.gui_view.show_export_progress(done, total)
+
+    @log_func_call
+    def hashing_finished(self, description: str, total: int,
+                         elapsed: float):
+        log_info(f'{description}: {total:,} in {elapsed:.1f} s '
+                 f'({total/max(elapsed, 1e-9):,.0f} glyphs/s)')
+        self.hashing = False
+        catalog = self.fullCatalog
+        self.fullCatalog = None
+        self.complete_catalog(catalog)
+        waiting = self.similarWaiting
+        self.similarWaiting = dict()
+        for window, icon in waiting.items():
+            window.show_similar(icon)
+
+    @log_func_call
+    def hashing_failed(self, description: str, error: str):
+        log_warning(f'Failed: {description}: {error}')
+        self.hashing = False
+        self.fullCatalog = None
+        self.similarWaiting = dict()
+        if self.pending_collections():
+            self.loadTimer.start()
+
+    @log_func_call
+    def similarity_index(self):
+        "The similarity index of the catalog, built if it is out of date"
+        catalog = self.catalog
+        hashes = self.glyph_hashes()
+        index = self.similarityIndex
+        if (index is None or index.catalog is not catalog
+                or index.source is not hashes):
+            t0 = perf_counter()
+            index = SimilarityIndex(catalog, hashes)
+            elapsed = perf_counter() - t0
+            METRICS.observe('similarity_index_build', elapsed*1000)
+            log_debug(f'Built similarity index of {len(index):,} glyphs in '
+                      f'{elapsed:.3f} s')
+            self.similarityIndex = index
+
+        return index
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def drop_pending(self, origin: 'MainWindow' = None):
+        """
+        Discard the queued glyph requests, then queue again those of the
+        windows other than `origin`, which requeues its own.
+        """
+        self.rasterizer.drop_pending()
+        for window in self.windows:
+            if window is not origin:
+                window.prefetchIcons()
+
+    @log_func_call
+    def save_atlas(self, sizes: Iterable[int] = None):
+        """
+        Add the glyphs rendered this session at the windows' sizes, or the
+        given ones, in every theme color, to the on-disk atlas, so the next
+        launch can skip rendering them.
+        """
+        cache = self.iconCache
+        sizes = cache.icon_sizes() if sizes is None else set(sizes)
+        groups: dict[tuple[str, int, int], dict] = defaultdict(dict)
+        for (specname, codepoint, s, color), pm in cache.lru.items():
+            if s in sizes and pm.width() == s:
+                groups[specname, s, color][codepoint] = pm
+
+        store = self.atlasStore
+        for (specname, size, color), pixmaps in groups.items():
+            atlas = store.atlas(specname, size, color)
+            glyphs = {cp: image_bytes(pm.toImage())
+                      for cp, pm in pixmaps.items()
+                      if atlas is None or cp not in atlas}
+            n = store.update(specname, size, color, glyphs)
+            if n:
+                log_debug(f'Saved {n} {specname} glyphs to the atlas')
+
+
+def get_icon_library():
+    "The process-wide `IconLibrary`, created by the first window"
+    global _library
+    if _library is None:
+        _library = IconLibrary()
+
+    return _library
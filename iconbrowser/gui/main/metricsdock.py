@@ -0,0 +1,125 @@
+from pyrandyos.gui.qt import (
+    Qt, QTimer, QTreeWidget, QTreeWidgetItem, QVBoxLayout, QPushButton,
+    QHBoxLayout, QWidget,
+)
+from pyrandyos.gui.callback import qt_callback
+from pyrandyos.gui.widgets import QtWidgetWrapper
+
+from ...logging import log_func_call
+from ...metrics import METRICS
+from ..constants import METRICS_REFRESH_INTERVAL
+from ..qt import QDockWidget
+
+
+def format_value(value: object):
+    if isinstance(value, float):
+        return f'{value:,.3f}'
+
+    if isinstance(value, int):
+        return f'{value:,}'
+
+    return str(value)
+
+
+def format_histogram(h: dict):
+    if not h['count']:
+        return 'no samples'
+
+    unit = h['unit']
+    return (f"n={h['count']:,}  mean {h['mean']:,.2f}  p50 {h['p50']:,.2f}  "
+            f"p90 {h['p90']:,.2f}  p99 {h['p99']:,.2f}  "
+            f"max {h['max']:,.2f} {unit}")
+
+
+class MetricsDock(QtWidgetWrapper[QDockWidget]):
+    """
+    Dockable panel showing the process-wide metrics, refreshed every second
+    while it is visible.
+    """
+    def create_qtobj(self):
+        qtwin = self.gui_parent.gui_view.qtobj
+        pres = self.gui_parent.gui_pres
+        dock = QDockWidget("Performance", qtwin)
+        dock.setObjectName("metricsDock")
+        dock.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea
+                             | Qt.BottomDockWidgetArea)
+
+        tree = QTreeWidget()
+        tree.setColumnCount(2)
+        tree.setHeaderLabels(["Metric", "Value"])
+        tree.setUniformRowHeights(True)
+        self.tree = tree
+
+        resetButton = QPushButton("Reset")
+        resetButton.setToolTip("Clear the counters and histograms")
+        resetButton.clicked.connect(qt_callback(self.reset))
+        exportButton = QPushButton("Export JSON...")
+        exportButton.setToolTip("Save the metrics as JSON for comparing "
+                                "against other runs")
+        exportButton.clicked.connect(qt_callback(pres.exportMetrics))
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(resetButton)
+        buttons.addWidget(exportButton)
+
+        layout = QVBoxLayout()
+        layout.addWidget(tree)
+        layout.addLayout(buttons)
+        widget = QWidget()
+        widget.setLayout(layout)
+        dock.setWidget(widget)
+
+        timer = QTimer(dock)
+        timer.setInterval(METRICS_REFRESH_INTERVAL)
+        timer.timeout.connect(qt_callback(self.refresh))
+        self.refreshTimer = timer
+        dock.visibilityChanged.connect(qt_callback(self.visibility_changed))
+        return dock
+
+    def visibility_changed(self, visible: bool):
+        if visible:
+            self.refresh()
+            self.refreshTimer.start()
+        else:
+            self.refreshTimer.stop()
+
+    def reset(self):
+        METRICS.reset()
+        self.refresh()
+
+    @log_func_call
+    def refresh(self):
+        snap = METRICS.snapshot()
+        tree = self.tree
+        expanded = {tree.topLevelItem(i).text(0)
+                    for i in range(tree.topLevelItemCount())
+                    if tree.topLevelItem(i).isExpanded()}
+        tree.clear()
+
+        def section(title: str, rows):
+            item = QTreeWidgetItem([title])
+            item.addChildren([QTreeWidgetItem([k, v]) for k, v in rows])
+            tree.addTopLevelItem(item)
+            item.setExpanded(title in expanded or not expanded)
+            return item
+
+        section("Startup", [
+            (name, 'running' if p['duration_s'] is None
+             else f"{p['duration_s']*1000:,.1f} ms at "
+             f"{p['start_s']:,.3f} s")
+            for name, p in snap['phases'].items()
+        ])
+        section("Histograms", [(k, format_histogram(h))
+                               for k, h in snap['histograms'].items()])
+        gauges = []
+        for name, value in snap['gauges'].items():
+            if isinstance(value, dict):
+                gauges += [(f'{name} {k}', format_value(v))
+                           for k, v in value.items()]
+            else:
+                gauges.append((name, format_value(value)))
+
+        section("State", gauges)
+        section("Counters", [(k, format_value(v))
+                             for k, v in snap['counters'].items()])
+        tree.resizeColumnToContents(0)
@@ -1,29 +1,60 @@
+from collections import deque
+from collections.abc import Sequence
+from itertools import chain
+from pathlib import Path
+from time import perf_counter
+
 from pyrandyos.gui.qt import (
-    QTimer, QSortFilterProxyModel, Qt, QItemSelection, QModelIndex,
+    QTimer, QItemSelection, QModelIndex, QPalette, QFileDialog,
 )
 from pyrandyos.gui.callback import qt_callback
 from pyrandyos.gui.icons.iconfont.sources import THIRDPARTY_FONTSPEC
-from pyrandyos.gui.icons.utils import legalize_iconname
 from pyrandyos.gui.window import GuiWindow
-from pyrandyos.gui.dialogs.config import ConfigTreeDialog
 
 from ...version import __version__
-from ...logging import log_func_call, DEBUGLOW2, log_info
-from ...app import IconBrowserApp
-from ..constants import AUTO_SEARCH_TIMEOUT, ALL_COLLECTIONS
-from ..utils import iconstring_to_specname_iconname
+from ...logging import log_func_call, DEBUGLOW2, log_info, log_warning
+from ...app import IconBrowserApp, LAUNCH_TIME
+from ...catalog import IconCatalog
+from ...search import TrigramIndex, IncrementalSearch
+from ...iconsize import drag_icon_size
+from ...metrics import METRICS
+from ...export import ExportIcon
+from ...bundle import DEFAULT_BUNDLE_NAME
+from ...snippets import pyrandyos_batch_code
+from ..constants import (
+    AUTO_SEARCH_TIMEOUT, ALL_COLLECTIONS, LIVE_SEARCH_MAX_MS,
+    VISIBLE_PRIORITY, LOOKAHEAD_PRIORITY, LOOKBEHIND_PRIORITY,
+    PREWARM_THEMES_KEY, PREWARM_PRIORITY, PREWARM_DELAY,
+    DEFAULT_METRICS_FILE_NAME, LOAD_STEP_THEME, LOAD_STEP_CATALOG,
+    SIMILAR_ICONS_SHOWN,
+)
 
 from .view import MainWindowView
-from .iconmodel import IconModel
+from .iconproxy import IconFilterProxyModel
+from .filterworker import FilterWorker
+from .exportworker import ExportWorker
+from .library import get_icon_library
+from ..atlasstore import theme_colors
+from ..loadsteps import timed_load_step
 
 
 class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call
     def __init__(self):
+        self.openTime = perf_counter()
         # need filter models before creating the view
         self.create_filter_models()
         super().__init__(f'{IconBrowserApp.APP_NAME} v{__version__}')
         self.create_timer()
+        # the view is only a shell so far: the rest is done one stage per
+        # pass of the event loop, so that the window shows up first
+        self.startupStages = deque((
+            self.create_controls,
+            self.apply_initial_theme,
+            self.load_catalog,
+            self.startup_done,
+        ))
+        QTimer.singleShot(0, qt_callback(self.next_startup_stage))
 
     def create_gui_view(self, basetitle: str, *args,
                         **kwargs) -> MainWindowView:
@@ -31,13 +62,48 @@ class MainWindow(GuiWindow[MainWindowView]):
 
     @log_func_call
     def create_filter_models(self):
-        model = IconModel()
-        model.setStringList(sorted(self.get_icon_names()))
+        # the catalog, search index and glyphs are shared by every window;
+        # this one only has its own proxy, icon sizes and search state
+        library = get_icon_library()
+        self.library = library
+        model = library.model
+        self.model = model
+        self.iconCache = library.iconCache
+        self.themeColors = library.themeColors
+        iconSizing = library.iconCache.add_view()
+        self.iconSizing = iconSizing
+        self.searchIndex: TrigramIndex = None
+        # set when the catalog grows under an active filter, see `refilter`
+        self.refilterQueued = False
 
-        proxyModel = QSortFilterProxyModel()
+        # smoothed cost in seconds of a filter pass, used to pick between
+        # filtering on every keystroke and debouncing
+        self.filterCost = 0.0
+
+        proxyModel = IconFilterProxyModel(iconSizing)
         proxyModel.setSourceModel(model)
-        proxyModel.setFilterCaseSensitivity(Qt.CaseInsensitive)
         self.proxyModel = proxyModel
+        self.filterWorker = FilterWorker(self.filter_rows,
+                                         self.apply_filter_result)
+        exportWorker = ExportWorker()
+        exportWorker.progress.connect(qt_callback(self.exportProgress))
+        exportWorker.finished.connect(qt_callback(self.exportFinished))
+        exportWorker.failed.connect(qt_callback(self.exportFailed))
+        self.exportWorker = exportWorker
+
+    @property
+    def catalog(self) -> IconCatalog:
+        return self.library.catalog
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def update_search_index(self, catalog: IconCatalog):
+        "Switch to the shared index of `catalog` if it is not the one used"
+        index = self.searchIndex
+        if index is None or index.catalog is not catalog:
+            index, matcher = self.library.search_index(catalog)
+            self.searchIndex = index
+            self.incrementalSearch = IncrementalSearch(index)
+            self.fuzzyMatcher = matcher.fork()
 
     @log_func_call
     def create_timer(self):
@@ -47,18 +113,102 @@ class MainWindow(GuiWindow[MainWindowView]):
         filterTimer.timeout.connect(qt_callback(self.updateFilter))
         self.filterTimer = filterTimer
 
+        prewarmTimer = QTimer(self.gui_view.qtobj)
+        prewarmTimer.setSingleShot(True)
+        prewarmTimer.setInterval(PREWARM_DELAY)
+        prewarmTimer.timeout.connect(qt_callback(self.prewarmThemes))
+        self.prewarmTimer = prewarmTimer
+
+    @log_func_call
+    def next_startup_stage(self):
+        self.startupStages.popleft()()
+        if self.startupStages:
+            QTimer.singleShot(0, qt_callback(self.next_startup_stage))
+
+    @log_func_call
+    def create_controls(self):
+        self.gui_view.create_controls()
+
+    @timed_load_step(LOAD_STEP_THEME)
+    @log_func_call
+    def apply_initial_theme(self):
+        if self.library.windows:
+            # the theme is the application's, and another window applied it
+            return
+
+        self.updateStyle(self.gui_view.comboStyle.currentText())
+
+    @timed_load_step(LOAD_STEP_CATALOG)
+    @log_func_call
+    def load_catalog(self):
+        "Load the shared catalog, unless another window already has"
+        library = self.library
+        library.load_catalog()
+        library.attach(self)
+        if self.filter_active():
+            self.updateFilter()
+
+    @log_func_call
+    def startup_done(self):
+        now = perf_counter()
+        METRICS.observe('window_startup', (now - self.openTime)*1000)
+        if self.library.windows == [self]:
+            METRICS.phase('Launch to startup done', LAUNCH_TIME, now)
+
+        self.gui_app.startup_done(self)
+
+    @log_func_call
+    def newWindow(self):
+        self.gui_app.open_window()
+
+    @log_func_call
+    def window_closed(self):
+        "Stop this window's work and let go of the shared library"
+        self.filterTimer.stop()
+        self.prewarmTimer.stop()
+        self.filterWorker.cancel()
+        self.library.detach(self)
+        self.proxyModel.setSourceModel(None)
+        self.gui_app.window_closed(self)
+
     @log_func_call
     def click_config(self):
+        from pyrandyos.gui.dialogs.config import ConfigTreeDialog
         dlg = ConfigTreeDialog(self)
         dlg.show()
 
-    @log_func_call(DEBUGLOW2)
-    def get_icon_names(self):
-        iconNames = []
-        for k, v in THIRDPARTY_FONTSPEC.items():
-            iconNames += [f'{k}:{icon}' for icon in v.charmap.keys()]
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def ensure_filter_collections(self, group: str, searchTerm: str):
+        "Load whatever the given filter needs to look at"
+        library = self.library
+        if group != ALL_COLLECTIONS:
+            library.ensure_collection(group)
+        elif searchTerm.strip():
+            for specname in library.pending_collections():
+                library.ensure_collection(specname)
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def catalog_grew(self):
+        "Called by the library once a collection has been added"
+        if self.filter_active():
+            # any result in flight was computed on the old rows
+            self.filterWorker.cancel()
+            if not self.refilterQueued:
+                self.refilterQueued = True
+                QTimer.singleShot(0, qt_callback(self.refilter))
+
+        self.prefetchIcons()
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def refilter(self):
+        if self.refilterQueued:
+            self.updateFilter()
 
-        return iconNames
+    def filter_active(self):
+        "Whether the list shows anything other than every row"
+        win = self.gui_view
+        return bool(win.comboFont.currentText() != ALL_COLLECTIONS
+                    or win.lineEditFilter.text())
 
     @log_func_call(DEBUGLOW2, trace_only=True)
     def get_font_names(self):
@@ -76,78 +226,272 @@ class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call(DEBUGLOW2, trace_only=True)
     def updateFilter(self):
         win = self.gui_view
-        reString = ""
-
+        fuzzy = win.fuzzyAction.isChecked()
         group = win.comboFont.currentText()
+        searchTerm = win.lineEditFilter.text()
+        self.ensure_filter_collections(group, searchTerm)
+        self.refilterQueued = False
+        gen = self.filterWorker.submit(group, searchTerm, fuzzy)
+        win.show_filter_status(f'Searching... (#{gen})')
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def filter_rows(self, group: str, searchTerm: str, fuzzy: bool):
+        """
+        Return the catalog rows to show, or None for all of them.  Runs on
+        the filter worker thread, so it must not touch any widgets.
+        """
+        rows = None
+        catalog = self.catalog
         if group != ALL_COLLECTIONS:
-            reString += rf"^{group}:"
+            rows = catalog.collection_range(group)
 
-        searchTerm = win.lineEditFilter.text()
         if searchTerm:
-            reString += rf".*{searchTerm}.*$"
+            self.update_search_index(catalog)
 
-        # QSortFilterProxyModel.setFilterRegExp has been removed in Qt 6.
-        # Instead, QSortFilterProxyModel.setFilterRegularExpression is
-        # supported in Qt 5.12 or later.
-        self.proxyModel.setFilterRegularExpression(reString)
+        if searchTerm.strip() and fuzzy:
+            # ranked by score, so the proxy shows the best matches first
+            rows = self.fuzzyMatcher.search(searchTerm, rows).tolist()
+        elif searchTerm:
+            rows = self.incrementalSearch.search(searchTerm, rows)
+
+        return rows
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def apply_filter_result(self, rows, elapsed: float, latency: float):
+        # glyphs queued for the old result are no longer the priority
+        self.library.drop_pending(self)
+        proxyModel = self.proxyModel
+        proxyModel.set_rows(rows)
+        # let the view lay out the new rows before looking at them
+        QTimer.singleShot(0, qt_callback(self.prefetchIcons))
+        self.filterCost = 0.5*(self.filterCost + elapsed)
+        METRICS.observe('filter', elapsed*1000)
+        METRICS.observe('filter_latency', latency*1000)
+        self.gui_view.show_filter_status(
+            f'{proxyModel.rowCount():,} icons in {latency*1000:.1f} ms'
+        )
 
     @log_func_call
     def doubleClickIcon(self, index: QModelIndex = None):
         self.updateNameField()
         self.copyIconPyRandyOSCode()
 
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def selected_rows(self) -> list[int]:
+        "Catalog rows of the selected icons, in the order they are shown"
+        source_rows = self.proxyModel.source_rows
+        ranges = self.gui_view.listView.selected_ranges()
+        rows = chain.from_iterable(source_rows(r.start, r.stop)
+                                   for r in ranges)
+        # ranges can overlap after ctrl-clicks
+        return list(dict.fromkeys(rows)) if len(ranges) > 1 else list(rows)
+
+    def describe_rows(self, rows: list[int]):
+        if len(rows) == 1:
+            return self.catalog.iconstring(rows[0])
+
+        return f'{len(rows):,} icons'
+
     @log_func_call
     def copyIconText(self):
         """
-        Copy the name of the currently selected icon to the clipboard.
+        Copy the names of the selected icons to the clipboard, one per line.
         """
-        indexes = self.gui_view.listView.qtobj.selectedIndexes()
-        if not indexes:
+        rows = self.selected_rows()
+        if not rows:
             return
 
         clipboard = self.qt_app.clipboard()
-        name = indexes[0].data()
-        clipboard.setText(name)
-        log_info(f'Copied {name} to clipboard')
+        clipboard.setText('\n'.join(map(self.catalog.iconstring, rows)))
+        log_info(f'Copied {self.describe_rows(rows)} to clipboard')
 
     @log_func_call
     def copyIconPyRandyOSCode(self):
-        indexes = self.gui_view.listView.qtobj.selectedIndexes()
-        if not indexes:
+        """
+        Copy the PyRandyOS code for the selected icons to the clipboard, with
+        the imports of each font module once at the top.
+        """
+        rows = self.selected_rows()
+        if not rows:
             return
 
-        iconstring = indexes[0].data()
-        specname, iconname = iconstring_to_specname_iconname(iconstring)
-        spec = THIRDPARTY_FONTSPEC[specname]
-        fontmod = spec.module_qualname()
-        fontclass = spec.classname
-        shortname = spec.shortname
-        legalname = legalize_iconname(iconname)
-
-        code = ("from pyrandyos.gui.icons.iconfont import IconSpec\n"
-                f"from {fontmod} import {fontclass}\n"
-                f"from {fontmod} import names as {shortname}_names  # noqa: E501\n"
-                # f"{shortname}_{legalname}_ispec = IconSpec.generate_iconspec({fontclass}, glyph_name={iconname!r})  # noqa: E501\n")
-                f"{shortname}_{legalname}_ispec = IconSpec.generate_iconspec({fontclass}, glyph={shortname}_names.{legalname})  # noqa: E501\n")
-
+        code = pyrandyos_batch_code(map(self.catalog.split, rows))
         clipboard = self.qt_app.clipboard()
         clipboard.setText(code)
-        log_info(f'Copied {iconstring} PyRandyOS code to clipboard')
+        log_info(f'Copied {self.describe_rows(rows)} PyRandyOS code to '
+                 'clipboard')
+
+    def shown_icons(self) -> list[ExportIcon]:
+        "The icons the list currently shows, in order"
+        proxy = self.proxyModel
+        catalog = self.catalog
+        return [(*catalog.split(r), catalog.codepoint(r))
+                for r in map(proxy.source_row, range(proxy.rowCount()))]
+
+    def selected_icons(self) -> list[ExportIcon]:
+        catalog = self.catalog
+        return [(*catalog.split(r), catalog.codepoint(r))
+                for r in self.selected_rows()]
+
+    @log_func_call
+    def exportIcons(self):
+        "Export the icons the list currently shows"
+        icons = self.shown_icons()
+        if not icons:
+            log_info('No icons to export')
+            return
+
+        from ..exportdialog import ExportDialog
+        dlg = ExportDialog(self, icons, self.iconCache.color)
+        dlg.show()
+
+    @log_func_call
+    def startExport(self, icons: list[ExportIcon], outdir: Path,
+                    sizes: Sequence[int], colors: Sequence[int],
+                    sheets: bool, columns: int):
+        from ..export import export_icons
+        log_info(f'Exporting {len(icons):,} icons to {outdir}')
+        self.exportWorker.submit(f'Exported images to {outdir}',
+                                 export_icons, icons, outdir, sizes, colors,
+                                 sheets, columns)
+
+    @log_func_call
+    def bundleIcons(self):
+        """
+        Build a resource bundle of the selected icons, or of every icon shown
+        if none are selected.
+        """
+        icons = self.selected_icons() or self.shown_icons()
+        if not icons:
+            log_info('No icons to bundle')
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self.gui_view.qtobj, f"Bundle {len(icons):,} Icons",
+            str(Path.home()/f'{DEFAULT_BUNDLE_NAME}.py'),
+            "Python Modules (*.py)",
+        )
+        if not path:
+            return
+
+        from ..bundle import build_bundle, prepare_fonts
+        path = Path(path)
+        # fonts are registered with Qt on the GUI thread
+        prepare_fonts(icons)
+        log_info(f'Bundling {len(icons):,} icons into {path}')
+        self.exportWorker.submit(f'Bundled icons into {path}', build_bundle,
+                                 icons, path.parent, path.stem)
+
+    @log_func_call
+    def exportMetrics(self):
+        "Save the performance metrics as JSON"
+        path, _ = QFileDialog.getSaveFileName(
+            self.gui_view.qtobj, "Export Performance Metrics",
+            str(Path.home()/DEFAULT_METRICS_FILE_NAME), "JSON (*.json)",
+        )
+        if path:
+            METRICS.write_json(Path(path))
+            log_info(f'Saved performance metrics to {path}')
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def exportProgress(self, done: int, total: int):
+        self.gui_view.show_export_progress(done, total)
+
+    @log_func_call
+    def exportFinished(self, description: str, total: int, elapsed: float):
+        log_info(f'{description}: {total:,} in {elapsed:.1f} s '
+                 f'({total/max(elapsed, 1e-9):,.0f} icons/s)')
+
+    @log_func_call
+    def exportFailed(self, description: str, error: str):
+        log_warning(f'Failed: {description}: {error}')
+
+    @log_func_call
+    def findSimilar(self):
+        "Show the icons that look most like the first one selected"
+        rows = self.selected_rows()
+        if rows:
+            self.find_similar(self.catalog.split(rows[0]))
+
+    @log_func_call
+    def find_similar(self, icon: tuple[str, str]):
+        """
+        Show the icons of every collection that look most like `icon`.
+        Collections that are not loaded and glyphs that have not been
+        hashed yet are taken care of first, in the background, and the
+        icons shown once that is done.
+        """
+        if self.library.request_similar(self, icon):
+            self.show_similar(icon)
+            return
+
+        specname, iconname = icon
+        self.gui_view.show_filter_status(f'Finding icons like '
+                                         f'{specname}:{iconname}...')
+
+    @log_func_call
+    def show_similar(self, icon: tuple[str, str]):
+        """
+        Show `icon` and the icons most like it, most alike first, in place
+        of the filter result until the filter is changed
+        """
+        catalog = self.catalog
+        row = catalog.find(*icon)
+        if row < 0:
+            return
+
+        t0 = perf_counter()
+        index = self.library.similarity_index()
+        similar = index.similar(row, SIMILAR_ICONS_SHOWN)
+        elapsed = perf_counter() - t0
+        METRICS.observe('similar', elapsed*1000)
+
+        win = self.gui_view
+        # the filter is dropped, including a refilter queued when the
+        # catalog grew
+        self.filterTimer.stop()
+        self.filterWorker.cancel()
+        self.refilterQueued = False
+        edit = win.lineEditFilter
+        edit.blockSignals(True)
+        edit.clear()
+        edit.blockSignals(False)
+        combo = win.comboFont
+        combo.blockSignals(True)
+        combo.setCurrentText(ALL_COLLECTIONS)
+        combo.blockSignals(False)
+
+        self.style_placeholder_text()
+        self.library.drop_pending(self)
+        proxyModel = self.proxyModel
+        proxyModel.set_rows([row] + [r for r, _ in similar])
+        lv = win.listView.qtobj
+        lv.scrollToTop()
+        lv.setCurrentIndex(proxyModel.index(0))
+        QTimer.singleShot(0, qt_callback(self.prefetchIcons))
+        win.show_filter_status(f'{len(similar):,} icons like '
+                               f'{catalog.iconstring(row)} in '
+                               f'{elapsed*1000:.1f} ms')
 
     @log_func_call
     def updateNameField(self, selected: QItemSelection = None,
                         deselected: QItemSelection = None):
         win = self.gui_view
-        indexes = win.listView.qtobj.selectedIndexes()
-        if not indexes:
-            win.nameField.setText("")
-            win.copyButton.setDisabled(True)
-            win.copyPyRandyOSButton.setDisabled(True)
-            return
+        # counting the ranges stays cheap however many icons are selected
+        ranges = win.listView.selected_ranges()
+        count = sum(map(len, ranges))
+        if not count:
+            text = ""
+        elif count == 1:
+            row = self.proxyModel.source_row(ranges[0].start)
+            text = self.catalog.iconstring(row)
+        else:
+            text = f"{count:,} icons selected"
 
-        win.nameField.setText(indexes[0].data())
-        win.copyButton.setDisabled(False)
-        win.copyPyRandyOSButton.setDisabled(False)
+        win.nameField.setText(text)
+        win.copyButton.setDisabled(not count)
+        win.copyPyRandyOSButton.setDisabled(not count)
+        win.similarButton.setDisabled(not count)
 
     @log_func_call(DEBUGLOW2, trace_only=True)
     def triggerDelayedUpdate(self):
@@ -157,12 +501,132 @@ class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call(DEBUGLOW2, trace_only=True)
     def filter_text_changed(self, text: str):
         self.style_placeholder_text()
-        self.triggerDelayedUpdate()
+        if self.filterCost*1000 < LIVE_SEARCH_MAX_MS:
+            self.triggerImmediateUpdate()
+        else:
+            self.triggerDelayedUpdate()
+
+    def theme_names(self):
+        return self.gui_app.themes.list_themes(always_include_qdarkstyle=True)
+
+    def theme_color(self, theme: str):
+        "Icon color of a theme, found without applying it"
+        colors = self.themeColors
+        color = colors.get(theme)
+        if color is None:
+            colors.update(theme_colors(self.qt_app, self.theme_names()))
+            color = colors[theme]
+
+        return color
 
     @log_func_call
     def updateStyle(self, text: str):
-        # qtawesome.reset_cache()
+        """
+        Apply a theme.  Glyphs are cached by color, so only a change of the
+        icon color means re-rendering, and then the queue is cleared so the
+        rows the palette change repaints are rendered first, with the
+        look-ahead after them.
+        """
+        # switch the cache before the palette change triggers a repaint
+        library = self.library
+        cache = self.iconCache
+        if cache.set_color(self.theme_color(text)):
+            library.drop_pending(self)
+
         self.gui_app.set_theme(text)
+        color = self.qt_app.palette().color(QPalette.WindowText).rgba()
+        if cache.set_color(color):
+            # the theme did not set the palette the way it was probed
+            self.themeColors[text] = color
+            library.drop_pending(self)
+
+        # the theme applies to the whole application
+        for window in library.windows:
+            if window is not self:
+                window.show_theme(text)
+
+        if self.gui_view is not None:
+            self.prefetchIcons()
+            self.prewarmTimer.start()
+
+    @log_func_call
+    def show_theme(self, text: str):
+        "Show a theme applied from another window"
+        combo = self.gui_view.comboStyle
+        combo.blockSignals(True)
+        combo.setCurrentText(text)
+        combo.blockSignals(False)
+        self.prewarmTimer.start()
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def prewarmThemes(self):
+        """
+        While idle, render the glyphs on screen and just ahead in the colors
+        of the other themes, so switching to one of them is instant.
+        """
+        win = self.gui_view
+        if win is None or not IconBrowserApp.get(PREWARM_THEMES_KEY, True):
+            return
+
+        current = self.iconCache.color
+        colors = dict.fromkeys(self.theme_color(t)
+                               for t in self.theme_names())
+        proxy_row = self.proxyModel.source_row
+        visible, ahead, _ = win.listView.prefetch_ranges()
+        rows = [proxy_row(r) for r in chain(visible, ahead)]
+        model = self.model
+        sizing = self.iconSizing
+        for color in colors:
+            if color != current:
+                model.request_glyphs(rows, sizing, PREWARM_PRIORITY, color)
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def updateIconSize(self, size: int, settled: bool = True):
+        """
+        Show icons at `size`.  While the view is still being resized, glyphs
+        are rendered at the nearest cached size or bucket instead and scaled,
+        and at `size` itself once it settles.
+        """
+        render = (size if settled
+                  else drag_icon_size(size, self.iconCache.cached_sizes()))
+        if self.iconSizing.set_icon_size(render, size):
+            self.library.drop_pending(self)
+
+    def frame_painted(self, elapsed: float):
+        "Record the paint time and model lookups of a frame of the list"
+        METRICS.observe('paint', elapsed*1000)
+        METRICS.observe('data_calls_per_frame', self.model.take_data_calls(),
+                        'calls')
+
+    @log_func_call
+    def first_paint_done(self):
+        now = perf_counter()
+        if self.library.first_paint_done():
+            METRICS.phase('Launch to first paint', LAUNCH_TIME, now)
+            log_info(f'Icons first painted {now - LAUNCH_TIME:.3f} s after '
+                     'launch')
+
+        self.prewarmTimer.start()
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def prefetchIcons(self):
+        """
+        Queue the glyphs on screen and around it, weighted towards the
+        direction the list is scrolling.
+        """
+        win = self.gui_view
+        if win is None:
+            return
+
+        proxy_row = self.proxyModel.source_row
+        request = self.model.request_glyphs
+        sizing = self.iconSizing
+        visible, ahead, behind = win.listView.prefetch_ranges()
+        request(map(proxy_row, visible), sizing, VISIBLE_PRIORITY)
+        request(map(proxy_row, ahead), sizing, LOOKAHEAD_PRIORITY)
+        request(map(proxy_row, behind), sizing, LOOKBEHIND_PRIORITY)
+        # restarted on every scroll, so it fires once the list is idle
+        self.prewarmTimer.start()
 
     @log_func_call
     def updateColumns(self):
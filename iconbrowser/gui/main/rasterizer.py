@@ -0,0 +1,154 @@
+from collections.abc import Callable, Iterable
+
+from pyrandyos.gui.qt import QObject, QTimer, QPixmap, QColor
+
+from ...logging import log_func_call, DEBUGLOW2
+from ..qt import QThreadPool, QRunnable, Signal, Slot
+from ..render import prepare_font, render_glyph
+from ..atlasstore import AtlasStore
+from .iconcache import IconRasterCache, IconCacheKey
+
+ReadyFunc = Callable[[list[int]], None]
+
+
+class RasterTask(QRunnable):
+    "Render one glyph to a `QImage` on the rasterizer's pool"
+    def __init__(self, rasterizer: 'GlyphRasterizer', generation: int,
+                 key: IconCacheKey):
+        super().__init__()
+        self.rasterizer = rasterizer
+        self.generation = generation
+        self.key = key
+
+    def run(self):
+        rasterizer = self.rasterizer
+        gen = self.generation
+        if rasterizer.is_stale(gen):
+            return
+
+        specname, codepoint, size, color = self.key
+        image = render_glyph(specname, codepoint, size,
+                             QColor.fromRgba(color))
+        if not rasterizer.is_stale(gen):
+            rasterizer.rendered.emit(gen, self.key, image)
+
+
+class GlyphRasterizer(QObject):
+    """
+    Renders glyphs into an `IconRasterCache` on a thread pool.
+
+    Requests carry a priority so the rows on screen are rendered before the
+    look-ahead.  The color to render in is part of the cache key, so glyphs
+    can also be rendered ahead of a theme switch.  Finished glyphs are
+    converted to pixmaps on the GUI thread and, if they are in the color
+    shown and at a size some view shows, reported to `ready_func` in
+    batches of source rows, at most once per pass of the event loop.
+    Glyphs found in the on-disk atlas are loaded directly instead of being
+    rendered.  `drop_pending` discards everything queued or in flight, e.g.
+    when the filter, theme or icon size changes.
+    """
+    rendered = Signal(int, object, object)
+
+    def __init__(self, cache: IconRasterCache, ready_func: ReadyFunc,
+                 atlas: AtlasStore = None, parent: QObject = None):
+        super().__init__(parent)
+        self.cache = cache
+        self.atlas = atlas
+        self.ready_func = ready_func
+        self.generation = 0
+        # cache key -> source rows waiting on it (aliases share a key)
+        self.pending: dict[IconCacheKey, list[int]] = dict()
+        self.prepared: set[str] = set()
+        self.ready: list[int] = list()
+        self.pool = QThreadPool(self)
+
+        flushTimer = QTimer(self)
+        flushTimer.setSingleShot(True)
+        flushTimer.setInterval(0)
+        flushTimer.timeout.connect(self.flush)
+        self.flushTimer = flushTimer
+        # the rasterizer lives on the GUI thread, so this is queued
+        self.rendered.connect(self.deliver)
+
+    def is_stale(self, generation: int):
+        return generation != self.generation
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def drop_pending(self):
+        self.pool.clear()
+        self.pending.clear()
+        self.ready.clear()
+        self.generation += 1
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def request(self, rows: Iterable[tuple[int, IconCacheKey]],
+                priority: int = 0):
+        "Queue `(source row, cache key)` pairs that are not cached yet"
+        cache = self.cache.lru
+        pending = self.pending
+        prepared = self.prepared
+        pool = self.pool
+        gen = self.generation
+        is_current = self.cache.is_current
+        for row, key in rows:
+            waiting = pending.get(key)
+            if waiting is not None:
+                if row not in waiting:
+                    waiting.append(row)
+
+                continue
+
+            if key in cache:
+                continue
+
+            if self.from_atlas(key) is not None:
+                if is_current(key):
+                    self.ready.append(row)
+                    self.schedule_flush()
+
+                continue
+
+            specname = key[0]
+            if specname not in prepared:
+                prepare_font(specname)
+                prepared.add(specname)
+
+            pending[key] = [row]
+            pool.start(RasterTask(self, gen, key), priority)
+
+    @Slot(int, object, object)
+    def deliver(self, generation: int, key: IconCacheKey, image):
+        rows = self.pending.pop(key, None)
+        if rows is None or self.is_stale(generation):
+            return
+
+        cache = self.cache
+        cache.insert(key, QPixmap.fromImage(image))
+        if cache.is_current(key):
+            self.ready.extend(rows)
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        if not self.flushTimer.isActive():
+            self.flushTimer.start()
+
+    def from_atlas(self, key: IconCacheKey) -> QPixmap | None:
+        "Load a glyph from the atlas into the cache, if the atlas has it"
+        atlas = self.atlas
+        if atlas is None:
+            return None
+
+        image = atlas.image(*key)
+        if image is None:
+            return None
+
+        pm = QPixmap.fromImage(image)
+        self.cache.insert(key, pm)
+        return pm
+
+    @Slot()
+    def flush(self):
+        ready = self.ready
+        if ready:
+            self.ready = list()
+            self.ready_func(ready)
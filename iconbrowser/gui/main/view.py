@@ -2,25 +2,32 @@ from typing import TYPE_CHECKING
 
 from pyrandyos.gui.qt import (
     QToolBar, QComboBox, QListView, QLineEdit, QVBoxLayout,
-    QShortcut, Qt, QKeySequence,
+    QShortcut, Qt, QKeySequence, QLabel, QMainWindow,
 )
 from pyrandyos.gui.callback import qt_callback
 from pyrandyos.gui.window import GuiWindowView
 from pyrandyos.gui.widgets.viewbase import GuiViewBaseFrame
 from pyrandyos.gui.widgets.statusbar import LoggingStatusBarWidget
-from pyrandyos.gui.loadstatus import load_status_step
 from pyrandyos.gui.utils import (
     create_action, create_toolbar_expanding_spacer,
     set_widget_sizepolicy_h_expanding, show_toolbtn_icon_and_text
 )
 
 from ...app import IconBrowserApp
-from ...logging import log_func_call
-from ..gui_icons import ConfigIcon, CopyCodeIcon, CopyNameIcon
+from ...logging import log_func_call, DEBUGLOW2
+from ..gui_icons import (
+    ConfigIcon, CopyCodeIcon, CopyNameIcon, FuzzyIcon, ExportIcon, BundleIcon,
+    MetricsIcon, WindowIcon, SimilarIcon,
+)
 from ..constants import (
-    ALL_COLLECTIONS, DEFAULT_VIEW_COLUMNS, VIEW_COLUMNS_OPTIONS
+    ALL_COLLECTIONS, DEFAULT_VIEW_COLUMNS, VIEW_COLUMNS_OPTIONS,
+    LOAD_STEP_TOOLBARS,
 )
+from ..qt import QCloseEvent
+from ..loadsteps import timed_load_step
 from .iconlistview import IconListView
+from .icondelegate import IconDelegate
+from .metricsdock import MetricsDock
 if TYPE_CHECKING:
     from .pres import MainWindow
 
@@ -32,23 +39,28 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         qtobj = self.qtobj
         qtobj.resize(*IconBrowserApp.get_default_win_size())
         qtobj.setMinimumSize(900, 600)
+        qtobj.closeEvent = self.closeEvent
 
         layout = QVBoxLayout()
         self.layout = layout
         self.basewidget.qtobj.setLayout(layout)
 
         self.status_bar = LoggingStatusBarWidget(self)
+        self.create_filter_status()
 
-        self.create_toolbars()
+        # just the shell: the presenter adds the controls once it is shown
+        self.create_metrics_dock()
         self.create_icon_list_view()
+        self.center_window_in_current_screen()
+
+    @log_func_call
+    def create_controls(self):
+        self.create_toolbars()
         self.set_tab_order()
         self.setup_shortcuts()
-
         self.lineEditFilter.setFocus()
-        self.center_window_in_current_screen()
-        self.gui_pres.updateStyle(self.comboStyle.currentText())
 
-    @load_status_step("Creating toolbars")
+    @timed_load_step(LOAD_STEP_TOOLBARS)
     @log_func_call
     def create_toolbars(self):
         self.create_filter_toolbar()
@@ -97,6 +109,15 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         self.lineEditFilter = lineEditFilter
         toolbar.addWidget(lineEditFilter)
 
+        fuzzyAction = create_action(qtobj, "Fuzzy", FuzzyIcon.icon(),
+                                    pres.triggerImmediateUpdate,
+                                    checkable=True,
+                                    tooltip="Match the search terms as "
+                                    "subsequences and rank the icons by "
+                                    "how well they match")
+        self.fuzzyAction = fuzzyAction
+        toolbar.addAction(fuzzyAction)
+
     @log_func_call
     def create_name_toolbar(self):
         qtobj = self.qtobj
@@ -125,8 +146,8 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
 
         copyButton = create_action(qtobj, "Copy Name", CopyNameIcon.icon(),
                                    pres.copyIconText, enabled=False,
-                                   tooltip="Copy selected icon "
-                                   "full identifier to the clipboard")
+                                   tooltip="Copy the full identifiers of "
+                                   "the selected icons to the clipboard")
         self.copyButton = copyButton
         toolbar.addAction(copyButton)
         show_toolbtn_icon_and_text(toolbar.widgetForAction(copyButton))
@@ -135,13 +156,42 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
                                             CopyCodeIcon.icon(),
                                             pres.copyIconPyRandyOSCode,
                                             enabled=False,
-                                            tooltip="Copy selected icon "
-                                            "PyRandyOS code to the clipboard")
+                                            tooltip="Copy PyRandyOS code for "
+                                            "the selected icons to the "
+                                            "clipboard")
         self.copyPyRandyOSButton = copyPyRandyOSButton
         toolbar.addAction(copyPyRandyOSButton)
         widget = toolbar.widgetForAction(copyPyRandyOSButton)
         show_toolbtn_icon_and_text(widget)
 
+        similarButton = create_action(qtobj, "Find Similar",
+                                      SimilarIcon.icon(), pres.findSimilar,
+                                      enabled=False,
+                                      tooltip="Show the icons of every "
+                                      "collection that look most like the "
+                                      "selected one (Ctrl+Shift+F)")
+        self.similarButton = similarButton
+        toolbar.addAction(similarButton)
+        show_toolbtn_icon_and_text(toolbar.widgetForAction(similarButton))
+
+        exportButton = create_action(qtobj, "Export", ExportIcon.icon(),
+                                     pres.exportIcons,
+                                     tooltip="Render the icons shown in the "
+                                     "list to PNG files or sprite sheets")
+        self.exportButton = exportButton
+        toolbar.addAction(exportButton)
+        show_toolbtn_icon_and_text(toolbar.widgetForAction(exportButton))
+
+        bundleButton = create_action(qtobj, "Bundle", BundleIcon.icon(),
+                                     pres.bundleIcons,
+                                     tooltip="Build a resource bundle of "
+                                     "pre-rendered glyphs and a Python module "
+                                     "of IconSpec-like accessors for the "
+                                     "selected icons, or for every icon shown")
+        self.bundleButton = bundleButton
+        toolbar.addAction(bundleButton)
+        show_toolbtn_icon_and_text(toolbar.widgetForAction(bundleButton))
+
         # @log_func_call
         # def create_view_toolbar(self):
         # qtobj = self.qtobj
@@ -190,9 +240,49 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         self.comboStyle = comboStyle
         toolbar.addWidget(comboStyle)
 
+        metricsAction = self.metricsDock.qtobj.toggleViewAction()
+        metricsAction.setIcon(MetricsIcon.icon())
+        metricsAction.setToolTip("Show filter, rendering and startup "
+                                 "timings")
+        toolbar.addAction(metricsAction)
+
+        toolbar.addAction(create_action(qtobj, "New Window", WindowIcon.icon(),
+                                        pres.newWindow,
+                                        tooltip="Open another window on the "
+                                        "same icons, for comparing side by "
+                                        "side (Ctrl+N)"))
+
         toolbar.addAction(create_action(qtobj, "Config", ConfigIcon.icon(),
                                         pres.click_config))
 
+    @log_func_call
+    def create_filter_status(self):
+        filterStatus = QLabel()
+        filterStatus.setToolTip("Matching icons and latency of the last "
+                                "search")
+        self.status_bar.status_bar.addPermanentWidget(filterStatus)
+        self.filterStatus = filterStatus
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def show_filter_status(self, text: str):
+        self.filterStatus.setText(text)
+
+    def show_export_progress(self, done: int, total: int):
+        self.status_bar.update_status_bar_msg(
+            f'Rendering icons: {done:,} of {total:,}', temp=True
+        )
+
+    @log_func_call
+    def create_metrics_dock(self):
+        dock = MetricsDock(self)
+        self.metricsDock = dock
+        self.qtobj.addDockWidget(Qt.RightDockWidgetArea, dock.qtobj)
+        dock.qtobj.hide()
+
+    def closeEvent(self, event: QCloseEvent):
+        self.gui_pres.window_closed()
+        return QMainWindow.closeEvent(self.qtobj, event)
+
     @log_func_call
     def create_basewidget(self):
         return GuiViewBaseFrame(self)
@@ -207,6 +297,11 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         lvwidget.setUniformItemSizes(True)
         lvwidget.setViewMode(QListView.IconMode)
         lvwidget.setModel(pres.proxyModel)
+        # draws the glyphs itself rather than through Qt.DecorationRole
+        delegate = IconDelegate(pres.model, pres.proxyModel, pres.iconSizing,
+                                lvwidget)
+        lvwidget.setItemDelegate(delegate)
+        self.iconDelegate = delegate
         lvwidget.setContextMenuPolicy(Qt.CustomContextMenu)
         lvwidget.doubleClicked.connect(qt_callback(pres.doubleClickIcon))
         selmodel = lvwidget.selectionModel()
@@ -230,3 +325,5 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         qtobj = self.qtobj
         QShortcut(QKeySequence(Qt.Key_Return), qtobj, pres.copyIconText)
         QShortcut(QKeySequence("Ctrl+F"), qtobj, self.lineEditFilter.setFocus)
+        QShortcut(QKeySequence("Ctrl+N"), qtobj, pres.newWindow)
+        QShortcut(QKeySequence("Ctrl+Shift+F"), qtobj, pres.findSimilar)
@@ -0,0 +1,20 @@
+"""
+Qt names the browser uses that `pyrandyos.gui.qt` does not export.  Import
+everything else from there, and only these from here.
+"""
+from PySide2.QtCore import (  # noqa: F401
+    QAbstractItemModel,
+    QAbstractListModel,
+    QAbstractProxyModel,
+    QThreadPool,
+    QRunnable,
+    Signal,
+    Slot,
+)
+from PySide2.QtGui import (  # noqa: F401
+    QCloseEvent,
+)
+from PySide2.QtWidgets import (  # noqa: F401
+    QDockWidget,
+    QFormLayout,
+)
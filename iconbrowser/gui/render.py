@@ -0,0 +1,78 @@
+import os
+
+from pyrandyos.gui.qt import (
+    QImage, QPainter, QColor, Qt, QApplication, QBuffer, QByteArray,
+    QIODevice,
+)
+from pyrandyos.gui.icons.iconfont.sources import THIRDPARTY_FONTSPEC
+
+from ..logging import log_func_call, DEBUGLOW2
+from .fonts import load_collection
+
+
+def offscreen_app():
+    """
+    The Qt application, creating one on the offscreen platform if there is
+    none, for rendering without a display (e.g. on a headless server).
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return QApplication.instance() or QApplication([])
+
+
+def image_png(image: QImage) -> bytes:
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QIODevice.WriteOnly)
+    image.save(buf, 'PNG')
+    buf.close()
+    return bytes(data)
+
+
+def glyph_draw_size(size: int):
+    "Font pixel size for an icon of `size` pixels, matching `IconLayer`"
+    return round(0.875*size)
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def prepare_font(specname: str):
+    """
+    Load the collection and register its font with Qt.  This must happen on
+    the GUI thread before any other thread calls `render_glyph` for the
+    collection.
+    """
+    load_collection(specname)
+    fontcls = THIRDPARTY_FONTSPEC[specname].get_font_class()
+    fontcls.ensure_font_loaded()
+    return fontcls
+
+
+def render_glyph(specname: str, codepoint: int, size: int,
+                 color: QColor) -> QImage:
+    """
+    Render one glyph centered in a transparent `size` x `size` image.
+
+    Only `QImage` and `QRawFont` are used, so unlike `QIcon.pixmap` this is
+    safe to call off the GUI thread and does not depend on the application
+    palette; the color is given explicitly.
+    """
+    fontcls = THIRDPARTY_FONTSPEC[specname].get_font_class()
+    rawfont = fontcls.get_rawfont(glyph_draw_size(size))
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    glyphs = rawfont.glyphIndexesForString(chr(codepoint))
+    if not glyphs:
+        return image
+
+    glyph = glyphs[0]
+    advance = rawfont.advancesForGlyphIndexes((glyph,))[0]
+    ascent = rawfont.ascent()
+    height = ascent + rawfont.descent()
+    path = rawfont.pathForGlyph(glyph)
+    path.translate((size - abs(advance.x()))/2, (size - height)/2 + ascent)
+    path.setFillRule(Qt.WindingFill)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    painter.fillPath(path, color)
+    painter.end()
+    return image
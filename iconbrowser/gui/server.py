@@ -0,0 +1,71 @@
+from pathlib import Path
+from time import perf_counter
+
+from pyrandyos.gui.qt import QColor
+
+from ..logging import log_func_call, log_info, log_warning
+from ..lrucache import ByteBudgetLRUCache
+from ..service import IconService
+from ..daemon import IconDaemon
+from .constants import DEFAULT_ICON_CACHE_MB
+from .fonts import load_saved_catalog, build_full_catalog, save_catalog
+from .render import offscreen_app, prepare_font, render_glyph, image_png
+
+
+class PngRenderer:
+    """
+    Renders glyphs to PNG bytes on the offscreen platform, keeping the most
+    recently requested ones.  Everything happens on the calling thread,
+    which must be the one the Qt application was created on.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_ICON_CACHE_MB*2**20):
+        offscreen_app()
+        self.lru = ByteBudgetLRUCache(max_bytes, len)
+
+    def __call__(self, specname: str, codepoint: int, size: int,
+                 color: int) -> bytes:
+        key = (specname, codepoint, size, color)
+        lru = self.lru
+        png = lru.get(key)
+        if png is None:
+            prepare_font(specname)
+            image = render_glyph(specname, codepoint, size,
+                                 QColor.fromRgba(color))
+            png = image_png(image)
+            lru.put(key, png)
+
+        return png
+
+
+@log_func_call
+def server_catalog():
+    """
+    The catalog snapshot if there is a current one, or else the catalog
+    built here and saved for next time.  The fonts are loaded in this
+    process anyway, so unlike the command-line tools the daemon never
+    needs a child process for it.
+    """
+    catalog = load_saved_catalog()
+    if catalog is None:
+        catalog = build_full_catalog()
+        try:
+            save_catalog(catalog)
+        except OSError as e:
+            log_warning(f'Could not save the catalog snapshot: {e}')
+
+    return catalog
+
+
+@log_func_call
+def run_server_command(socket_path: Path = None):
+    """
+    Serve lookups over a Unix domain socket until a client sends a
+    'shutdown' request (or the process is interrupted).
+    """
+    t0 = perf_counter()
+    service = IconService(server_catalog(), renderer=PngRenderer())
+    daemon = IconDaemon(service, socket_path)
+    log_info(f'Icon daemon ready in {perf_counter() - t0:.3f} s, listening '
+             f'on {daemon.path}')
+    daemon.run()
+    return 0
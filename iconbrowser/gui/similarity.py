@@ -0,0 +1,99 @@
+import os
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from time import perf_counter
+
+import numpy as np
+from pyrandyos.gui.qt import QImage, QColor, Qt
+
+from ..logging import log_func_call
+from ..cachedir import get_cache_dir
+from ..snapshot import snapshot_stamp
+from ..similarity import (
+    GlyphHashes, HASH_SIZE, GLYPH_HASHES_NAME, perceptual_hashes,
+    save_glyph_hashes, load_glyph_hashes,
+)
+from .render import offscreen_app, prepare_font, render_glyph
+from .atlasstore import image_bytes
+from .export import ProgressFunc
+
+# glyphs rendered and hashed by one task of the process pool
+HASH_CHUNK = 1024
+
+
+def glyph_hashes_path():
+    return get_cache_dir()/GLYPH_HASHES_NAME
+
+
+def load_cached_hashes():
+    "The hashes in the cache directory, or none if missing or stale"
+    hashes = load_glyph_hashes(glyph_hashes_path(), snapshot_stamp())
+    return GlyphHashes() if hashes is None else hashes
+
+
+@log_func_call
+def save_cached_hashes(hashes: GlyphHashes):
+    path = glyph_hashes_path()
+    save_glyph_hashes(path, hashes, snapshot_stamp())
+    return path
+
+
+def glyph_coverage(image: QImage):
+    "Alpha channel of a rendered glyph, as a 2-D uint8 array"
+    size = image.width()
+    argb = np.frombuffer(image_bytes(image), np.uint32)
+    return (argb >> 24).astype(np.uint8).reshape(size, size)
+
+
+def init_hash_process():
+    offscreen_app()
+
+
+def hash_glyph_chunk(specname: str, codepoints: np.ndarray):
+    """
+    Render some glyphs of a collection in a hashing process and hash them
+    together.  Returns the collection, codepoints and hashes.
+    """
+    prepare_font(specname)
+    color = QColor(Qt.black)
+    bitmaps = np.empty((len(codepoints), HASH_SIZE, HASH_SIZE), np.uint8)
+    for i, cp in enumerate(codepoints.tolist()):
+        bitmaps[i] = glyph_coverage(render_glyph(specname, cp, HASH_SIZE,
+                                                 color))
+
+    return specname, codepoints, perceptual_hashes(bitmaps)
+
+
+@log_func_call
+def hash_glyphs(glyphs: Mapping[str, np.ndarray], jobs: int = None,
+                progress: ProgressFunc = None):
+    """
+    Hash the given codepoints of each collection.  The glyphs are rendered
+    in chunks by a pool of `jobs` processes (one per CPU by default) on the
+    offscreen platform, each chunk hashed in one batch.  Returns the
+    `GlyphHashes` and the seconds it took.
+    """
+    t0 = perf_counter()
+    tasks = [(specname, cps[i:i + HASH_CHUNK])
+             for specname, cps in glyphs.items()
+             for i in range(0, len(cps), HASH_CHUNK)]
+    total = sum(len(cps) for cps in glyphs.values())
+    if not tasks:
+        return GlyphHashes(), perf_counter() - t0
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    done = 0
+    parts = list()
+    # spawned rather than forked, as for exports (see `export_icons`)
+    with ProcessPoolExecutor(jobs, get_context('spawn'),
+                             initializer=init_hash_process) as pool:
+        futures = [pool.submit(hash_glyph_chunk, *t) for t in tasks]
+        for future in as_completed(futures):
+            part = future.result()
+            parts.append(part)
+            done += len(part[1])
+            if progress:
+                progress(done, total)
+
+    return GlyphHashes.from_glyphs(parts), perf_counter() - t0
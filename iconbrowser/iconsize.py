@@ -0,0 +1,49 @@
+from collections.abc import Iterable
+from math import log
+
+# sizes glyphs are rendered at while the view is being resized, so that a
+# window drag only ever renders a handful of sizes, each of which is scaled
+# to the size actually shown until the drag settles
+ICON_SIZE_BUCKETS = (16, 20, 24, 32, 40, 48, 64, 80, 96, 128, 160, 192, 256)
+# while dragging, a cached size is scaled rather than rendering a bucket as
+# long as it is within this factor of the size shown
+MAX_DRAG_SCALE = 1.5
+# scaling up blurs, scaling down does not, so it counts for this much more
+UPSCALE_PENALTY = 2.0
+
+
+def grid_size(width: int, columns: int) -> tuple[int, int]:
+    "Tile and icon width in pixels for a viewport `width` pixels wide"
+    # The minus 30 ensures we don't end up with an item width that can't be
+    # drawn the expected number of times across the view without being
+    # wrapped. Without this, the view can flicker during resize
+    tileWidth = max(width - 30, 0)/max(columns, 1)
+    # tileWidth needs to be an integer for setGridSize
+    return int(tileWidth), int(tileWidth*0.8)
+
+
+def scale_cost(source: int, size: int):
+    "How much worse a glyph drawn at `source` looks scaled to `size`"
+    if source <= 0 or size <= 0:
+        return float('inf')
+
+    cost = log(source/size)
+    return -cost*UPSCALE_PENALTY if cost < 0 else cost
+
+
+def nearest_bucket(size: int, sizes: Iterable[int] = ICON_SIZE_BUCKETS):
+    "The one of `sizes` that looks best scaled to `size`, or None"
+    return min(sizes, key=lambda s: (scale_cost(s, size), -s), default=None)
+
+
+def drag_icon_size(size: int, cached: Iterable[int] = ()):
+    """
+    Size to render glyphs at while the view is resized to show them at
+    `size`: the nearest size already cached if it scales well enough, or
+    else the nearest bucket.
+    """
+    best = nearest_bucket(size, cached)
+    if best is not None and scale_cost(best, size) <= log(MAX_DRAG_SCALE):
+        return best
+
+    return nearest_bucket(size)
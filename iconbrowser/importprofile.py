@@ -0,0 +1,92 @@
+import re
+import os
+import sys
+import subprocess
+from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+
+DEFAULT_PROFILE_MODULE = 'iconbrowser.gui'
+DEFAULT_PROFILE_TOP = 25
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(.+)$')
+
+
+class ImportTime:
+    "One module in the output of `python -X importtime`, in microseconds"
+    def __init__(self, module: str, self_us: int, cumulative_us: int,
+                 level: int):
+        self.module = module
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.level = level
+
+    @property
+    def package(self):
+        return self.module.partition('.')[0]
+
+
+def parse_importtime(text: str) -> list[ImportTime]:
+    "Parse `-X importtime` output, skipping anything else on stderr"
+    times = list()
+    for line in text.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, module = m.groups()
+            times.append(ImportTime(module.strip(), int(self_us),
+                                    int(cumulative_us),
+                                    (len(indent) - 1)//2))
+
+    return times
+
+
+def package_totals(times: Iterable[ImportTime]):
+    "Self time in microseconds per top-level package, largest first"
+    totals: dict[str, int] = defaultdict(int)
+    for t in times:
+        totals[t.package] += t.self_us
+
+    return sorted(totals.items(), key=lambda kv: -kv[1])
+
+
+def format_import_profile(times: list[ImportTime],
+                          top: int = DEFAULT_PROFILE_TOP):
+    total = sum(t.self_us for t in times)
+    lines = [f'{len(times):,} modules imported in {total/1000:,.1f} ms',
+             '', f'{"self ms":>9} {"share":>6}  package']
+    lines += [f'{us/1000:9.1f} {us/max(total, 1):6.1%}  {package}'
+              for package, us in package_totals(times)[:top]]
+    lines += ['', f'{"cum ms":>9} {"self ms":>9}  module']
+    slowest = sorted(times, key=lambda t: -t.cumulative_us)[:top]
+    lines += [f'{t.cumulative_us/1000:9.1f} {t.self_us/1000:9.1f}  {t.module}'
+              for t in slowest]
+    return '\n'.join(lines)
+
+
+def profile_imports(module: str = DEFAULT_PROFILE_MODULE):
+    """
+    Import `module` in a fresh interpreter under `-X importtime`.  Returns
+    the import times, the exit code and everything written to stderr.
+    """
+    env = dict(os.environ)
+    root = str(Path(__file__).parent.parent)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (
+        root, env.get('PYTHONPATH'))))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                           f'import {module}'],
+                          env=env, capture_output=True, text=True)
+    return parse_importtime(proc.stderr), proc.returncode, proc.stderr
+
+
+def run_import_profile(module: str = DEFAULT_PROFILE_MODULE,
+                       top: int = DEFAULT_PROFILE_TOP):
+    "Print where the time to import `module` goes; returns an exit code"
+    times, code, stderr = profile_imports(module)
+    print(f'Import profile of {module}:')
+    print(format_import_profile(times, top))
+    if code:
+        errors = [line for line in stderr.splitlines()
+                  if not IMPORTTIME_LINE.match(line)]
+        print(f'\nImporting {module} failed: '
+              f'{errors[-1] if errors else code}', file=sys.stderr)
+
+    return code
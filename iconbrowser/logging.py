@@ -1,7 +1,131 @@
+import sys
+from collections.abc import Callable
+from typing import TypeVar, Any
+
 from pyrandyos.logging import (  # noqa: F401
     get_logger, DEBUGLOW, LOGSTDOUT, LOGSTDERR, LOGTQDM, DEBUGLOW2,
     APP_LOG_LEVEL_NAMES, WARN, ERROR, DEBUG, INFO, CRITICAL, WARNING,
-    Logger, log_func_call, log_exc, log_message, log_debuglow2, log_debuglow,
+    Logger, log_exc, log_message, log_debuglow2, log_debuglow,
     log_debug, log_info, log_warning, log_error, log_critical,
-    set_func_call_logging, set_trace_logging,
+    get_tracelog, get_func_call_logging,
+    log_func_call as _log_func_call,
+    set_func_call_logging as _set_func_call_logging,
+    set_trace_logging as _set_trace_logging,
 )
+
+F = TypeVar("F", bound=Callable[..., Any])
+PACKAGE = __name__.rpartition('.')[0]
+
+
+class TracedFunc:
+    """
+    A function decorated with `log_func_call(..., trace_only=True)`, which
+    is bound undecorated wherever it was defined while tracing is off.
+    """
+    def __init__(self, func: Callable, decorator: Callable[[F], F]):
+        self.func = func
+        self.decorator = decorator
+        self._wrapped: Callable = None
+        self.bound = func
+
+    @property
+    def wrapped(self):
+        wrapped = self._wrapped
+        if wrapped is None:
+            # generating the wrapper costs more than the call, so only do it
+            # the first time tracing is turned on
+            wrapped = self.decorator(self.func)
+            self._wrapped = wrapped
+
+        return wrapped
+
+    def owner(self):
+        "The class or module the function is an attribute of, if any"
+        func = self.func
+        *path, name = func.__qualname__.split('.')
+        if '<locals>' in path:
+            return None, name
+
+        owner = sys.modules.get(func.__module__)
+        for part in path:
+            owner = getattr(owner, part, None)
+
+        return owner, name
+
+    def rebind(self, traced: bool):
+        new = self.wrapped if traced else self.func
+        old = self.bound
+        if new is old:
+            return
+
+        owner, name = self.owner()
+        if owner is not None:
+            attr = vars(owner).get(name)
+            if isinstance(attr, (classmethod, staticmethod)):
+                if attr.__func__ is old:
+                    setattr(owner, name, type(attr)(new))
+            elif attr is old:
+                setattr(owner, name, new)
+
+        if '.' not in self.func.__qualname__:
+            # module functions imported by name elsewhere in the package
+            for modname, mod in list(sys.modules.items()):
+                if modname.partition('.')[0] != PACKAGE or mod is None:
+                    continue
+
+                mvars = vars(mod)
+                for k, v in list(mvars.items()):
+                    if v is old:
+                        mvars[k] = new
+
+        self.bound = new
+
+
+TRACED_FUNCS: list[TracedFunc] = list()
+
+
+def tracing_enabled():
+    return get_func_call_logging() and get_tracelog()
+
+
+def log_func_call(arg, *, trace_only: bool = False, stacklevel: int = 1):
+    """
+    PyRandyOS's `log_func_call`, except that functions decorated with
+    `trace_only=True` are returned undecorated if tracing is off when they
+    are defined, so they cost nothing per call.  Turning tracing on through
+    `set_trace_logging` or `set_func_call_logging` rebinds them decorated
+    in their class or module; references taken earlier, such as connected
+    callbacks, keep the binding they were taken with.
+    """
+    if callable(arg) or not trace_only:
+        return _log_func_call(arg, trace_only=trace_only,
+                              stacklevel=stacklevel)
+
+    decorator = _log_func_call(arg, trace_only=True, stacklevel=stacklevel)
+
+    def trace_decorator(func: F) -> F:
+        traced = TracedFunc(func, decorator)
+        TRACED_FUNCS.append(traced)
+        if tracing_enabled():
+            traced.bound = traced.wrapped
+
+        return traced.bound
+
+    return trace_decorator
+
+
+def rebind_traced_funcs():
+    "Bind trace-only functions decorated or not as tracing now requires"
+    traced = tracing_enabled()
+    for t in TRACED_FUNCS:
+        t.rebind(traced)
+
+
+def set_trace_logging(enabled: bool = True):
+    _set_trace_logging(enabled)
+    rebind_traced_funcs()
+
+
+def set_func_call_logging(enabled: bool = True):
+    _set_func_call_logging(enabled)
+    rebind_traced_funcs()
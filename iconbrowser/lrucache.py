@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+class LRUCacheStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits/total if total else 0.0
+
+    def as_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+        }
+
+
+class ByteBudgetLRUCache:
+    """
+    Least-recently-used cache bounded by the total size in bytes of the
+    stored values rather than by the number of entries.  The size of each
+    value is computed once on insertion by the given `sizeof` callable.
+    """
+    def __init__(self, max_bytes: int, sizeof: Callable[[object], int]):
+        self._data: OrderedDict[Hashable, tuple[object, int]] = OrderedDict()
+        self._sizeof = sizeof
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.stats = LRUCacheStats()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable):
+        return key in self._data
+
+    def items(self):
+        "Iterate over (key, value) pairs, least recently used first"
+        for key, (value, _) in self._data.items():
+            yield key, value
+
+    def get(self, key: Hashable, default=None):
+        data = self._data
+        entry = data.get(key)
+        stats = self.stats
+        if entry is None:
+            stats.misses += 1
+            return default
+
+        stats.hits += 1
+        data.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: object):
+        self.pop(key)
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            # would evict everything else and still not fit
+            return
+
+        self._data[key] = (value, size)
+        self.nbytes += size
+        self.evict()
+
+    def pop(self, key: Hashable, default=None):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+
+        self.nbytes -= entry[1]
+        return entry[0]
+
+    def evict(self):
+        data = self._data
+        stats = self.stats
+        max_bytes = self.max_bytes
+        while self.nbytes > max_bytes and data:
+            _, (_, size) = data.popitem(last=False)
+            self.nbytes -= size
+            stats.evictions += 1
+
+    def set_max_bytes(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def discard_where(self, pred: Callable[[Hashable], bool]):
+        "Remove every entry whose key satisfies `pred`, returning the count"
+        keys = [k for k in self._data if pred(k)]
+        for k in keys:
+            self.pop(k)
+
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
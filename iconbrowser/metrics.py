@@ -0,0 +1,155 @@
+from bisect import bisect_left
+from collections.abc import Callable
+from json import dumps as jdumps
+from pathlib import Path
+from time import perf_counter
+
+from .version import __version__
+
+# upper bounds of the histogram bins: 1-2-5 steps from 0.01 to 50,000,
+# which covers both milliseconds and counts
+HISTOGRAM_BOUNDS = tuple(m*10.0**e for e in range(-2, 5) for m in (1, 2, 5))
+HISTOGRAM_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """
+    Counts of values in fixed bins, plus their count, sum, minimum and
+    maximum.  Adding a value is a bisection and a few additions, cheap
+    enough for once per frame or keystroke; quantiles are estimated as the
+    upper bound of the bin they fall in.
+    """
+    def __init__(self, unit: str = 'ms',
+                 bounds: tuple[float, ...] = HISTOGRAM_BOUNDS):
+        self.unit = unit
+        self.bounds = bounds
+        self.reset()
+
+    def reset(self):
+        self.counts = [0]*(len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def add(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total/self.count if self.count else 0.0
+
+    def quantile(self, q: float):
+        if not self.count:
+            return 0.0
+
+        rank = q*self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+
+        return self.max
+
+    def as_dict(self):
+        d = {'unit': self.unit, 'count': self.count}
+        if self.count:
+            d.update(mean=self.mean(), min=self.min, max=self.max)
+            d.update((f'p{round(q*100)}', self.quantile(q))
+                     for q in HISTOGRAM_QUANTILES)
+            # [upper bound, count] of the bins used; None for the overflow
+            bounds = self.bounds + (None,)
+            d['bins'] = [[b, n] for b, n in zip(bounds, self.counts) if n]
+
+        return d
+
+
+class Metrics:
+    """
+    Process-wide performance counters, histograms and gauges, plus the
+    start and end of named phases relative to `origin`, all exportable as
+    JSON for regression tracking.  Gauges are callables sampled when a
+    snapshot is taken, so they cost nothing in between.
+    """
+    def __init__(self, origin: float = None):
+        self.origin = perf_counter() if origin is None else origin
+        self.histograms: dict[str, Histogram] = dict()
+        self.counters: dict[str, int] = dict()
+        self.gauges: dict[str, Callable[[], object]] = dict()
+        # name -> [start, end], in perf_counter seconds
+        self.phases: dict[str, list[float]] = dict()
+
+    def histogram(self, name: str, unit: str = 'ms'):
+        h = self.histograms.get(name)
+        if h is None:
+            h = Histogram(unit)
+            self.histograms[name] = h
+
+        return h
+
+    def observe(self, name: str, value: float, unit: str = 'ms'):
+        self.histogram(name, unit).add(value)
+
+    def count(self, name: str, n: int = 1):
+        counters = self.counters
+        counters[name] = counters.get(name, 0) + n
+
+    def gauge(self, name: str, func: Callable[[], object]):
+        self.gauges[name] = func
+
+    def phase(self, name: str, start: float, end: float = None):
+        self.phases[name] = [start, end]
+
+    def phase_started(self, name: str):
+        self.phase(name, perf_counter())
+
+    def phase_done(self, name: str):
+        span = self.phases.get(name)
+        now = perf_counter()
+        if span is None:
+            self.phase(name, self.origin, now)
+        else:
+            span[1] = now
+
+    def reset(self):
+        "Clear the counters and histograms; phases and gauges are kept"
+        self.counters.clear()
+        for h in self.histograms.values():
+            h.reset()
+
+    def snapshot(self):
+        origin = self.origin
+        phases = dict()
+        for name, (start, end) in sorted(self.phases.items(),
+                                         key=lambda kv: kv[1][0]):
+            phases[name] = {
+                'start_s': start - origin,
+                'duration_s': None if end is None else end - start,
+            }
+
+        return {
+            'version': __version__,
+            'uptime_s': perf_counter() - origin,
+            'phases': phases,
+            'counters': dict(self.counters),
+            'histograms': {k: h.as_dict()
+                           for k, h in sorted(self.histograms.items())},
+            'gauges': {k: f() for k, f in sorted(self.gauges.items())},
+        }
+
+    def to_json(self):
+        return jdumps(self.snapshot(), indent=2)
+
+    def write_json(self, path: Path):
+        path.write_text(self.to_json(), encoding='utf-8')
+        return path
+
+
+METRICS = Metrics()
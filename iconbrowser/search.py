@@ -0,0 +1,282 @@
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import compress, repeat
+
+from .catalog import IconCatalog, range_covers
+
+NGRAM = 3
+# above roughly one hit in this many candidate rows, sweeping the rows in
+# order is cheaper than expanding and sorting the hits
+EXPAND_RATIO = 8
+
+
+def ngrams(s: str, n: int = NGRAM):
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+
+class TrigramIndex:
+    """
+    Case-insensitive substring index over an `IconCatalog`.
+
+    A query matches a row when it is a substring of the row's
+    'specname:iconname' string, which is what the old
+    `^{group}:.*{term}.*$` filter matched, except that the query is taken
+    literally rather than as a regular expression.
+
+    Glyph names are shared by many collections, so the trigram posting lists
+    are built over the catalog's unique name table rather than its rows and
+    are expanded to rows only for the names that match.
+
+    With `postings=False` nothing is built up front and every search is a
+    sweep over the rows, which is cheaper for a handful of queries;
+    `build_postings` can be called later.
+    """
+    def __init__(self, catalog: IconCatalog, postings: bool = True):
+        self.catalog = catalog
+        self.names = [n.lower() for n in catalog.names]
+        self.collections = [c.lower() for c in catalog.collections]
+        self.postings: dict[str, array] = None
+        if postings:
+            self.build_postings()
+
+    def build_postings(self):
+        postings: dict[str, list[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for g in ngrams(name):
+                postings[g].append(i)
+
+        self.postings = {g: array('I', ids) for g, ids in postings.items()}
+        self.build_name_rows()
+
+    def build_name_rows(self):
+        "Group the catalog rows by name id (CSR layout)"
+        name_ids = self.catalog.name_ids
+        counts = array('I', [0])*(len(self.names) + 1)
+        for i in name_ids:
+            counts[i + 1] += 1
+
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+
+        fill = array('I', counts)
+        name_rows = array('I', [0])*len(name_ids)
+        for row, i in enumerate(name_ids):
+            name_rows[fill[i]] = row
+            fill[i] += 1
+
+        self.name_row_starts = counts
+        self.name_rows = name_rows
+
+    def rows_for_name(self, name_id: int):
+        starts = self.name_row_starts
+        return self.name_rows[starts[name_id]:starts[name_id + 1]]
+
+    def name_mask(self, term: str):
+        "Return a byte per glyph name, set if the name contains `term`"
+        return bytearray(map(str.__contains__, self.names, repeat(term)))
+
+    def match_names(self, term: str) -> list[int]:
+        "Return the ids of every glyph name containing `term` (lowercase)"
+        names = self.names
+        if len(term) < NGRAM:
+            return list(compress(range(len(names)), self.name_mask(term)))
+
+        postings = self.postings
+        smallest = None
+        for g in ngrams(term):
+            ids = postings.get(g)
+            if ids is None:
+                return []
+
+            if smallest is None or len(ids) < len(smallest):
+                smallest = ids
+
+        return [i for i in smallest if term in names[i]]
+
+    def candidate_count(self, term: str):
+        """
+        Estimate how many entries a fresh `search` for the lowercase `term`
+        has to verify, for comparison against refining a previous result.
+        """
+        if self.postings is None or len(term) < NGRAM or ':' in term:
+            return len(self.catalog)
+
+        postings = self.postings
+        return min(len(postings.get(g, ())) for g in ngrams(term))
+
+    def search(self, term: str, within: range = None) -> array:
+        """
+        Return the sorted catalog rows whose 'specname:iconname' string
+        contains `term`, ignoring case.  If `within` is given, only rows in
+        that range are returned.
+        """
+        term = term.lower()
+        catalog = self.catalog
+        offsets = catalog.offsets
+        start, stop = ((within.start, within.stop) if within is not None
+                       else (0, len(catalog)))
+        blocks = [(c, max(offsets[c], start), min(offsets[c + 1], stop))
+                  for c in range(len(self.collections))
+                  if offsets[c] < stop and offsets[c + 1] > start]
+
+        rows = array('I')
+        if ':' in term:
+            # the term straddles the separator, so the collection name must
+            # end with the first part and the glyph name start with the rest
+            head, _, tail = term.partition(':')
+            names = self.names
+            name_ids = catalog.name_ids
+            for c, a, b in blocks:
+                if self.collections[c].endswith(head):
+                    rows.extend(r for r in range(a, b)
+                                if names[name_ids[r]].startswith(tail))
+
+            return rows
+
+        if (self.postings is None
+                or stop - start < self.candidate_count(term)):
+            # e.g. a single collection: checking its rows directly is
+            # cheaper than going through names from every collection
+            return self.sweep(term, blocks)
+
+        spec_hits = {c for c, spec in enumerate(self.collections)
+                     if term in spec}
+        namemask = None
+        if len(term) < NGRAM:
+            # short terms hit most names, so skip straight to the sweep
+            namemask = self.name_mask(term)
+            nhits = stop - start
+        else:
+            matched = self.match_names(term)
+            starts = self.name_row_starts
+            nhits = sum(starts[i + 1] - starts[i] for i in matched)
+
+        if nhits*EXPAND_RATIO < stop - start:
+            # few hits: expand the matched names to rows and sort them
+            name_rows = self.name_rows
+            coll_ids = catalog.coll_ids
+            hits = [r for i in matched
+                    for r in name_rows[starts[i]:starts[i + 1]]
+                    if start <= r < stop and coll_ids[r] not in spec_hits]
+            for c, a, b in blocks:
+                if c in spec_hits:
+                    hits.extend(range(a, b))
+
+            rows.extend(sorted(hits))
+        else:
+            # many hits: sweep the rows in order against a name mask
+            if namemask is None:
+                namemask = bytearray(len(self.names))
+                for i in matched:
+                    namemask[i] = 1
+
+            name_ids = catalog.name_ids
+            for c, a, b in blocks:
+                if c in spec_hits:
+                    rows.extend(range(a, b))
+                else:
+                    rows.extend(compress(range(a, b),
+                                         map(namemask.__getitem__,
+                                             name_ids[a:b])))
+
+        return rows
+
+    def sweep(self, term: str, blocks: list[tuple[int, int, int]]) -> array:
+        """
+        Check every row of the given (collection, start, stop) blocks
+        against the lowercase `term`, which must not contain ':'.
+        """
+        names = self.names
+        name_ids = self.catalog.name_ids
+        collections = self.collections
+        rows = array('I')
+        for c, a, b in blocks:
+            if term in collections[c]:
+                rows.extend(range(a, b))
+            else:
+                rows.extend(compress(range(a, b),
+                                     map(str.__contains__,
+                                         map(names.__getitem__,
+                                             name_ids[a:b]),
+                                         repeat(term))))
+
+        return rows
+
+    def refine(self, term: str, rows: array, within: range = None) -> array:
+        """
+        Return the subset of the sorted catalog `rows` that match `term`.
+        This gives the same answer as `search` whenever `rows` is a superset
+        of the true result, e.g. the result of a query that `term` contains.
+        """
+        term = term.lower()
+        catalog = self.catalog
+        offsets = catalog.offsets
+        names = self.names
+        name_ids = catalog.name_ids
+        if within is not None:
+            rows = rows[bisect_left(rows, within.start):
+                        bisect_left(rows, within.stop)]
+
+        out = array('I')
+        lo = 0
+        for c, spec in enumerate(self.collections):
+            hi = bisect_left(rows, offsets[c + 1], lo)
+            block = rows[lo:hi]
+            lo = hi
+            if not block:
+                continue
+
+            if ':' in term:
+                prefix = spec + ':'
+                out.extend(r for r in block
+                           if term in prefix + names[name_ids[r]])
+            elif term in spec:
+                out.extend(block)
+            else:
+                out.extend(compress(block, map(str.__contains__,
+                                               map(names.__getitem__,
+                                                   map(name_ids.__getitem__,
+                                                       block)),
+                                               repeat(term))))
+
+        return out
+
+
+class IncrementalSearch:
+    """
+    Wraps a `TrigramIndex` and remembers the last query and its result.
+    When a new query contains the previous one (typically because a
+    character was typed) and the row range did not grow, only the previous
+    hits are re-checked, unless the index can answer the new query from
+    fewer candidates.  Anything else falls back to a full search.
+    """
+    def __init__(self, index: TrigramIndex):
+        self.index = index
+        self.reset()
+
+    def reset(self):
+        self.last_term: str = None
+        self.last_within: range = None
+        self.last_rows: array = None
+
+    def can_refine(self, term: str, within: range = None):
+        last = self.last_term
+        if last is None or last not in term:
+            return False
+
+        return range_covers(self.last_within, within)
+
+    def search(self, term: str, within: range = None) -> array:
+        term = term.lower()
+        index = self.index
+        if (self.can_refine(term, within)
+                and len(self.last_rows) < index.candidate_count(term)):
+            rows = index.refine(term, self.last_rows, within)
+        else:
+            rows = index.search(term, within)
+
+        self.last_term = term
+        self.last_within = within
+        self.last_rows = rows
+        return rows
@@ -0,0 +1,225 @@
+from base64 import b64encode
+from collections.abc import Callable
+
+from .catalog import IconCatalog
+from .search import TrigramIndex
+from .snippets import pyrandyos_code
+
+# (collection, codepoint, size, ARGB color) -> PNG bytes
+PngRenderer = Callable[[str, int, int, int], bytes]
+Request = dict
+Response = dict
+
+# with a lazily indexed catalog, a batch this long is worth building the
+# trigram postings for
+POSTINGS_AFTER_QUERIES = 8
+DEFAULT_RENDER_SIZE = 32
+DEFAULT_RENDER_COLOR = 0xff000000
+
+
+class ServiceError(Exception):
+    pass
+
+
+def parse_color(value: int | str | None) -> int:
+    "ARGB color from an integer or a '#rrggbb' or '#aarrggbb' string"
+    if value is None:
+        return DEFAULT_RENDER_COLOR
+
+    if isinstance(value, int):
+        return value
+
+    digits = value.lstrip('#')
+    if len(digits) not in (6, 8):
+        raise ServiceError(f'Bad color: {value!r}')
+
+    try:
+        color = int(digits, 16)
+    except ValueError:
+        raise ServiceError(f'Bad color: {value!r}') from None
+
+    return color if len(digits) == 8 else color | 0xff000000
+
+
+class IconService:
+    """
+    Answers lookup requests against a catalog.  A request is a dict with an
+    'op' (search, code, lookup, list, render or ping) and the op's
+    arguments, as decoded from one line of the daemon's JSON protocol; the
+    response echoes the request's 'id' and has 'ok' set, with 'error'
+    explaining a failure.
+
+    The command-line tools use a service in-process when no daemon is
+    running, in which case the index is built lazily.  Rendering needs a
+    `renderer`, which only the daemon (or a caller that loads Qt) provides.
+    """
+    def __init__(self, catalog: IconCatalog, postings: bool = True,
+                 renderer: PngRenderer = None):
+        self.catalog = catalog
+        self.index = TrigramIndex(catalog, postings)
+        self.fuzzy = None
+        self.renderer = renderer
+        self.queries = 0
+        self.handlers: dict[str, Callable[[Request], Response]] = {
+            'ping': self.ping,
+            'search': self.search,
+            'code': self.code,
+            'lookup': self.lookup,
+            'list': self.list_icons,
+            'render': self.render,
+        }
+
+    def handle(self, request: Request) -> Response:
+        rid = request.get('id')
+        handler = self.handlers.get(request.get('op'))
+        try:
+            if handler is None:
+                raise ServiceError(f"Unknown op: {request.get('op')!r}")
+
+            response = handler(request)
+        except (ServiceError, TypeError, ValueError) as e:
+            # a bad argument fails this request, not the caller
+            return {'id': rid, 'ok': False, 'error': str(e)}
+
+        response.update(id=rid, ok=True)
+        return response
+
+    @staticmethod
+    def text(request: Request, key: str, default: str = ''):
+        "A string argument, which may be null or left out"
+        value = request.get(key)
+        if value is None:
+            return default
+
+        if not isinstance(value, str):
+            raise ServiceError(f'{key!r} must be a string')
+
+        return value
+
+    @staticmethod
+    def texts(request: Request, key: str) -> list[str]:
+        "A list-of-strings argument, which may be null or left out"
+        values = request.get(key)
+        if values is None:
+            return []
+
+        if (not isinstance(values, (list, tuple))
+                or not all(isinstance(v, str) for v in values)):
+            raise ServiceError(f'{key!r} must be a list of strings')
+
+        return values
+
+    def collection(self, name: str):
+        "Collection named `name`, ignoring case"
+        lookup = {c.lower(): c for c in self.catalog.collections}
+        try:
+            return lookup[name.lower()]
+        except KeyError:
+            raise ServiceError(f'Unknown collection: {name}') from None
+
+    def row(self, icon: str):
+        row = self.catalog.find_iconstring(icon)
+        if row < 0:
+            raise ServiceError(f'Unknown icon: {icon}')
+
+        return row
+
+    def record(self, row: int):
+        catalog = self.catalog
+        specname, iconname = catalog.split(row)
+        return {
+            'icon': f'{specname}:{iconname}',
+            'collection': specname,
+            'name': iconname,
+            'codepoint': catalog.codepoint(row),
+        }
+
+    def ping(self, request: Request) -> Response:
+        return {'icons': len(self.catalog)}
+
+    def search(self, request: Request) -> Response:
+        query = self.text(request, 'query')
+        collection = self.text(request, 'collection')
+        within = None
+        if collection:
+            within = self.catalog.collection_range(self.collection(collection))
+
+        index = self.index
+        if request.get('fuzzy'):
+            fuzzy = self.fuzzy
+            if fuzzy is None:
+                # NumPy takes longer to import than a plain search takes
+                from .fuzzy import FuzzyMatcher
+                fuzzy = FuzzyMatcher(index)
+                self.fuzzy = fuzzy
+
+            rows = fuzzy.search(query, within)
+        else:
+            self.queries += 1
+            if (index.postings is None
+                    and self.queries > POSTINGS_AFTER_QUERIES):
+                index.build_postings()
+
+            rows = index.search(query, within)
+
+        limit = request.get('limit')
+        record = self.record
+        return {'results': [record(int(r)) for r in rows[:limit]]}
+
+    def code(self, request: Request) -> Response:
+        catalog = self.catalog
+        results = list()
+        for icon in self.texts(request, 'icons'):
+            row = catalog.find_iconstring(icon)
+            if row < 0:
+                results.append({'icon': icon, 'error': 'unknown icon'})
+            else:
+                results.append({'icon': catalog.iconstring(row),
+                                 'code': pyrandyos_code(*catalog.split(row))})
+
+        return {'results': results}
+
+    def lookup(self, request: Request) -> Response:
+        catalog = self.catalog
+        results = list()
+        for icon in self.texts(request, 'icons'):
+            row = catalog.find_iconstring(icon)
+            results.append({'icon': icon, 'error': 'unknown icon'} if row < 0
+                           else self.record(row))
+
+        return {'results': results}
+
+    def list_icons(self, request: Request) -> Response:
+        catalog = self.catalog
+        specnames = [self.collection(c)
+                     for c in self.texts(request, 'collections')]
+        if request.get('counts'):
+            return {'results': [
+                {'collection': s, 'count': len(catalog.collection_range(s))}
+                for s in specnames or catalog.collections
+            ]}
+
+        rows = (range(len(catalog)) if not specnames
+                else [r for s in specnames
+                      for r in catalog.collection_range(s)])
+        record = self.record
+        return {'results': [record(r) for r in rows]}
+
+    def render(self, request: Request) -> Response:
+        renderer = self.renderer
+        if renderer is None:
+            raise ServiceError('Rendering needs the icon daemon '
+                               '(python -m iconbrowser --serve)')
+
+        icon = self.text(request, 'icon')
+        row = self.row(icon)
+        size = request.get('size', DEFAULT_RENDER_SIZE)
+        if not isinstance(size, int) or not 0 < size <= 1024:
+            raise ServiceError(f'Bad size: {size!r}')
+
+        catalog = self.catalog
+        png = renderer(catalog.specname(row), catalog.codepoint(row), size,
+                       parse_color(request.get('color')))
+        out = self.record(row)
+        out.update(size=size, png=b64encode(png).decode('ascii'))
+        return out
@@ -0,0 +1,326 @@
+import os
+from collections.abc import Iterable
+from json import dumps as jdumps, loads as jloads
+from pathlib import Path
+from struct import Struct
+
+import numpy as np
+
+from .catalog import IconCatalog
+
+HASHES_MAGIC = b'IBHASHS1'
+HASHES_FORMAT = 1
+GLYPH_HASHES_NAME = 'glyphhashes.bin'
+HEADER_LEN = Struct('<I')
+# glyphs are rendered at HASH_SIZE pixels and hashed on a HASH_GRID x
+# HASH_GRID grid of cells, one bit each
+HASH_SIZE = 32
+HASH_GRID = 8
+# hash of a glyph with no shape at all (nothing drawn, or a filled square),
+# which is never reported as similar to anything
+BLANK_HASH = 0
+# the index splits the 64-bit hashes into this many 16-bit substrings
+SUBSTRINGS = 4
+SUBSTRING_BITS = 64//SUBSTRINGS
+# differing bits up to which two glyphs count as similar
+DEFAULT_MAX_DISTANCE = 10
+
+_flip_masks: list[np.ndarray] = None
+
+
+def perceptual_hashes(bitmaps: np.ndarray) -> np.ndarray:
+    """
+    64-bit average hashes of a (count, HASH_SIZE, HASH_SIZE) stack of glyph
+    coverage bitmaps, all in one pass.  Each bit tells whether a cell of
+    the glyph has more ink than the glyph's average, so the same symbol
+    drawn by another font, with other stroke weights and details, still
+    gets a close hash.
+    """
+    n = len(bitmaps)
+    cell = bitmaps.shape[-1]//HASH_GRID
+    cells = bitmaps.astype(np.float32).reshape(n, HASH_GRID, cell, HASH_GRID,
+                                               cell).mean(axis=(2, 4))
+    cells = cells.reshape(n, -1)
+    bits = cells > cells.mean(axis=1)[:, None]
+    return np.packbits(bits, axis=1).view('>u8')[:, 0].astype(np.uint64)
+
+
+def popcount(a: np.ndarray) -> np.ndarray:
+    "Bits set in each element of a uint64 array"
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(a)
+
+    bits = np.unpackbits(np.ascontiguousarray(a).view(np.uint8))
+    return bits.reshape(-1, 64).sum(axis=1)
+
+
+def flip_masks(bits: int) -> np.ndarray:
+    "Every substring value with `bits` bits set"
+    global _flip_masks
+    if _flip_masks is None:
+        values = np.arange(1 << SUBSTRING_BITS)
+        counts = popcount(values.astype(np.uint64))
+        _flip_masks = [values[counts == n]
+                       for n in range(SUBSTRING_BITS + 1)]
+
+    return _flip_masks[bits]
+
+
+class HashIndex:
+    """
+    Nearest-neighbour index over 64-bit hashes by Hamming distance, using
+    multi-index hashing: each hash is split into `SUBSTRINGS` substrings,
+    and for each one the hashes are bucketed by that substring's value.
+    Two hashes `SUBSTRINGS*r + SUBSTRINGS - 1` bits apart or less have at
+    least one substring within `r` bits of each other.  A query looks
+    through the buckets near its own substrings, one more bit away at a
+    time, until it has enough neighbours, and only measures the distance
+    to what it finds there.
+    """
+    def __init__(self, hashes: np.ndarray):
+        hashes = np.asarray(hashes, np.uint64)
+        self.hashes = hashes
+        # per substring: ids sorted by its value, and where each value's
+        # bucket starts in them
+        self.tables: list[tuple[np.ndarray, np.ndarray]] = list()
+        flip_masks(0)
+        values = np.arange((1 << SUBSTRING_BITS) + 1)
+        for part in self.substrings(hashes):
+            order = np.argsort(part, kind='stable')
+            self.tables.append((order, np.searchsorted(part[order], values)))
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @staticmethod
+    def substrings(hashes: np.ndarray):
+        mask = np.uint64((1 << SUBSTRING_BITS) - 1)
+        return [((hashes >> np.uint64(i*SUBSTRING_BITS)) & mask)
+                .astype(np.int64) for i in range(SUBSTRINGS)]
+
+    def probe(self, h: int, bits: int) -> list[np.ndarray]:
+        "Ids in the buckets exactly `bits` bits from the substrings of `h`"
+        found = list()
+        masks = flip_masks(bits)
+        mask = (1 << SUBSTRING_BITS) - 1
+        for i, (order, starts) in enumerate(self.tables):
+            values = ((h >> (i*SUBSTRING_BITS)) & mask) ^ masks
+            lo = starts[values]
+            hi = starts[values + 1]
+            full = hi > lo
+            found.extend(order[s:e] for s, e in zip(lo[full], hi[full]))
+
+        return found
+
+    def nearest(self, h: int, count: int,
+                max_distance: int = DEFAULT_MAX_DISTANCE):
+        """
+        Ids and distances of the `count` hashes nearest to `h`, at most
+        `max_distance` bits away, nearest first and then by id
+        """
+        h = int(h)
+        ids = np.empty(0, np.int64)
+        dist = np.empty(0, np.int64)
+        for bits in range(max_distance//SUBSTRINGS + 1):
+            ids = np.unique(np.concatenate([ids, *self.probe(h, bits)]))
+            dist = popcount(self.hashes[ids] ^ np.uint64(h)).astype(np.int64)
+            # every hash this close has been seen by now
+            reach = SUBSTRINGS*(bits + 1) - 1
+            if np.count_nonzero(dist <= reach) >= count:
+                break
+
+        keep = dist <= max_distance
+        ids = ids[keep]
+        dist = dist[keep]
+        order = np.lexsort((ids, dist))[:count]
+        return ids[order], dist[order]
+
+
+class GlyphHashes:
+    """
+    Perceptual hashes of the glyphs of some collections, by codepoint.
+    Aliases share a codepoint, so each glyph is hashed once.  Instances
+    are not changed once built; `merged` returns a new one.
+    """
+    def __init__(self, tables: dict[str, tuple[np.ndarray, np.ndarray]]
+                 = None):
+        # collection -> (sorted codepoints, their hashes)
+        self.tables = tables or dict()
+
+    @classmethod
+    def from_glyphs(cls, glyphs: Iterable[tuple[str, np.ndarray,
+                                                np.ndarray]]):
+        "Build from (collection, codepoints, hashes) parts, in any order"
+        parts: dict[str, list] = dict()
+        for specname, codepoints, hashes in glyphs:
+            parts.setdefault(specname, []).append((codepoints, hashes))
+
+        tables = dict()
+        for specname, chunks in parts.items():
+            cps = np.concatenate([c for c, _ in chunks]).astype(np.uint32)
+            hashes = np.concatenate([h for _, h in chunks]).astype(np.uint64)
+            order = np.argsort(cps, kind='stable')
+            tables[specname] = cps[order], hashes[order]
+
+        return cls(tables)
+
+    def __len__(self):
+        return sum(len(cps) for cps, _ in self.tables.values())
+
+    @property
+    def collections(self):
+        return list(self.tables)
+
+    def merged(self, other: 'GlyphHashes'):
+        "These hashes with the collections of `other` added or replaced"
+        return GlyphHashes({**self.tables, **other.tables})
+
+    def lookup(self, specname: str, codepoints: np.ndarray):
+        """
+        Hashes of the given codepoints of a collection, with a mask of the
+        ones that were found
+        """
+        cps, hashes = self.tables.get(specname, (None, None))
+        if cps is None or not len(cps):
+            return (np.zeros(len(codepoints), np.uint64),
+                    np.zeros(len(codepoints), bool))
+
+        pos = np.minimum(np.searchsorted(cps, codepoints), len(cps) - 1)
+        found = cps[pos] == codepoints
+        return np.where(found, hashes[pos], np.uint64(0)), found
+
+
+def unhashed_glyphs(catalog: IconCatalog, hashes: GlyphHashes):
+    "The codepoints of each collection of `catalog` that has no hashes yet"
+    codepoints = np.frombuffer(catalog.codepoints, np.uint32)
+    known = hashes.tables
+    glyphs = dict()
+    for specname in catalog.collections:
+        if specname not in known:
+            rows = catalog.collection_range(specname)
+            glyphs[specname] = np.unique(codepoints[rows.start:rows.stop])
+
+    return glyphs
+
+
+class SimilarityIndex:
+    """
+    Glyphs of a catalog that look alike, across every collection.  One row
+    stands for each glyph, the first of its aliases; rows of collections
+    without hashes are left out.
+    """
+    def __init__(self, catalog: IconCatalog, hashes: GlyphHashes):
+        self.catalog = catalog
+        self.source = hashes
+        codepoints = np.frombuffer(catalog.codepoints, np.uint32)
+        rows = list()
+        glyph_hashes = list()
+        for specname in catalog.collections:
+            span = catalog.collection_range(specname)
+            cps, first = np.unique(codepoints[span.start:span.stop],
+                                   return_index=True)
+            h, found = hashes.lookup(specname, cps)
+            rows.append(first[found] + span.start)
+            glyph_hashes.append(h[found])
+
+        rows = np.concatenate(rows) if rows else np.empty(0, np.int64)
+        glyph_hashes = (np.concatenate(glyph_hashes) if glyph_hashes
+                        else np.empty(0, np.uint64))
+        shaped = glyph_hashes != BLANK_HASH
+        self.rows = rows[shaped]
+        self.hashes = glyph_hashes[shaped]
+        self.index = HashIndex(self.hashes)
+        self.glyph_ids = {(catalog.coll_ids[r], catalog.codepoint(r)): i
+                          for i, r in enumerate(self.rows.tolist())}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def similar(self, row: int, count: int,
+                max_distance: int = DEFAULT_MAX_DISTANCE):
+        """
+        Up to `count` (row, distance) pairs of the glyphs that look most
+        like the one in `row`, most alike first, other than that glyph
+        itself.  Empty if the glyph has not been hashed or has no shape.
+        """
+        catalog = self.catalog
+        glyph = self.glyph_ids.get((catalog.coll_ids[row],
+                                    catalog.codepoint(row)))
+        if glyph is None:
+            return []
+
+        ids, dist = self.index.nearest(int(self.hashes[glyph]), count + 1,
+                                       max_distance)
+        rows = self.rows
+        return [(int(rows[i]), int(d)) for i, d in zip(ids, dist)
+                if i != glyph][:count]
+
+
+def save_glyph_hashes(path: Path, hashes: GlyphHashes, stamp: str):
+    """
+    Write the hashes to `path`: the magic string, a JSON header with the
+    glyph count of each collection, then the codepoints of every collection
+    as 32-bit integers, padded to 8 bytes, and their hashes as 64-bit ones.
+    """
+    tables = hashes.tables
+    header = jdumps({
+        'stamp': stamp,
+        'format': HASHES_FORMAT,
+        'size': HASH_SIZE,
+        'collections': [[k, len(cps)] for k, (cps, _) in tables.items()],
+    }).encode()
+    codepoints = b''.join(cps.astype('<u4').tobytes()
+                          for cps, _ in tables.values())
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(HASHES_MAGIC)
+        f.write(HEADER_LEN.pack(len(header)))
+        f.write(header)
+        f.write(codepoints)
+        f.write(b'\0'*(-len(codepoints) % 8))
+        for _, h in tables.values():
+            f.write(h.astype('<u8').tobytes())
+
+    os.replace(tmp, path)
+
+
+def load_glyph_hashes(path: Path, stamp: str) -> GlyphHashes | None:
+    "Return the hashes stored at `path`, or None if missing or stale"
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+
+    n = len(HASHES_MAGIC)
+    if data[:n] != HASHES_MAGIC:
+        return None
+
+    try:
+        (hlen,) = HEADER_LEN.unpack_from(data, n)
+        n += HEADER_LEN.size
+        meta = jloads(data[n:n + hlen])
+        n += hlen
+        if (meta['stamp'] != stamp or meta['format'] != HASHES_FORMAT
+                or meta['size'] != HASH_SIZE):
+            return None
+
+        counts = [(k, int(c)) for k, c in meta['collections']]
+        total = sum(c for _, c in counts)
+        hashes_at = n + 4*total + (-4*total % 8)
+        if len(data) != hashes_at + 8*total:
+            return None
+
+        cps = np.frombuffer(data, '<u4', total, n).astype(np.uint32)
+        hashes = np.frombuffer(data, '<u8', total,
+                               hashes_at).astype(np.uint64)
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    tables = dict()
+    start = 0
+    for specname, count in counts:
+        end = start + count
+        tables[specname] = cps[start:end], hashes[start:end]
+        start = end
+
+    return GlyphHashes(tables)
@@ -0,0 +1,114 @@
+import os
+from array import array
+from hashlib import md5
+from importlib.util import find_spec
+from json import dumps as jdumps, loads as jloads
+from pathlib import Path
+from struct import Struct
+
+from .version import __version__
+from .catalog import IconCatalog
+
+SNAPSHOT_MAGIC = b'IBCATLG1'
+SNAPSHOT_FORMAT = 1
+CATALOG_SNAPSHOT_NAME = 'catalog.bin'
+HEADER_LEN = Struct('<I')
+# where pyrandyos declares the font versions (git commits and file hashes)
+FONTSPEC_SOURCES = ('gui', 'icons', 'iconfont', 'sources.py')
+# written by the pyrandyos build and holding its version
+PYRANDYOS_VERSION_FILE = ('_version.py',)
+
+
+def pyrandyos_path(*parts: str):
+    "Locate a file of the pyrandyos package without importing it (or Qt)"
+    spec = find_spec('pyrandyos')
+    return Path(spec.submodule_search_locations[0]).joinpath(*parts)
+
+
+def fontspec_sources_path():
+    return pyrandyos_path(*FONTSPEC_SOURCES)
+
+
+def snapshot_stamp():
+    """
+    Identify the installed icon fonts.  A snapshot is only valid for the
+    stamp it was written with, so upgrading iconbrowser, pyrandyos or any
+    of the fonts it declares invalidates it.  Only files are read, so
+    checking the stamp is cheap enough for the command-line tools.
+    """
+    h = md5(f'{SNAPSHOT_FORMAT}:{__version__}:'.encode())
+    for parts in (PYRANDYOS_VERSION_FILE, FONTSPEC_SOURCES):
+        try:
+            h.update(pyrandyos_path(*parts).read_bytes())
+        except OSError:
+            pass
+
+    return h.hexdigest()
+
+
+def save_snapshot(path: Path, catalog: IconCatalog, stamp: str):
+    """
+    Write the catalog tables to `path` in a compact binary form: the magic
+    string, a JSON header, the glyph names as one NUL-separated UTF-8 block
+    and then the offsets, name ids and codepoints as 32-bit integers.
+    """
+    names = '\0'.join(catalog.names).encode()
+    header = jdumps({
+        'stamp': stamp,
+        'collections': catalog.collections,
+        'nnames': len(catalog.names),
+        'nrows': len(catalog),
+        'names_nbytes': len(names),
+    }).encode()
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(HEADER_LEN.pack(len(header)))
+        f.write(header)
+        f.write(names)
+        for a in (catalog.offsets, catalog.name_ids, catalog.codepoints):
+            f.write(array('I', a).tobytes())
+
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path, stamp: str) -> IconCatalog | None:
+    "Return the catalog stored at `path`, or None if it is missing or stale"
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+
+    n = len(SNAPSHOT_MAGIC)
+    if data[:n] != SNAPSHOT_MAGIC:
+        return None
+
+    try:
+        (hlen,) = HEADER_LEN.unpack_from(data, n)
+        n += HEADER_LEN.size
+        meta = jloads(data[n:n + hlen])
+        n += hlen
+        if meta['stamp'] != stamp:
+            return None
+
+        nnames = meta['nnames']
+        nrows = meta['nrows']
+        collections = meta['collections']
+        end = n + meta['names_nbytes']
+        names = data[n:end].decode().split('\0') if nnames else []
+        n = end
+        tables = []
+        for count in (len(collections) + 1, nrows, nrows):
+            a = array('I')
+            a.frombytes(data[n:n + 4*count])
+            n += 4*count
+            tables.append(a)
+    except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+        return None
+
+    offsets, name_ids, codepoints = tables
+    if (n != len(data) or len(names) != nnames or len(codepoints) != nrows
+            or offsets[-1] != nrows):
+        return None
+
+    return IconCatalog(collections, offsets, names, name_ids, codepoints)
@@ -0,0 +1,78 @@
+from collections.abc import Iterable
+from keyword import iskeyword
+
+# package holding the generated modules of the pyrandyos icon fonts
+THIRDPARTY_PACKAGE = 'pyrandyos.gui.icons.thirdparty'
+
+
+# The names below follow `IconFontSpec.initialize` and `legalize_iconname`
+# in pyrandyos, without importing them: anything under `pyrandyos.gui`
+# imports Qt, which the command-line tools must not.
+
+def font_module(specname: str):
+    return f'{THIRDPARTY_PACKAGE}.{specname.lower()}'
+
+
+def font_classname(specname: str):
+    return '_'.join(specname.split('.'))
+
+
+def font_shortname(specname: str):
+    parts = specname.split('.')
+    if len(parts) > 1:
+        parts[-1] = parts[-1][0]
+
+    return '_'.join(parts).lower()
+
+
+def legalize_iconname(iconname: str):
+    "Convert an icon name to a legal Python identifier"
+    newname = iconname.replace('-', '_')
+    if iskeyword(newname):
+        newname += '_'
+
+    if newname[0].isdigit():
+        newname = f'_{newname}'
+
+    if newname == "l":
+        newname = "L"
+
+    return newname
+
+
+def pyrandyos_code(specname: str, iconname: str):
+    "PyRandyOS code defining an `IconSpec` for the given glyph"
+    return pyrandyos_batch_code(((specname, iconname),))
+
+
+def pyrandyos_batch_code(icons: Iterable[tuple[str, str]]):
+    """
+    PyRandyOS code defining an `IconSpec` for each (collection, icon name)
+    pair, importing each font module once.  Spec lines are grouped by font
+    module in the order the modules first appear; repeated icons are
+    defined once.
+    """
+    groups: dict[str, dict[str, None]] = dict()
+    for specname, iconname in icons:
+        group = groups.get(specname)
+        if group is None:
+            group = groups[specname] = dict()
+
+        group[iconname] = None
+
+    imports = ["from pyrandyos.gui.icons.iconfont import IconSpec\n"]
+    specs = list()
+    for specname, iconnames in groups.items():
+        fontmod = font_module(specname)
+        fontclass = font_classname(specname)
+        shortname = font_shortname(specname)
+        imports.append(f"from {fontmod} import {fontclass}\n"
+                       f"from {fontmod} import names as "
+                       f"{shortname}_names  # noqa: E501\n")
+        for legalname in map(legalize_iconname, iconnames):
+            specs.append(f"{shortname}_{legalname}_ispec = "
+                         f"IconSpec.generate_iconspec({fontclass}, "
+                         f"glyph={shortname}_names.{legalname})"
+                         "  # noqa: E501\n")
+
+    return ''.join(imports + specs)
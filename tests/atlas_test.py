@@ -0,0 +1,95 @@
+from unittest import TestCase, main as utmain, TextTestRunner, mock
+import sys
+from os import environ
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.atlas import (  # noqa: E402
+    GlyphAtlas, atlas_filename, parse_atlas_filename, list_atlases,
+    clear_atlases, glyph_nbytes,
+)
+from iconbrowser.cachedir import get_cache_dir, CACHE_DIR_ENV  # noqa: E402
+
+
+class TestGlyphAtlas(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def write(self, glyphs: dict[int, bytes], font_hash: str = 'abc',
+              version: str = '1.0', size: int = 2):
+        path = self.dir/atlas_filename('Fa5.Solid', size, 0xff102030)
+        GlyphAtlas.write(path, font_hash, version, size, 0xff102030, glyphs)
+        return path
+
+    def open(self, path: Path, font_hash: str = 'abc', version: str = '1.0'):
+        atlas = GlyphAtlas.open(path, font_hash, version)
+        if atlas is not None:
+            self.addCleanup(atlas.close)
+
+        return atlas
+
+    def test_filename_roundtrip(self):
+        name = atlas_filename('FluentUI.Resize', 48, 0xff000000)
+        self.assertEqual(parse_atlas_filename(name),
+                         ('FluentUI.Resize', 48, 0xff000000))
+        self.assertIsNone(parse_atlas_filename('notes.txt'))
+
+    def test_roundtrip(self):
+        n = glyph_nbytes(2)
+        glyphs = {0xf101: b'\1'*n, 0x41: b'\2'*n, 0xe000: b'\3'*n}
+        atlas = self.open(self.write(glyphs))
+        self.assertEqual(len(atlas), 3)
+        self.assertEqual(list(atlas.codepoints), [0x41, 0xe000, 0xf101])
+        for cp, data in glyphs.items():
+            self.assertEqual(bytes(atlas.glyph(cp)), data)
+
+        self.assertIsNone(atlas.glyph(0x42))
+        self.assertNotIn(0x42, atlas)
+        self.assertEqual(atlas.glyphs(), glyphs)
+
+    def test_stale_or_corrupt_rejected(self):
+        path = self.write({1: b'\0'*glyph_nbytes(2)})
+        self.assertIsNone(self.open(path, font_hash='def'))
+        self.assertIsNone(self.open(path, version='2.0'))
+        self.assertIsNotNone(self.open(path))
+
+        path.write_bytes(path.read_bytes()[:-1])
+        self.assertIsNone(self.open(path))
+        self.assertIsNone(self.open(self.dir/'missing.atlas'))
+
+    def test_wrong_glyph_size(self):
+        with self.assertRaises(ValueError):
+            self.write({1: b'\0'*3})
+
+    def test_list_and_clear(self):
+        self.write({1: b'\0'*glyph_nbytes(2)})
+        self.write({1: b'\0'*glyph_nbytes(4)}, size=4)
+        (self.dir/'other.txt').write_text('keep')
+        self.assertEqual(sorted(k[1] for k in list_atlases(self.dir)), [2, 4])
+        self.assertEqual(clear_atlases(self.dir), 2)
+        self.assertEqual(list_atlases(self.dir), {})
+        self.assertTrue((self.dir/'other.txt').exists())
+
+    def test_cache_dir_env(self):
+        with mock.patch.dict(environ, {CACHE_DIR_ENV: str(self.dir)}):
+            p = get_cache_dir('atlas')
+
+        self.assertEqual(p, self.dir/'atlas')
+        self.assertTrue(p.is_dir())
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
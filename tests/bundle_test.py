@@ -0,0 +1,78 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+import ast
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from zlib import decompress
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.bundle import (  # noqa: E402
+    BundleWriter, accessor_name, read_manifest,
+)
+
+
+def mask(size: int, fill: int):
+    return bytes([fill])*(size*size)
+
+
+class TestBundle(TestCase):
+    def test_names(self):
+        self.assertEqual(accessor_name('Fa5.Solid', '500px'),
+                         'fa5_s__500px_ispec')
+        self.assertEqual(accessor_name('Codicons', 'arrow-left'),
+                         'codicons_arrow_left_ispec')
+
+    def test_dedup(self):
+        writer = BundleWriter((32, 16))
+        self.assertEqual(writer.sizes, (16, 32))
+        a = writer.add_icon('Codicons', 'a-b', [mask(16, 1), mask(32, 1)])
+        b = writer.add_icon('Codicons', 'a_b', [mask(16, 1), mask(32, 2)])
+        self.assertIsNone(writer.add_icon('Codicons', 'a-b', []))
+        self.assertEqual((a, b), ('codicons_a_b_ispec',
+                                  'codicons_a_b_2_ispec'))
+        self.assertEqual(len(writer), 2)
+        # the two icons share their 16 pixel glyph
+        self.assertEqual(len(writer.glyphs), 3)
+        self.assertEqual(writer.specs[b], ('Codicons:a_b', (0, 2)))
+        offset, length = writer.glyphs[2]
+        self.assertEqual(decompress(writer.blob[offset:offset + length]),
+                         mask(32, 2))
+
+    def test_write(self):
+        writer = BundleWriter((16,), color=0xff102030)
+        writer.add_icon('Fa5.Solid', 'home', [mask(16, 255)])
+        with TemporaryDirectory() as tmp:
+            pypath, blobpath = writer.write(Path(tmp), 'my_icons')
+            source = pypath.read_text()
+            self.assertEqual(blobpath.read_bytes(), bytes(writer.blob))
+
+        tree = ast.parse(source)
+        names = {t.id for node in tree.body if isinstance(node, ast.Assign)
+                 for t in node.targets}
+        self.assertLessEqual({'BLOB_NAME', 'SIZES', 'GLYPHS', 'ICONS',
+                              'fa5_s_home_ispec'}, names)
+        self.assertIn("BLOB_NAME = 'my_icons.bin'", source)
+        self.assertIn('COLOR = 0xff102030', source)
+        self.assertIn("'Fa5.Solid:home': fa5_s_home_ispec,", source)
+
+    def test_manifest(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp)/'icons.txt'
+            path.write_text('# toolbar\nCodicons:zap\n\n  Fa5.Solid:home  '
+                            '# house\n')
+            self.assertEqual(list(read_manifest(path)),
+                             ['Codicons:zap', 'Fa5.Solid:home'])
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
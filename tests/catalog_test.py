@@ -0,0 +1,101 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.catalog import (  # noqa: E402
+    IconCatalog, SORT_BY_NAME, SORT_BY_CODEPOINT, range_covers,
+)
+
+CHARMAPS = {
+    'Fa5': {'home': 10, 'arrow-left': 12, 'zoom': 3},
+    'Fa5.Solid': {'home': 20, 'bell': 21},
+    'Codicons': {'add': 5, 'plus': 5},
+}
+
+
+class TestIconCatalog(TestCase):
+    def setUp(self):
+        self.catalog = IconCatalog.from_charmaps(CHARMAPS)
+
+    def test_row_order_matches_sorted_strings(self):
+        expected = sorted(f'{k}:{n}' for k, v in CHARMAPS.items() for n in v)
+        catalog = self.catalog
+        self.assertEqual(list(catalog.iconstrings()), expected)
+        self.assertEqual([catalog.iconstring(i) for i in range(len(catalog))],
+                         expected)
+
+    def test_fields(self):
+        catalog = self.catalog
+        row = catalog.find('Fa5.Solid', 'home')
+        self.assertEqual(catalog.split(row), ('Fa5.Solid', 'home'))
+        self.assertEqual(catalog.codepoint(row), 20)
+        self.assertEqual(catalog.find_iconstring('Fa5:zoom'),
+                         catalog.find('Fa5', 'zoom'))
+        self.assertEqual(catalog.find('Fa5', 'bell'), -1)
+        self.assertEqual(catalog.find('Nope', 'bell'), -1)
+
+    def test_collection_ranges(self):
+        catalog = self.catalog
+        for spec, cmap in CHARMAPS.items():
+            rows = catalog.collection_range(spec)
+            self.assertEqual(len(rows), len(cmap))
+            self.assertTrue(all(catalog.specname(r) == spec for r in rows))
+            self.assertTrue(range_covers(None, rows))
+            self.assertTrue(range_covers(range(len(catalog)), rows))
+            self.assertFalse(range_covers(rows, None))
+
+        self.assertFalse(range_covers(range(0, 3), range(2, 4)))
+
+    def test_subset(self):
+        catalog = self.catalog
+        fa5 = catalog.subset(['Fa5', 'Nope'])
+        self.assertEqual(fa5.collections, ['Fa5'])
+        self.assertEqual(list(fa5.iconstrings()),
+                         [s for s in catalog.iconstrings()
+                          if s.startswith('Fa5:')])
+        self.assertEqual(fa5.codepoint(fa5.find('Fa5', 'zoom')), 3)
+
+    def test_grow_in_the_middle(self):
+        # as `IconModel.add_collections` announces them: each collection
+        # is inserted where it sorts, in among the rows already there
+        catalog = self.catalog
+        shown = catalog.subset(['Fa5'])
+        rows = list(shown.iconstrings())
+        inserted = list()
+        # 'Fa5.Solid:' sorts before 'Fa5:', so it goes after Codicons but
+        # before the rows that were there first
+        for specname in ('Codicons', 'Fa5.Solid'):
+            step = catalog.subset(shown.collections + [specname])
+            new = step.collection_range(specname)
+            inserted.append((new.start, new.stop))
+            rows[new.start:new.start] = [step.iconstring(r) for r in new]
+            self.assertEqual(rows, list(step.iconstrings()))
+            shown = step
+
+        self.assertEqual(inserted, [(0, 2), (2, 4)])
+        self.assertEqual(rows, list(catalog.iconstrings()))
+
+    def test_sort_orders(self):
+        catalog = self.catalog
+        byname = [catalog.iconname(r) for r in catalog.order(SORT_BY_NAME)]
+        self.assertEqual(byname, sorted(byname))
+        bycp = [catalog.codepoint(r) for r in catalog.order(SORT_BY_CODEPOINT)]
+        self.assertEqual(bycp, sorted(bycp))
+        rank = catalog.rank(SORT_BY_NAME)
+        order = catalog.order(SORT_BY_NAME)
+        self.assertTrue(all(order[rank[r]] == r for r in range(len(catalog))))
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
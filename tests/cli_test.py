@@ -0,0 +1,153 @@
+from unittest import TestCase, main as utmain, TextTestRunner, mock
+import sys
+import subprocess
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+from json import loads as jloads
+from os import environ
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.cachedir import CACHE_DIR_ENV  # noqa: E402
+from iconbrowser.snapshot import (  # noqa: E402
+    CATALOG_SNAPSHOT_NAME, save_snapshot, snapshot_stamp,
+)
+from iconbrowser.snippets import (  # noqa: E402
+    pyrandyos_code, pyrandyos_batch_code, legalize_iconname, font_shortname,
+)
+from iconbrowser.cli import run_cli  # noqa: E402
+
+CHARMAPS = {
+    'Codicons': {'home': 0xeb06, 'arrow-left': 0xea9b, 'zap': 0xea86},
+    'Fa5.Solid': {'home': 0xf015, 'arrow-left': 0xf060, '500px': 0xf26e},
+}
+
+
+class TestCli(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.dict(environ, {CACHE_DIR_ENV: tmp.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.snapshot = Path(tmp.name)/CATALOG_SNAPSHOT_NAME
+        self.save_snapshot()
+
+    def save_snapshot(self, *args, **kwargs):
+        save_snapshot(self.snapshot, IconCatalog.from_charmaps(CHARMAPS),
+                      snapshot_stamp())
+        return subprocess.CompletedProcess(args, 0)
+
+    def run_cli(self, *args: str, stdin: str = None):
+        out = StringIO()
+        with redirect_stdout(out), mock.patch.object(sys, 'stdin',
+                                                     StringIO(stdin or '')):
+            status = run_cli(list(args))
+
+        return status, out.getvalue().splitlines()
+
+    def test_search(self):
+        status, lines = self.run_cli('search', 'arrow')
+        self.assertEqual(status, 0)
+        self.assertEqual(lines,
+                         ['Codicons:arrow-left', 'Fa5.Solid:arrow-left'])
+        _, lines = self.run_cli('search', '-c', 'fa5.solid', 'home', '--json')
+        self.assertEqual([jloads(x) for x in lines],
+                         [{'query': 'home', 'rank': 0,
+                           'icon': 'Fa5.Solid:home', 'collection': 'Fa5.Solid',
+                           'name': 'home', 'codepoint': 0xf015}])
+
+    def test_batch_from_stdin(self):
+        _, lines = self.run_cli('search', '--json', '-n', '1',
+                                stdin='zap\n\nhome\n')
+        self.assertEqual([(r['query'], r['icon'])
+                          for r in map(jloads, lines)],
+                         [('zap', 'Codicons:zap'), ('home', 'Codicons:home')])
+
+    def test_code(self):
+        status, lines = self.run_cli('code', '--json', 'Fa5.Solid:500px',
+                                     'Nope:x')
+        self.assertEqual(status, 1)
+        ok, bad = map(jloads, lines)
+        self.assertEqual(ok['code'], pyrandyos_code('Fa5.Solid', '500px'))
+        self.assertEqual(bad['error'], 'unknown icon')
+
+    def test_list(self):
+        _, lines = self.run_cli('list', '--collections')
+        self.assertEqual(lines, ['Codicons', 'Fa5.Solid'])
+        _, lines = self.run_cli('list', 'codicons')
+        self.assertEqual(lines, ['Codicons:arrow-left', 'Codicons:home',
+                                 'Codicons:zap'])
+
+    def test_cold_cache(self):
+        self.snapshot.unlink()
+        failed = subprocess.CompletedProcess([], 1)
+        with mock.patch('iconbrowser.cli.run', return_value=failed) as run, \
+                redirect_stderr(StringIO()) as err, \
+                self.assertRaises(SystemExit) as cm:
+            self.run_cli('search', 'home')
+
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('--build-catalog', run.call_args.args[0])
+        self.assertIn('exit status 1', err.getvalue())
+        self.assertFalse(self.snapshot.exists())
+        with mock.patch('iconbrowser.cli.run',
+                        side_effect=self.save_snapshot), \
+                redirect_stderr(StringIO()):
+            status, lines = self.run_cli('search', '-n', '1', 'home')
+
+        self.assertEqual((status, lines), (0, ['Codicons:home']))
+
+    def test_does_not_import_qt(self):
+        code = ('import sys; from iconbrowser.cli import run_cli; '
+                'run_cli(["list", "--collections"]); '
+                'print(sorted({m.split(".")[0] for m in sys.modules} '
+                '& {"PySide2", "pyrandyos", "numpy"}))')
+        out = subprocess.run([sys.executable, '-c', code], cwd=REPOROOT,
+                             capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.splitlines()[-1], '[]')
+
+
+class TestSnippets(TestCase):
+    def test_names(self):
+        self.assertEqual(font_shortname('Fa5.Solid'), 'fa5_s')
+        self.assertEqual(font_shortname('Codicons'), 'codicons')
+        self.assertEqual(legalize_iconname('500px'), '_500px')
+        self.assertEqual(legalize_iconname('arrow-left'), 'arrow_left')
+        self.assertEqual(legalize_iconname('class'), 'class_')
+
+    def test_code(self):
+        code = pyrandyos_code('Fa5.Solid', 'arrow-left')
+        self.assertIn('from pyrandyos.gui.icons.thirdparty.fa5.solid import '
+                      'Fa5_Solid\n', code)
+        self.assertIn('fa5_s_arrow_left_ispec = IconSpec.generate_iconspec('
+                      'Fa5_Solid, glyph=fa5_s_names.arrow_left)', code)
+
+    def test_batch(self):
+        code = pyrandyos_batch_code([
+            ('Fa5.Solid', 'home'), ('Codicons', 'zap'),
+            ('Fa5.Solid', '500px'), ('Fa5.Solid', 'home'),
+        ]).splitlines()
+        self.assertEqual(sum(x.startswith('from ') for x in code), 5)
+        self.assertEqual([x.split(' = ')[0] for x in code
+                          if ' = ' in x],
+                         ['fa5_s_home_ispec', 'fa5_s__500px_ispec',
+                          'codicons_zap_ispec'])
+        self.assertEqual(pyrandyos_batch_code([('Codicons', 'zap')]),
+                         pyrandyos_code('Codicons', 'zap'))
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
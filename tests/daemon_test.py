@@ -0,0 +1,148 @@
+from unittest import TestCase, main as utmain, TextTestRunner, skipUnless
+import sys
+import socket
+from base64 import b64decode
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import sleep
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.service import IconService, parse_color  # noqa: E402
+from iconbrowser.daemon import IconDaemon  # noqa: E402
+from iconbrowser.client import DaemonClient, is_running  # noqa: E402
+
+CHARMAPS = {
+    'Codicons': {'home': 0xeb06, 'arrow-left': 0xea9b, 'zap': 0xea86},
+    'Fa5.Solid': {'home': 0xf015, 'arrow-left': 0xf060},
+}
+
+
+def fake_renderer(specname: str, codepoint: int, size: int, color: int):
+    return f'{specname}:{codepoint}:{size}:{color:08x}'.encode()
+
+
+class TestIconService(TestCase):
+    def setUp(self):
+        self.service = IconService(IconCatalog.from_charmaps(CHARMAPS),
+                                   postings=False)
+
+    def test_requests(self):
+        handle = self.service.handle
+        r = handle({'id': 7, 'op': 'search', 'query': 'home',
+                    'collection': 'fa5.solid'})
+        self.assertEqual((r['id'], r['ok']), (7, True))
+        self.assertEqual([x['icon'] for x in r['results']],
+                         ['Fa5.Solid:home'])
+        r = handle({'op': 'code', 'icons': ['Codicons:zap', 'x']})
+        self.assertEqual([('code' in x, 'error' in x) for x in r['results']],
+                         [(True, False), (False, True)])
+        r = handle({'op': 'lookup', 'icons': ['Codicons:zap', 'x']})
+        self.assertEqual(r['results'], [
+            {'icon': 'Codicons:zap', 'collection': 'Codicons',
+             'name': 'zap', 'codepoint': 0xea86},
+            {'icon': 'x', 'error': 'unknown icon'},
+        ])
+        r = handle({'op': 'list', 'counts': True})
+        self.assertEqual(r['results'], [
+            {'collection': 'Codicons', 'count': 3},
+            {'collection': 'Fa5.Solid', 'count': 2},
+        ])
+
+    def test_errors(self):
+        handle = self.service.handle
+        for request in ({'op': 'nope'}, {'op': 'render', 'icon': 'x'},
+                        {'op': 'search', 'query': 'a', 'collection': 'x'},
+                        {'op': 'search', 'query': 'a', 'limit': 'x'},
+                        {'op': 'search', 'query': 'a', 'collection': 1},
+                        {'op': 'search', 'query': ['a']},
+                        {'op': 'code', 'icons': [1]},
+                        {'op': 'lookup', 'icons': 'Codicons:zap'},
+                        {'op': 'list', 'collections': [None]},
+                        {'op': 'render', 'icon': 1}):
+            with self.subTest(request=request):
+                r = handle(request)
+                self.assertFalse(r['ok'])
+                self.assertTrue(r['error'])
+
+    def test_render(self):
+        service = self.service
+        service.renderer = fake_renderer
+        r = service.handle({'op': 'render', 'icon': 'Codicons:zap',
+                            'size': 16, 'color': '#102030'})
+        self.assertEqual(b64decode(r['png']), b'Codicons:60038:16:ff102030')
+        self.assertEqual(parse_color('#80102030'), 0x80102030)
+
+
+@skipUnless(hasattr(socket, 'AF_UNIX'), 'needs Unix domain sockets')
+class TestIconDaemon(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name)/'test.sock'
+        service = IconService(IconCatalog.from_charmaps(CHARMAPS),
+                              renderer=fake_renderer)
+        self.service = service
+        thread = Thread(target=IconDaemon(service, self.path).run)
+        thread.start()
+        self.thread = thread
+        self.addCleanup(self.stop)
+        for _ in range(200):
+            if is_running(self.path):
+                break
+
+            sleep(0.01)
+
+    def stop(self):
+        client = DaemonClient.connect(self.path)
+        if client is not None:
+            with client:
+                client({'op': 'shutdown'})
+
+        self.thread.join(5)
+
+    def test_clients(self):
+        path = self.path
+        with DaemonClient.connect(path) as a, DaemonClient.connect(path) as b:
+            ra = a({'op': 'search', 'query': 'arrow'})
+            rb = b({'op': 'ping'})
+            ra2 = a({'op': 'render', 'icon': 'Fa5.Solid:home'})
+            self.assertEqual(len(ra['results']), 2)
+            self.assertEqual(rb['icons'], 5)
+            self.assertTrue(ra2['ok'])
+            self.assertNotEqual(ra['id'], ra2['id'])
+
+            # a malformed line gets an error, not a dropped connection
+            a.file.write(b'[1, 2]\n')
+            a.file.flush()
+            self.assertIn(b'"ok":false', a.file.readline())
+            self.assertTrue(b({'op': 'ping'})['ok'])
+            # and so does a request that breaks its handler
+            self.service.handlers['boom'] = lambda request: 1/0
+            r = b({'op': 'boom'})
+            self.assertFalse(r['ok'])
+            self.assertIn('ZeroDivisionError', r['error'])
+            self.assertTrue(b({'op': 'ping'})['ok'])
+
+        with DaemonClient.connect(path) as c:
+            self.assertTrue(c({'op': 'shutdown'})['ok'])
+
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(path.exists())
+        self.assertIsNone(DaemonClient.connect(path))
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
@@ -0,0 +1,102 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from argparse import Namespace
+from json import loads as jloads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.service import IconService  # noqa: E402
+from iconbrowser.export import (  # noqa: E402
+    EXPORT_INDEX_NAME, plan_export, write_index, color_name,
+)
+from iconbrowser.cli import export_selection  # noqa: E402
+
+ICONS = [('Codicons', f'icon{i}', 0xea00 + i) for i in range(10)]
+
+
+class TestExportPlan(TestCase):
+    def test_files(self):
+        tasks = plan_export(ICONS, (16, 32), (0xff000000, 0x80ffffff))
+        self.assertEqual(len(tasks), 4)
+        self.assertTrue(all(t.filename is None for t in tasks))
+        iconstring, entry = next(tasks[-1].entries())
+        self.assertEqual(iconstring, 'Codicons:icon0')
+        self.assertEqual(entry, {'size': 32, 'color': '#80ffffff',
+                                 'file': 'Codicons-icon0-32-80ffffff.png'})
+
+    def test_sheets(self):
+        tasks = plan_export(ICONS, (16,), (0xff102030,), sheets=True,
+                            columns=4, sheet_icons=9)
+        # 9 icons per sheet rounds down to 2 lines of 4
+        self.assertEqual([len(t) for t in tasks], [8, 2])
+        self.assertEqual([t.sheet_size() for t in tasks],
+                         [(64, 32), (32, 16)])
+        entries = dict(tasks[0].entries())
+        self.assertEqual(entries['Codicons:icon5'],
+                         {'size': 16, 'color': '#102030',
+                          'file': 'sheet-16-ff102030-000.png',
+                          'x': 16, 'y': 16})
+        self.assertEqual(dict(tasks[1].entries())['Codicons:icon9']['file'],
+                         'sheet-16-ff102030-001.png')
+
+    def test_index(self):
+        tasks = plan_export(ICONS, (24, 16), (0xff000000,), sheets=True)
+        with TemporaryDirectory() as tmp:
+            path = write_index(Path(tmp), ICONS, tasks)
+            self.assertEqual(path.name, EXPORT_INDEX_NAME)
+            index = jloads(path.read_text())
+
+        self.assertEqual(index['sizes'], [16, 24])
+        self.assertEqual(index['colors'], ['#000000'])
+        self.assertEqual(len(index['sheets']), 2)
+        icon = index['icons']['Codicons:icon3']
+        self.assertEqual(icon['codepoint'], 0xea03)
+        self.assertEqual([(e['size'], e['x']) for e in icon['images']],
+                         [(24, 72), (16, 48)])
+        self.assertEqual(color_name(0x00ffffff), '#00ffffff')
+
+
+class TestExportSelection(TestCase):
+    def setUp(self):
+        service = IconService(IconCatalog.from_charmaps({
+            'Codicons': {'home': 0xeb06, 'zap': 0xea86},
+            'Fa5.Solid': {'home': 0xf015},
+        }), postings=False)
+        self.client = service.handle
+
+    def select(self, icons=(), query=None, collection=None, manifest=None):
+        opts = Namespace(icons=list(icons), query=query, manifest=manifest,
+                         collection=collection, fuzzy=False)
+        return export_selection(self.client, opts)
+
+    def test_selection(self):
+        self.assertEqual(self.select(query='home'),
+                         [('Codicons', 'home', 0xeb06),
+                          ('Fa5.Solid', 'home', 0xf015)])
+        self.assertEqual(self.select(collection='codicons'),
+                         [('Codicons', 'home', 0xeb06),
+                          ('Codicons', 'zap', 0xea86)])
+        self.assertEqual(self.select(['Codicons:zap', 'Nope:x']),
+                         [('Codicons', 'zap', 0xea86)])
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp)/'icons.txt'
+            path.write_text('Fa5.Solid:home\n')
+            self.assertEqual(self.select(['Codicons:zap'], manifest=path),
+                             [('Codicons', 'zap', 0xea86),
+                              ('Fa5.Solid', 'home', 0xf015)])
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
@@ -0,0 +1,109 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+import numpy as np  # noqa: E402
+
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.search import TrigramIndex  # noqa: E402
+from iconbrowser.fuzzy import FuzzyMatcher, score_token_py  # noqa: E402
+
+CHARMAPS = {
+    'Codicons': {'home': 1, 'arrow-left': 2, 'arrow-right': 3,
+                 'layout-sidebar-left': 4, 'homebrew': 5},
+    'Fa5.Solid': {'home': 11, 'arrow-left': 12, 'long-arrow-alt-left': 13,
+                  'hospital': 14},
+    'Material6': {'home-outline': 21, 'arrow-left-bold': 22,
+                  'a-' + 'x'*60: 23},
+}
+
+
+class TestFuzzyMatcher(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        catalog = IconCatalog.from_charmaps(CHARMAPS)
+        cls.catalog = catalog
+        cls.index = TrigramIndex(catalog)
+
+    def setUp(self):
+        self.matcher = FuzzyMatcher(self.index)
+
+    def strings(self, rows):
+        return [self.catalog.iconstring(r) for r in rows]
+
+    def test_subsequence_ranking(self):
+        found = self.strings(self.matcher.search('arrw lft'))
+        self.assertEqual(set(found[:2]),
+                         {'Codicons:arrow-left', 'Fa5.Solid:arrow-left'})
+        self.assertIn('Material6:arrow-left-bold', found)
+        self.assertIn('Fa5.Solid:long-arrow-alt-left', found)
+        self.assertNotIn('Codicons:arrow-right', found)
+
+    def test_exact_name_first(self):
+        found = self.strings(self.matcher.search('home'))
+        self.assertEqual(found[:2], ['Codicons:home', 'Fa5.Solid:home'])
+        self.assertEqual(set(found[2:]),
+                         {'Codicons:homebrew', 'Material6:home-outline'})
+
+    def test_collection_tokens_and_range(self):
+        catalog = self.catalog
+        found = self.strings(self.matcher.search('fa5 left'))
+        self.assertEqual(set(found), {'Fa5.Solid:arrow-left',
+                                      'Fa5.Solid:long-arrow-alt-left'})
+        within = catalog.collection_range('Codicons')
+        rows = self.matcher.search('left', within)
+        self.assertTrue(all(r in within for r in rows))
+        self.assertEqual(set(self.strings(rows)),
+                         {'Codicons:arrow-left',
+                          'Codicons:layout-sidebar-left'})
+        # like the substring search, an empty query matches everything
+        self.assertEqual(self.matcher.search('  ').tolist(),
+                         list(range(len(catalog))))
+
+    def test_range_scores_are_not_reused_outside_range(self):
+        within = self.catalog.collection_range('Codicons')
+        matcher = self.matcher
+        for query in ('l', 'le', 'lef'):
+            matcher.search(query, within)
+
+        fresh = FuzzyMatcher(self.index)
+        for query in ('lef', 'left'):
+            with self.subTest(query=query):
+                self.assertEqual(matcher.search(query).tolist(),
+                                 fresh.search(query).tolist())
+
+    def test_fork(self):
+        matcher = self.matcher
+        expected = matcher.search('arrw lft')
+        fork = matcher.fork()
+        self.assertIs(fork.buckets, matcher.buckets)
+        self.assertEqual(fork.search('arrw').tolist(),
+                         matcher.search('arrw').tolist())
+        self.assertNotIn(b'lft', fork.token_scores)
+        self.assertEqual(fork.search('arrw lft').tolist(), expected.tolist())
+
+    def test_vectorized_matches_scalar(self):
+        matcher = self.matcher
+        names = [n.encode() for n in self.index.names]
+        for token in (b'a', b'arrw', b'lft', b'ho', b'x'*40, b'zz'):
+            # typing order, so the prefix pruning is exercised too
+            matcher.search(token[:-1].decode())
+            with self.subTest(token=token):
+                scores = matcher.score_token(token)
+                expected = [score_token_py(token, n) for n in names]
+                np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
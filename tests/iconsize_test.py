@@ -0,0 +1,42 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.iconsize import (  # noqa: E402
+    ICON_SIZE_BUCKETS, grid_size, nearest_bucket, drag_icon_size,
+)
+
+
+class TestIconSize(TestCase):
+    def test_grid(self):
+        self.assertEqual(grid_size(1030, 10), (100, 80))
+        self.assertEqual(grid_size(10, 10), (0, 0))
+
+    def test_nearest_bucket(self):
+        self.assertEqual(nearest_bucket(48), 48)
+        # scaling down is preferred to scaling up by the same factor
+        self.assertEqual(nearest_bucket(56), 64)
+        self.assertEqual(nearest_bucket(1000), ICON_SIZE_BUCKETS[-1])
+        self.assertIsNone(nearest_bucket(48, ()))
+
+    def test_drag(self):
+        # a cached size close enough is scaled rather than rendering another
+        self.assertEqual(drag_icon_size(70, {77, 48}), 77)
+        self.assertEqual(drag_icon_size(70, {48}), 80)
+        self.assertEqual(drag_icon_size(70), 80)
+        self.assertEqual(drag_icon_size(30, {30}), 30)
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
@@ -0,0 +1,52 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.importprofile import (  # noqa: E402
+    parse_importtime, package_totals, format_import_profile, profile_imports,
+)
+
+SAMPLE = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     pkg.sub.leaf
+import time:       300 |        420 |   pkg.sub
+import time:      1000 |       1420 | pkg
+Traceback (most recent call last):
+import time:        50 |         50 | other
+'''
+
+
+class TestImportProfile(TestCase):
+    def test_parse(self):
+        times = parse_importtime(SAMPLE)
+        self.assertEqual([(t.module, t.self_us, t.cumulative_us, t.level)
+                          for t in times],
+                         [('pkg.sub.leaf', 120, 120, 2),
+                          ('pkg.sub', 300, 420, 1),
+                          ('pkg', 1000, 1420, 0),
+                          ('other', 50, 50, 0)])
+        self.assertEqual(package_totals(times),
+                         [('pkg', 1420), ('other', 50)])
+        text = format_import_profile(times, top=1)
+        self.assertTrue(text.startswith('4 modules imported in 1.5 ms'))
+        self.assertNotIn('other', text)
+
+    def test_profile(self):
+        times, code, _ = profile_imports('iconbrowser.catalog')
+        self.assertEqual(code, 0)
+        self.assertIn('iconbrowser.catalog', [t.module for t in times])
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
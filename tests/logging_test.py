@@ -0,0 +1,72 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.logging import (  # noqa: E402
+    log_func_call, set_trace_logging, set_func_call_logging, DEBUGLOW2,
+    get_tracelog, get_func_call_logging,
+)
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def traced_func(value: int):
+    return value + 1
+
+
+class Traced:
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def method(self, value: int):
+        return value*2
+
+    @classmethod
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def cmethod(cls, value: int):
+        return value*3
+
+
+class TestTraceOnly(TestCase):
+    def setUp(self):
+        self.flags = get_tracelog(), get_func_call_logging()
+        set_trace_logging(False)
+        set_func_call_logging(False)
+
+    def tearDown(self):
+        trace, func_call = self.flags
+        set_trace_logging(trace)
+        set_func_call_logging(func_call)
+
+    def bindings(self):
+        return (traced_func, vars(Traced)['method'],
+                vars(Traced)['cmethod'].__func__)
+
+    def test_rebind(self):
+        plain = self.bindings()
+        self.assertTrue(all(not hasattr(f, '__wrapped__') for f in plain))
+
+        # both flags are needed for tracing
+        set_trace_logging(True)
+        self.assertEqual(self.bindings(), plain)
+        set_func_call_logging(True)
+        wrapped = self.bindings()
+        self.assertEqual([f.__wrapped__ for f in wrapped], list(plain))
+        self.assertEqual((traced_func(1), Traced().method(2),
+                          Traced.cmethod(3)), (2, 4, 9))
+
+        set_trace_logging(False)
+        self.assertEqual(self.bindings(), plain)
+        self.assertEqual(Traced.cmethod(1), 3)
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
@@ -0,0 +1,60 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.lrucache import ByteBudgetLRUCache  # noqa: E402
+
+
+class TestByteBudgetLRUCache(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = ByteBudgetLRUCache(10, len)
+        cache.put('a', 'xxxx')
+        cache.put('b', 'xxxx')
+        self.assertEqual(cache.get('a'), 'xxxx')
+        cache.put('c', 'xxxx')
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.nbytes, 8)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_counters(self):
+        cache = ByteBudgetLRUCache(10, len)
+        cache.put('a', 'x')
+        cache.get('a')
+        cache.get('b')
+        self.assertEqual(cache.stats.as_dict()['hits'], 1)
+        self.assertEqual(cache.stats.as_dict()['misses'], 1)
+        self.assertEqual(cache.stats.hit_rate(), 0.5)
+
+    def test_oversized_value_not_stored(self):
+        cache = ByteBudgetLRUCache(3, len)
+        cache.put('a', 'xx')
+        cache.put('b', 'xxxx')
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+
+    def test_discard_where_and_budget_change(self):
+        cache = ByteBudgetLRUCache(100, len)
+        for i in range(5):
+            cache.put(('k', i), 'x'*10)
+
+        self.assertEqual(cache.discard_where(lambda k: k[1] % 2), 2)
+        self.assertEqual(cache.nbytes, 30)
+        cache.set_max_bytes(15)
+        self.assertEqual(len(cache), 1)
+        self.assertIn(('k', 4), cache)
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
@@ -0,0 +1,70 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from json import loads as jloads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.metrics import Histogram, Metrics  # noqa: E402
+
+
+class TestHistogram(TestCase):
+    def test_quantiles(self):
+        h = Histogram()
+        for v in [0.3]*90 + [3.0]*9 + [40.0]:
+            h.add(v)
+
+        self.assertEqual(h.count, 100)
+        self.assertAlmostEqual(h.mean(), 0.94)
+        self.assertEqual((h.min, h.max), (0.3, 40.0))
+        # the upper bound of the bin, but never above the largest value
+        self.assertEqual(h.quantile(0.5), 0.5)
+        self.assertEqual(h.quantile(0.99), 5.0)
+        self.assertEqual(h.quantile(1.0), 40.0)
+        d = h.as_dict()
+        self.assertEqual(d['bins'], [[0.5, 90], [5.0, 9], [50.0, 1]])
+
+    def test_empty(self):
+        h = Histogram('calls')
+        self.assertEqual(h.as_dict(), {'unit': 'calls', 'count': 0})
+        h.add(1e9)
+        self.assertEqual(h.as_dict()['bins'], [[None, 1]])
+
+
+class TestMetrics(TestCase):
+    def test_snapshot(self):
+        m = Metrics(origin=10.0)
+        m.observe('filter', 2.0)
+        m.count('renders', 3)
+        m.count('renders')
+        m.gauge('cache', lambda: {'entries': 5})
+        m.phase('startup', 10.5, 11.0)
+        m.phase('idle', 12.0)
+        snap = m.snapshot()
+        self.assertEqual(snap['counters'], {'renders': 4})
+        self.assertEqual(snap['gauges'], {'cache': {'entries': 5}})
+        self.assertEqual(snap['phases']['startup'],
+                         {'start_s': 0.5, 'duration_s': 0.5})
+        self.assertIsNone(snap['phases']['idle']['duration_s'])
+        self.assertEqual(snap['histograms']['filter']['count'], 1)
+
+        m.reset()
+        self.assertEqual(m.snapshot()['counters'], {})
+        self.assertEqual(m.histograms['filter'].count, 0)
+        with TemporaryDirectory() as tmp:
+            path = m.write_json(Path(tmp)/'metrics.json')
+            self.assertIn('startup', jloads(path.read_text())['phases'])
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
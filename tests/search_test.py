@@ -0,0 +1,90 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.search import (  # noqa: E402
+    TrigramIndex, IncrementalSearch,
+)
+
+WORDS = ('arrow', 'left', 'right', 'home', 'circle', 'fill', 'up', 'down',
+         'file', 'c++', 'a.b')
+
+
+def make_charmaps():
+    charmaps = {}
+    for k, spec in enumerate(('Fa5', 'Fa5.Solid', 'Codicons', 'Material6')):
+        cmap = {}
+        for i, a in enumerate(WORDS):
+            for j, b in enumerate(WORDS[k:]):
+                cmap[f'{a}-{b}'] = 1000*k + 20*i + j
+
+        charmaps[spec] = cmap
+
+    return charmaps
+
+
+class TestTrigramIndex(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        catalog = IconCatalog.from_charmaps(make_charmaps())
+        cls.catalog = catalog
+        cls.index = TrigramIndex(catalog)
+        cls.strings = [s.lower() for s in catalog.iconstrings()]
+
+    def brute(self, term: str, within: range = None):
+        rows = within or range(len(self.strings))
+        return [r for r in rows if term.lower() in self.strings[r]]
+
+    def test_matches_substring_scan(self):
+        for term in ('a', 'ar', 'ARR', 'arrow-left', 'home-c', 'solid',
+                     'fa5', 'solid:h', '5:arrow', ':', 'c++', 'a.b', '.',
+                     'zzz', 'w-l'):
+            with self.subTest(term=term):
+                self.assertEqual(list(self.index.search(term)),
+                                 self.brute(term))
+
+    def test_within_range(self):
+        spec = self.catalog.collection_range('Fa5.Solid')
+        # a range straddling collections, as well as a single one
+        span = range(spec.start - 7, spec.start + 9)
+        for rows in (spec, span):
+            for term in ('a', 'left', 'fa5', 'd:up', 'zzz', 'solid'):
+                with self.subTest(term=term, rows=rows):
+                    self.assertEqual(list(self.index.search(term, rows)),
+                                     self.brute(term, rows))
+
+    def test_refine_matches_search(self):
+        index = self.index
+        rows = index.search('ar')
+        for term in ('arr', 'arrow-l', 'w-l', 'solid:ar', 'fa5'):
+            with self.subTest(term=term):
+                self.assertEqual(list(index.refine(term, rows)),
+                                 [r for r in self.brute(term) if r in rows])
+
+    def test_incremental_typing(self):
+        search = IncrementalSearch(self.index)
+        fa5 = self.catalog.collection_range('Fa5')
+        steps = (('a', None), ('ar', None), ('arr', None), ('arro', None),
+                 ('arrow', fa5), ('xarrow', fa5), ('arrow', fa5),
+                 ('arrow', None), ('row-', None), ('row-l', None),
+                 ('o', None))
+        for term, within in steps:
+            with self.subTest(term=term, within=within):
+                self.assertEqual(list(search.search(term, within)),
+                                 self.brute(term, within))
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
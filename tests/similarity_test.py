@@ -0,0 +1,160 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+import numpy as np  # noqa: E402
+
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.similarity import (  # noqa: E402
+    HASH_SIZE, BLANK_HASH, HashIndex, GlyphHashes, SimilarityIndex,
+    perceptual_hashes, popcount, unhashed_glyphs, save_glyph_hashes,
+    load_glyph_hashes,
+)
+
+CHARMAPS = {
+    'Codicons': {'home': 1, 'house': 1, 'star': 2, 'blank': 3},
+    'Fa5.Solid': {'home': 11, 'star': 12},
+    'Material6': {'home': 21},
+}
+
+
+def bitmap(x0: int, y0: int, x1: int, y1: int):
+    b = np.zeros((HASH_SIZE, HASH_SIZE), np.uint8)
+    b[y0:y1, x0:x1] = 255
+    return b
+
+
+def brute_nearest(hashes: np.ndarray, h: int, count: int,
+                  max_distance: int):
+    dist = popcount(hashes ^ np.uint64(h)).astype(np.int64)
+    order = np.lexsort((np.arange(len(hashes)), dist))
+    order = order[dist[order] <= max_distance][:count]
+    return order.tolist(), dist[order].tolist()
+
+
+class TestPerceptualHashes(TestCase):
+    def test_similar_shapes(self):
+        square, shifted, bar = perceptual_hashes(np.stack([
+            bitmap(8, 8, 24, 24), bitmap(9, 8, 25, 24), bitmap(14, 2, 18, 30),
+        ]))
+        near = int(popcount(np.array([square ^ shifted]))[0])
+        far = int(popcount(np.array([square ^ bar]))[0])
+        self.assertLess(near, far)
+
+    def test_blank(self):
+        hashes = perceptual_hashes(np.stack([
+            np.zeros((HASH_SIZE, HASH_SIZE), np.uint8),
+            np.full((HASH_SIZE, HASH_SIZE), 255, np.uint8),
+        ]))
+        self.assertEqual(hashes.tolist(), [BLANK_HASH, BLANK_HASH])
+
+
+class TestHashIndex(TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        hashes = rng.integers(0, 2**63, 2000).astype(np.uint64)
+        # neighbours of the first hash at a few distances
+        for i, bits in enumerate((1, 3, 6, 9, 14), 1):
+            h = int(hashes[0])
+            for b in rng.choice(64, bits, replace=False):
+                h ^= 1 << int(b)
+
+            hashes[i] = h
+
+        index = HashIndex(hashes)
+        for q in (0, 1, 7, 100):
+            for count, max_distance in ((1, 12), (5, 12), (50, 20)):
+                with self.subTest(q=q, count=count, max_distance=max_distance):
+                    ids, dist = index.nearest(int(hashes[q]), count,
+                                              max_distance)
+                    self.assertEqual(
+                        (ids.tolist(), dist.tolist()),
+                        brute_nearest(hashes, int(hashes[q]), count,
+                                      max_distance),
+                    )
+
+    def test_empty(self):
+        ids, dist = HashIndex(np.empty(0, np.uint64)).nearest(5, 3)
+        self.assertEqual(len(ids), 0)
+
+
+class TestGlyphHashes(TestCase):
+    def setUp(self):
+        self.catalog = IconCatalog.from_charmaps(CHARMAPS)
+        self.hashes = GlyphHashes.from_glyphs([
+            ('Codicons', np.array([2, 3]), np.array([0xff00, BLANK_HASH])),
+            ('Codicons', np.array([1]), np.array([0xf0f0])),
+            ('Fa5.Solid', np.array([12, 11]), np.array([0xff01, 0xf0f1])),
+        ])
+
+    def test_lookup(self):
+        hashes, found = self.hashes.lookup('Codicons', np.array([3, 1, 9]))
+        self.assertEqual(found.tolist(), [True, True, False])
+        self.assertEqual(hashes[:2].tolist(), [BLANK_HASH, 0xf0f0])
+        _, found = self.hashes.lookup('Material6', np.array([21]))
+        self.assertEqual(found.tolist(), [False])
+
+    def test_unhashed(self):
+        glyphs = unhashed_glyphs(self.catalog, self.hashes)
+        self.assertEqual(list(glyphs), ['Material6'])
+        self.assertEqual(glyphs['Material6'].tolist(), [21])
+        merged = self.hashes.merged(GlyphHashes.from_glyphs([
+            ('Material6', np.array([21]), np.array([0xf0f3])),
+        ]))
+        self.assertEqual(unhashed_glyphs(self.catalog, merged), {})
+        self.assertEqual(len(merged), 6)
+        self.assertEqual(len(self.hashes), 5)
+
+    def test_similar(self):
+        catalog = self.catalog
+        index = SimilarityIndex(catalog, self.hashes)
+        # one row per glyph, without the blank one or unhashed collections
+        self.assertEqual(len(index), 4)
+        home = catalog.find('Codicons', 'home')
+        similar = [(catalog.iconstring(r), d)
+                   for r, d in index.similar(home, 10, 16)]
+        self.assertEqual(similar[0], ('Fa5.Solid:home', 1))
+        self.assertNotIn('Codicons:house', dict(similar))
+        self.assertEqual(
+            index.similar(catalog.find('Codicons', 'house'), 1, 16),
+            index.similar(home, 1, 16),
+        )
+        self.assertEqual(index.similar(catalog.find('Codicons', 'blank'),
+                                       10), [])
+        self.assertEqual(index.similar(catalog.find('Material6', 'home'),
+                                       10), [])
+
+    def test_roundtrip(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp)/'hashes.bin'
+            save_glyph_hashes(path, self.hashes, 'stamp')
+            loaded = load_glyph_hashes(path, 'stamp')
+            self.assertEqual(loaded.collections, self.hashes.collections)
+            for specname, (cps, hashes) in self.hashes.tables.items():
+                lcps, lhashes = loaded.tables[specname]
+                self.assertEqual(lcps.tolist(), cps.tolist())
+                self.assertEqual(lhashes.tolist(), hashes.tolist())
+
+            self.assertIsNone(load_glyph_hashes(path, 'other'))
+            path.write_bytes(path.read_bytes()[:-8])
+            self.assertIsNone(load_glyph_hashes(path, 'stamp'))
+            path.write_bytes(b'garbage')
+            self.assertIsNone(load_glyph_hashes(path, 'stamp'))
+            self.assertIsNone(load_glyph_hashes(path.with_name('x'),
+                                                'stamp'))
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass
@@ -0,0 +1,62 @@
+from unittest import TestCase, main as utmain, TextTestRunner
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+from iconbrowser.catalog import IconCatalog  # noqa: E402
+from iconbrowser.snapshot import (  # noqa: E402
+    save_snapshot, load_snapshot, snapshot_stamp,
+)
+
+CHARMAPS = {
+    'Fa5.Solid': {'home': 0xf015, 'arrow-left': 0xf060, 'café': 0xf0f4},
+    'Fa5': {'home': 0xf015},
+    'Codicons': {'home': 0xeb06, 'zap': 0xea86},
+}
+
+
+class TestCatalogSnapshot(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name)/'catalog.bin'
+        self.catalog = IconCatalog.from_charmaps(CHARMAPS)
+
+    def test_roundtrip(self):
+        catalog = self.catalog
+        save_snapshot(self.path, catalog, 'stamp')
+        loaded = load_snapshot(self.path, 'stamp')
+        self.assertEqual(list(loaded.iconstrings()),
+                         list(catalog.iconstrings()))
+        self.assertEqual(loaded.collections, catalog.collections)
+        self.assertEqual(list(loaded.codepoints), list(catalog.codepoints))
+        self.assertEqual(list(loaded.coll_ids), list(catalog.coll_ids))
+        self.assertEqual(loaded.find('Fa5.Solid', 'café'),
+                         catalog.find('Fa5.Solid', 'café'))
+
+    def test_stale_or_damaged(self):
+        save_snapshot(self.path, self.catalog, 'stamp')
+        self.assertIsNone(load_snapshot(self.path, 'other'))
+        self.path.write_bytes(self.path.read_bytes()[:-4])
+        self.assertIsNone(load_snapshot(self.path, 'stamp'))
+        self.path.write_bytes(b'garbage')
+        self.assertIsNone(load_snapshot(self.path, 'stamp'))
+        self.assertIsNone(load_snapshot(self.path.with_name('x'), 'stamp'))
+
+    def test_stamp_is_stable(self):
+        self.assertEqual(snapshot_stamp(), snapshot_stamp())
+
+
+if __name__ == '__main__':
+    ttr = TextTestRunner(stream=sys.stdout,
+                         verbosity=9,
+                         failfast=True)
+    try:
+        utmain(testRunner=ttr)
+    except SystemExit:
+        pass